@@ -24,7 +24,6 @@ try:
 	import run_examples_without_installation
 except ImportError: pass
 
-import copy
 import random
 
 # Example codes starts from here
@@ -328,6 +327,7 @@ parameters = {# Part 1: Simulation metadata
               "eco_buried_frequency": 100,
               "fossilized_ratio": 0.01,
               "fossilized_frequency": 20,
+              "fitness_cache": 1000,
               
               # Part 8: Simulation report settings
               "print_frequency": 10,
@@ -335,6 +335,12 @@ parameters = {# Part 1: Simulation metadata
               "database_logging_frequency": 1
              }
 
+def alignment_score(organism):
+    chromosome = ''.join(organism.genome[0].sequence)
+    score = [aligner.score(chromosome, seq) 
+             for seq in known_sequences]
+    return sum(score) / len(score)
+
 class simulation_functions(dose.dose_functions):
 
     def organism_movement(self, Populations, pop_name, World): pass
@@ -352,11 +358,8 @@ class simulation_functions(dose.dose_functions):
     def fitness(self, Populations, pop_name):
         agents = Populations[pop_name].agents
         for index in range(len(agents)):
-            organism = agents[index]
-            chromosome = ''.join(organism.genome[0].sequence)
-            score = [aligner.score(chromosome, seq) 
-                     for seq in known_sequences]
-            score = sum(score) / len(score)
+            score = Populations[pop_name].fitness(agents[index], 
+                                                  alignment_score)
             agents[index].status['fitness'] = score
 
     def mutation_scheme(self, organism): 
@@ -387,7 +390,7 @@ class simulation_functions(dose.dose_functions):
         agents = Populations[pop_name].agents
         while len(agents) < 100:
             chosen_agent = random.choice(agents)
-            new_agent = copy.deepcopy(chosen_agent)
+            new_agent = chosen_agent.clone()
             agents.append(new_agent)
 
     def postpopulation_control(self, Populations, pop_name): pass
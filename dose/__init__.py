@@ -17,6 +17,7 @@ from . import copads
 from . import database_calls
 from . import dose
 from . import genetic
+from . import lockstep_machine
 from . import register_machine
 from . import ragaraja
 
@@ -25,10 +26,13 @@ from .copads.lindenmayer import lindenmayer
 
 # DOSE Class imports (in ascending order of module names, then class names)
 from .dose import dose_functions
+from .dose_world import DenseWorld
 from .dose_world import World
 from .genetic import Chromosome
 from .genetic import Organism
 from .genetic import Population 
+from .genetic import PopulationFrame
+from .ragaraja import InterpreterContext
 
 # Function imports (in ascending order of module names, then function names)
 from .database_calls import connect_database
@@ -8,7 +8,8 @@ import math, sys, os, random, database_calls
 
 def hamming_distance(sequence_1, sequence_2):
     '''
-    Calculates Hamming distance of 2 string input.
+    Calculates Hamming distance of 2 string input. Packed chromosomal 
+    sequences (see genetic.PackedSequence) are compared by their bits.
     
     @param sequence_1: first input
     @type sequence_1: string
@@ -16,6 +17,8 @@ def hamming_distance(sequence_1, sequence_2):
     @type sequence_2: string
     @return: Hamming distance in integer
     '''
+    if hasattr(sequence_1, 'hamming_distance'):
+        return sequence_1.hamming_distance(sequence_2)
     return sum(ch1 != ch2 for ch1, ch2 in zip(sequence_1, sequence_2))
 
 def standard_deviation(data):
@@ -141,6 +141,31 @@ def db_report(con, cur, sim_functions, start_time,
     con.commit()
     return (con, cur)
 
+def db_log_profile(con, cur, start_time, pop_name, generation_count, rows):
+    '''
+    Function to log the interpreter profile of a population (see 
+    simulation_calls.profile_rows) into miscellaneous table, where the 
+    key is "interpreter_profile|<population name>" and the value is the 
+    list of rows.
+    
+    @param con: Database connector from connect_database() function. 
+    @param cur: Database cursor from connect_database() function.
+    @param start_time: Starting time of current simulation in the format 
+    of <date>-<seconds since epoch>; for example, 2013-10-11-1381480985.77.
+    @param pop_name: Population name.
+    @param generation_count: Current number of generations simulated.
+    @param rows: Rows of interpreter profile.
+    @return: (con, cur) where 
+        - con = connector
+        - cur = cursor 
+    '''
+    cur.execute('''insert into miscellaneous values (?,?,?,?)''', 
+                (str(start_time), str(generation_count), 
+                 '|'.join(['interpreter_profile', str(pop_name)]), 
+                 str(rows)))
+    con.commit()
+    return (con, cur)
+
 def db_list_simulations(cur, table='parameters'):
     '''
     Function to list simulations, identified by starting time of the 
@@ -44,6 +44,27 @@ class dose_functions():
         @return: None
         '''
         raise NotImplementedError
+    def population_mutation_scheme(self, Populations, pop_name):
+        '''
+        Method / function to trigger mutational events in the genomes of 
+        all organisms within a population, as an alternative to 
+        mutation_scheme. This function works at the level of entire 
+        population(s). By default, mutation_scheme is called for each 
+        organism; it may be over-ridden to mutate the whole population at 
+        once, such as by genetic.population_mutation function which draws 
+        the point mutations of all organisms together, for example,
+        
+            genetic.population_mutation(Populations[pop_name].agents, 
+                                        'point', 0.1)
+        
+        @param Populations: A dictionary containing one or more populations 
+        where the value is a genetic.Population object.
+        @param pop_name: Name of the population which is used as key in 
+        the the dictionary (Populations parameter).
+        @return: None
+        '''
+        for organism in Populations[pop_name].agents:
+            self.mutation_scheme(organism)
     def prepopulation_control(self, Populations, pop_name):
         '''
         Method / function to trigger population control events before 
@@ -85,7 +106,10 @@ class dose_functions():
         which means that this function will have 
             - to manage mating scheme and progeny (offspring) generation 
             for the entire population
-            - add or replace offsprings into the respective population(s)
+            - add or replace offsprings into the respective population(s), 
+            or into the next generation buffer of the population(s) (see 
+            genetic.Population.add_offspring) which is added at the end of 
+            the generation
             - (optional) store identity of parent(s) as list; for example, 
             [parentA identity, parentB identity], in offspring's 
             status['parents'] for ancestral tracing.
@@ -161,6 +185,10 @@ class dose_functions():
             - update the respective Organism's location in the status 
             dictionary (Population[pop_name].agents[<index>].status['location'])
         
+        Both are done by Population[pop_name].move_organism if the 
+        location index of the population is kept (see location_index in 
+        simulation parameters).
+        
         @param Populations: A dictionary containing one or more populations 
         where the value is a genetic.Population object.
         @param pop_name: Name of the population which is used as key in 
@@ -186,6 +214,10 @@ class dose_functions():
             - update the respective Organism's location in the status 
             dictionary (Population[pop_name].agents[<index>].status['location'])
         
+        Both are done by Population[pop_name].move_organism if the 
+        location index of the population is kept (see location_index in 
+        simulation parameters).
+        
         @param Populations: A dictionary containing one or more populations 
         where the value is a genetic.Population object.
         @param pop_name: Name of the population which is used as key in 
@@ -254,6 +286,34 @@ class dose_functions():
         @return: None
         '''
         raise NotImplementedError
+    def update_ecology_grid(self, World):
+        '''
+        Method / function to update the ecology of all ecological cells 
+        at once, in place of update_ecology. If this method is 
+        over-ridden, it is called once per generation (and update_ecology 
+        is not called). The values of a key over all ecological cells are 
+        given by World.field(key) - the number of organisms of a 
+        dose_world.DenseWorld is a NumPy array in the shape of the world, 
+        which can be changed in place - and can be set by 
+        World.set_field(key, values). This function works at the level of 
+        the world.
+        
+        @param World: dose_world.World object.
+        @return: None
+        '''
+        raise NotImplementedError
+    def update_local_grid(self, World):
+        '''
+        Method / function to update the local conditions of all 
+        ecological cells at once, in place of update_local. If this 
+        method is over-ridden, it is called once per generation (and 
+        update_local is not called). See update_ecology_grid. This 
+        function works at the level of the world.
+        
+        @param World: dose_world.World object.
+        @return: None
+        '''
+        raise NotImplementedError
     def report(self, World):
         '''
         Method / function to generate a text report of the ecosystem status 
@@ -478,6 +538,10 @@ def filter_age(minimum, maximum, agents):
     @param agents: A list of organisms, such as Population.agents.
     @return: List of Organism objects
     '''
+    frame = genetic.status_frame(agents)
+    if frame != None:
+        extract = frame.select(agents, 'age', (minimum, maximum))
+        if extract != None: return extract
     extract = [individual for individual in agents
                if float(individual.status['age']) > (float(minimum) - 0.01) \
                and float(individual.status['age']) < float(maximum) + 0.01]
@@ -491,9 +555,20 @@ def filter_location(location, agents):
     
     @param location: (x, y, z) coordinates within the World.ecosystem
     @param location: tuple
-    @param agents: A list of organisms, such as Population.agents.
+    @param agents: A list of organisms, such as Population.agents, or a 
+    Population object - the organisms are looked up from the location 
+    index of the population if kept (see Population.index_locations), 
+    without scanning the population.
     @return: List of Organism objects
     '''
+    if isinstance(agents, genetic.Population):
+        if getattr(agents, 'locations', None) != None:
+            return agents.locations.organisms(location)
+        agents = agents.agents
+    frame = genetic.status_frame(agents)
+    if frame != None:
+        extract = frame.select(agents, 'location', location)
+        if extract != None: return extract
     extract = [individual for individual in agents
                if individual.status['location'] == location]
     return extract
@@ -511,6 +586,10 @@ def filter_vitality(minimum, maximum, agents):
     @param agents: A list of organisms, such as Population.agents.
     @return: List of Organism objects
     '''
+    frame = genetic.status_frame(agents)
+    if frame != None:
+        extract = frame.select(agents, 'vitality', (minimum, maximum))
+        if extract != None: return extract
     extract = [individual for individual in agents
             if float(individual.status['vitality']) > (float(minimum) - 0.01) \
             and float(individual.status['vitality']) < float(maximum) + 0.01]
@@ -532,6 +611,10 @@ def filter_status(status_key, condition, agents):
     @param agents: A list of organisms, such as Population.agents.
     @return: List of Organism objects
     '''
+    frame = genetic.status_frame(agents)
+    if frame != None:
+        extract = frame.select(agents, status_key, condition)
+        if extract != None: return extract
     if type(condition) in (str, int, float, bool):
         extract = [individual for individual in agents 
                    if individual.status[status_key] == condition]
@@ -541,7 +624,7 @@ def filter_status(status_key, condition, agents):
         and float(individual.status[status_key]) < float(condition[1]) + 0.01]
     return extract
 
-def revive_simulation(rev_parameters, sim_functions):
+def revive_simulation(rev_parameters, sim_functions, context=None):
     print('\n[' + rev_parameters["simulation_name"].upper() + ' REVIVAL SIMULATION]')
     Populations = {}
     if "sim_folder" in rev_parameters:
@@ -599,9 +682,10 @@ def revive_simulation(rev_parameters, sim_functions):
     rev_parameters["rev_pop_size"] = [len(Populations[pop_name].agents) 
                                       for pop_name in Populations]
     print('\nStarting simulation core...')
-    simulation_core(sim_functions, rev_parameters, Populations, World)
+    simulation_core(sim_functions, rev_parameters, Populations, World, 
+                    context)
 
-def simulate(sim_parameters, sim_functions):
+def simulate(sim_parameters, sim_functions, context=None):
     '''
     Function called by simulation to run the actual simulation based on a 
     set of parameters and functions.
@@ -625,6 +709,17 @@ def simulate(sim_parameters, sim_functions):
         details)
         - chromosome_bases: List containing allowable bases in the 
         chromosome.
+        - compact_chromosome: Optional. If True, chromosomes are kept as 
+        compact sequences of one byte per base, encoded from 
+        chromosome_bases (see genetic.CompactSequence), instead of lists 
+        of bases. This reduces the memory of large populations. Default = 
+        False.
+        - packed_chromosome: Optional. If True, chromosomes of not more than 
+        4 chromosome_bases are kept as packed sequences of 1 bit (2 bases) 
+        or 2 bits (3 or 4 bases) per base (see genetic.PackedSequence), 
+        where crossover and point mutation are bit operations. Chromosomes 
+        are unpacked into bases for interpretation and logging. Default = 
+        False.
         - background_mutation: Defines background mutation rate where 0.01 
         represents 1% mutation and 0.5 represents 50% mutation.
         - additional_mutation: Defines mutation rate on top of background 
@@ -653,6 +748,51 @@ def simulate(sim_parameters, sim_functions):
         organism, which can be used as force-break from endless loop.
         - population_size: Number of organisms per population for initial 
         deployment.
+        - fitness_cache: Optional. Maximum number of fitness scores to keep 
+        in the fitness cache of each population (Population.fitness_cache; 
+        see genetic.FitnessCache), keyed by the content of the genomes. 
+        Fitness functions (see dose_functions.fitness) can use the cache 
+        to skip scoring genomes which had been scored, such as
+        Populations[pop_name].fitness(organism, function), where function 
+        takes an organism and returns its fitness (the organism is scored 
+        without the cache if the cache is not used). Cache hits and misses 
+        are reported in every generational report.
+        - organism_pool: Optional. Maximum number of dead organisms to keep 
+        in the organism pool of each population (Population.pool; see 
+        genetic.OrganismPool) for recycling. At the end of every 
+        generation, dead organisms (Organism.status['alive'] is False) 
+        are removed from the population into the pool, and the offsprings 
+        added by Populations[pop_name].add_offspring are added to the 
+        population (see genetic.Population.swap_generation). New organisms 
+        can be taken from the pool by 
+        Populations[pop_name].new_organism(genome, mutation_type, 
+        additional_mutation_rate). Allocations and garbage collections 
+        are reported in every generational report.
+        - organism_pool_freeze: Optional. If True, the objects surviving 
+        each generation are moved out of the scans of the garbage 
+        collector (see genetic.OrganismPool.freeze_generation) to cut 
+        garbage collection pauses of large populations. Only used with 
+        organism_pool. Default = False.
+        - location_index: Optional. If True, an index of the organisms 
+        of each population by ecological cell is kept (see 
+        genetic.Population.index_locations), which is used by 
+        filter_location function when given the population, and the 
+        number of organisms of the ecological cells is kept consistent 
+        with the index (organisms are to be moved by 
+        genetic.Population.move_organism). Default = False.
+        - identity_type: Optional. Type of identity of the organisms (see 
+        genetic.generate_names), which is used by 
+        Organism.generate_name. Accepts 'random' (32-character randomly 
+        generated names) or 'serial' (serial numbers, which are small 
+        integers and continue after those of revived organisms). 
+        Default = 'random'.
+        - population_frame: Optional. If True and NumPy is installed, the 
+        status of the organisms of each population is kept in columns of 
+        a population frame (see genetic.PopulationFrame), where 
+        Organism.status is a view of a row of the frame. New organisms are 
+        added to the frame in every generation. Filters (such as 
+        filter_age, filter_vitality, filter_location and filter_status) 
+        run over the columns of the frame. Default = False.
         - eco_cell_capacity: Maximum number of organisms per ecological 
         cell at the time of deployment prior to the start of simulation.
         - world_x: Number of ecological cells in the x-axis of the 
@@ -661,6 +801,39 @@ def simulate(sim_parameters, sim_functions):
         World.ecosystem.
         - world_z: Number of ecological cells in the z-axis of the 
         World.ecosystem.
+        - dense_world: Optional. If True, the ecosystem is kept in flat 
+        lists and arrays over all ecological cells (see 
+        dose_world.DenseWorld) instead of nested dictionaries, which is 
+        faster to construct and takes less memory for large worlds. 
+        World.ecosystem[x][y][z] is used as before. Default = False.
+        - diffusion_rates: Optional. Dictionary of resources and their 
+        diffusion rates, where each resource is a number kept in the 
+        ecological cells as World.ecosystem[x][y][z][resource]. In every 
+        generation, after update_ecology, each ecological cell sends the 
+        proportion (diffusion rate) of each resource to its neighbouring 
+        cells in equal shares (see dose_world.World.diffuse). Default = 
+        no diffusion.
+        - decay_rates: Optional. Dictionary of resources and the 
+        proportion of each resource lost in every generation, after 
+        diffusion. Default = no decay.
+        - diffusion_neighbours: Optional. Number of neighbouring cells 
+        for diffusion - 6, 18 or 26. Default = 6.
+        - diffusion_boundary: Optional. Boundary of the world for 
+        diffusion - 'open' (resources diffusing out of the world are 
+        lost), 'reflecting' (resources are kept in the cell) or 
+        'toroidal' (resources diffuse to the other side of the world). 
+        Default = 'open'.
+        - neighbourhood: Optional. Neighbourhood of adjacent ecological 
+        cells (see simulation_calls.adjacent_cells and 
+        dose_world.neighbourhood) - 'moore' (cells sharing a face, an 
+        edge or a corner) or 'von neumann' (cells sharing a face). 
+        Default = 'moore'.
+        - neighbourhood_dimensions: Optional. 2 (adjacent cells in the 
+        x-y plane of the cell) or 3. Default = 2.
+        - neighbourhood_boundary: Optional. 'open' (cells at the edge of 
+        the world have fewer adjacent cells) or 'toroidal' (cells at the 
+        edge of the world are adjacent to the cells at the other side of 
+        the world). Default = 'open'.
         - goal: Goal for population to reach. This provides a goal for use 
         in fitness functions.
         - maximum_generations: Number of generations to simulate.
@@ -671,7 +844,10 @@ def simulate(sim_parameters, sim_functions):
         - print_frequency: Number of generations (intervals) for each 
         reporting event into files.
         - ragaraja_version: Ragaraga instruction version to activate. (see 
-        ragaraja.activate_version() for more details)
+        ragaraja.activate_version() for more details). For version 0.1 
+        and 0.2 (NucleotideBF instructions), the chromosomes of the 
+        population are executed together in lockstep if NumPy is 
+        installed (see lockstep_machine module).
         - ragaraja_instructions: A list defining a set of Ragaraga 
         instructions to activate. This is only useful when ragaraja_version 
         is 0.
@@ -681,6 +857,46 @@ def simulate(sim_parameters, sim_functions):
         located in <current working directory>/Simulations folder
         - database_logging_frequency: Number of generations (intervals) for 
         each database logging event. 
+        - interpreter_cache: Optional. Maximum number of interpretation 
+        results to cache, in order to skip interpreting the same chromosome 
+        from the same cytoplasm and world environment conditions again 
+        (for example, in a clonal population). This is only activated 
+        when none of the Ragaraja instructions using random numbers (049 
+        to 060) is active. Cache hits and misses are reported in every 
+        generational report.
+        - interpreter_workers: Optional. Number of worker processes to 
+        interpret the chromosomes of organisms in different ecological 
+        cells in parallel (see simulation_calls.interpret_chromosome_parallel). 
+        Organisms within the same ecological cell are interpreted in 
+        order by the same worker process. This is not used for 
+        user-defined interpreter, and interpreter cache is not used by 
+        the worker processes.
+        - interpreter_peephole: Optional. If True, runs of instructions 
+        which only move the tape pointer or add to the current cell, and 
+        deactivated instructions, are folded into single steps before 
+        execution (see ragaraja.peephole_table). This speeds up 
+        chromosomes which loop over such runs, but the folding costs more 
+        than it saves for chromosomes which execute few instructions. 
+        Default = False.
+        - interpreter_codegen: Optional. Maximum number of chromosomes to 
+        keep as Python functions generated from the chromosomes (see 
+        ragaraja.InterpreterContext.generate_functions), which are 
+        generated after a chromosome is interpreted 3 times. This speeds up 
+        chromosomes which loop over many instructions, such as the 
+        chromosomes of a clonal population. This is not used by the 
+        worker processes (see interpreter_workers).
+        - interpreter_profile: Optional. If True, the number of executions, 
+        time and jumps (loop iterations for loop end instruction) of each 
+        instruction, and the number of roll backs and unknown instructions, 
+        are collected for each organism and population in every generation 
+        (see register_machine.Profile). The totals are reported in every 
+        generational report, and all statistics are written into 
+        <simulation name>_<population name>.profile.csv file in the 
+        simulation directory and logged into the miscellaneous table of the 
+        logging database (if used). Chromosomes are interpreted one at a 
+        time by the interpreter loop when profiling; hence, 
+        interpreter_cache, interpreter_workers, interpreter_peephole and 
+        interpreter_codegen are not used. Default = False.
     
     Methods / Functions from dose.dose_functions class to be over-ridden 
     as simulation_functions (for more details, please look at 
@@ -709,6 +925,9 @@ def simulate(sim_parameters, sim_functions):
         population(s).
         - mutation_scheme: Trigger mutational events in each chromosome 
         of the genome within an organism.
+        - population_mutation_scheme: Trigger mutational events in the 
+        genomes of all organisms within the population(s). By default, 
+        mutation_scheme is called for each organism.
         - prepopulation_control: Trigger population control events before 
         mating event in each generation.
         - mating: Trigger mating events in each generation.
@@ -732,6 +951,11 @@ def simulate(sim_parameters, sim_functions):
     @param sim_parameters: Dictionary of simulation parameters
     @param sim_functions: A class inherited from dose.dose_functions
     class to implement all the needed simulation functions.
+    @param context: ragaraja.InterpreterContext to interpret the 
+    chromosomes with. Default = None, where a new context (with its own 
+    registers) is generated from ragaraja_version and 
+    ragaraja_instructions. Separate contexts allow several simulations 
+    to run in one process.
     '''
     print('\n[' + sim_parameters["simulation_name"].upper() + ' SIMULATION]')
     if "initial_chromosome" not in sim_parameters:
@@ -742,11 +966,17 @@ def simulate(sim_parameters, sim_functions):
     print('Adding deployment scheme to simulation parameters...')
     sim_parameters["deployment_scheme"] = sim_functions.deployment_scheme
     print('Constructing World entity...')
-    World = dose_world.World(sim_parameters["world_x"],
-                             sim_parameters["world_y"],
-                             sim_parameters["world_z"])
+    if "dense_world" in sim_parameters and sim_parameters["dense_world"]:
+        World = dose_world.DenseWorld(sim_parameters["world_x"],
+                                      sim_parameters["world_y"],
+                                      sim_parameters["world_z"])
+    else:
+        World = dose_world.World(sim_parameters["world_x"],
+                                 sim_parameters["world_y"],
+                                 sim_parameters["world_z"])
     print('Spawning populations...')
     Populations = spawn_populations(sim_parameters)
     print('\nStarting simulation core...')
-    simulation_core(sim_functions, sim_parameters, Populations, World)
+    simulation_core(sim_functions, sim_parameters, Populations, World, 
+                    context)
     
\ No newline at end of file
@@ -8,6 +8,277 @@ Python Papers 7: 5.
 '''
 import copy
 
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+boundaries = ('open', 'reflecting', 'toroidal')
+
+def stencil(neighbours=6, shape=None):
+    '''
+    Returns the offsets of the neighbouring ecological cells of a cell.
+    
+    @param neighbours: number of neighbours - 6 (sharing a face), 18 
+    (sharing a face or an edge) or 26 (sharing a face, an edge or a 
+    corner). Default = 6.
+    @param shape: (world_x, world_y, world_z), where the offsets along 
+    an axis of one ecological cell are left out (for example, a world of 
+    one ecological cell on the z-axis has 4, 8 or 8 neighbours in the 
+    x-y plane). Default = None (all offsets).
+    @return: list of (x, y, z) offsets
+    '''
+    if neighbours not in (6, 18, 26):
+        raise ValueError('Number of neighbours must be 6, 18 or 26: ' + \
+                         str(neighbours))
+    distance = {6: 1, 18: 2, 26: 3}[neighbours]
+    offsets = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                offset = (dx, dy, dz)
+                if offset == (0, 0, 0): continue
+                if abs(dx) + abs(dy) + abs(dz) > distance: continue
+                if shape != None and \
+                    len([i for i in range(3) 
+                         if offset[i] != 0 and shape[i] < 2]) > 0:
+                    continue
+                offsets.append(offset)
+    return offsets
+
+def _shift_slices(offset, shape):
+    '''Returns the slices of (target, source) cells of an array in the 
+    shape of a world, where each source cell sends to the target cell at 
+    the offset.'''
+    target = tuple([slice(max(offset[i], 0), shape[i] + min(offset[i], 0))
+                    for i in range(3)])
+    source = tuple([slice(max(-offset[i], 0), shape[i] - max(offset[i], 0))
+                    for i in range(3)])
+    return (target, source)
+
+def diffuse_array(amounts, rate, offsets, boundary='open'):
+    '''
+    Diffuses amounts of a resource over a grid of ecological cells, as a 
+    convolution of the amounts by the stencil (a sum of shifted arrays) 
+    - each cell keeps (1 - rate) of its amount and sends an equal share 
+    of the rest to each neighbour.
+    
+    @param amounts: NumPy array of amounts in the shape of the world
+    @param rate: proportion of the amount of a cell moving out to the 
+    neighbours (0 to 1)
+    @param offsets: offsets of the neighbours (see stencil)
+    @param boundary: what happens to the shares sent out of the world - 
+    'open' (lost), 'reflecting' (kept by the sending cell) or 'toroidal' 
+    (sent to the other side of the world). Default = 'open'.
+    @return: NumPy array of diffused amounts (floating point numbers)
+    '''
+    amounts = numpy.asarray(amounts, dtype=numpy.float64)
+    if len(offsets) == 0 or rate == 0: return amounts.copy()
+    share = amounts * (float(rate) / len(offsets))
+    result = amounts * (1.0 - rate)
+    if boundary == 'reflecting':
+        inside = numpy.zeros(amounts.shape, dtype=numpy.int64)
+    for offset in offsets:
+        if boundary == 'toroidal':
+            result += numpy.roll(share, offset, axis=(0, 1, 2))
+        else:
+            (target, source) = _shift_slices(offset, amounts.shape)
+            result[target] += share[source]
+            if boundary == 'reflecting': inside[source] += 1
+    if boundary == 'reflecting':
+        result += share * (len(offsets) - inside)
+    return result
+
+neighbourhoods = ('moore', 'von neumann')
+
+# offsets of the Moore neighbourhood in the x-y plane, in the order of 
+# the locations given by simulation_calls.adjacent_cells
+_plane_offsets = [(1, 1, 0), (-1, -1, 0), (1, 0, 0), (-1, 1, 0), 
+                  (1, -1, 0), (-1, 0, 0), (0, -1, 0), (0, 1, 0)]
+
+_neighbourhood_tables = {}
+
+class Neighbourhood(object):
+    '''
+    Index of the neighbouring ecological cells of every ecological cell in 
+    a world of a given shape, computed once. Ecological cells are given 
+    by their flat index, (x * world_y + y) * world_z + z (see 
+    DenseWorld.index). The index is kept as a NumPy array of (number of 
+    cells, number of offsets) flat indices, where the neighbours of each 
+    cell come first in each row (in the order of the offsets) followed by 
+    -1 for neighbours outside the world; hence, the neighbours of a cell 
+    are given as a view of its row without copying. If NumPy is not 
+    installed, the neighbours of each cell are computed when first asked 
+    for and kept as tuples.
+    
+    Neighbourhood objects are not meant to be created directly - use 
+    neighbourhood function or World.neighbourhood function to get the 
+    shared index of a world shape.
+    '''
+    def __init__(self, shape, type='moore', dimensions=2, 
+                 boundary='open'):
+        '''
+        @param shape: (world_x, world_y, world_z)
+        @param type: 'moore' (neighbours sharing a face, an edge or a 
+        corner) or 'von neumann' (neighbours sharing a face). 
+        Default = 'moore'.
+        @param dimensions: 2 (neighbours in the x-y plane of the cell) or 
+        3. Default = 2.
+        @param boundary: 'open' or 'reflecting' (cells at the edge of the 
+        world have fewer neighbours) or 'toroidal' (cells at the edge of 
+        the world are neighbours of the cells at the other side of the 
+        world). Default = 'open'.
+        '''
+        if type not in neighbourhoods:
+            raise ValueError('Unknown neighbourhood: ' + str(type))
+        if dimensions not in (2, 3):
+            raise ValueError('Neighbourhood dimensions must be 2 or 3: ' + \
+                             str(dimensions))
+        if boundary not in boundaries:
+            raise ValueError('Unknown boundary: ' + str(boundary))
+        self.shape = tuple([int(size) for size in shape])
+        self.type = type
+        self.dimensions = dimensions
+        self.boundary = boundary
+        if dimensions == 2 and type == 'moore':
+            offsets = _plane_offsets
+        else:
+            offsets = stencil({'moore': 26, 'von neumann': 6}[type])
+            if dimensions == 2:
+                offsets = [offset for offset in offsets if offset[2] == 0]
+        if boundary == 'toroidal':
+            # wrapping along an axis of one cell leads back to the cell
+            offsets = [offset for offset in offsets 
+                       if len([i for i in range(3) 
+                               if offset[i] != 0 and self.shape[i] < 2]) == 0]
+        self.offsets = list(offsets)
+        self.cells = self.shape[0] * self.shape[1] * self.shape[2]
+        self.table = None
+        self.counts = None
+        self._rows = None
+        self._locations = {}
+        if numpy != None:
+            self._compute_table()
+        else:
+            self._rows = [None] * self.cells
+    
+    def _compute_table(self):
+        '''Computes the index of neighbours of all cells as a NumPy 
+        array.'''
+        if self.cells < 2 ** 31: dtype = numpy.int32
+        else: dtype = numpy.int64
+        (world_x, world_y, world_z) = self.shape
+        table = numpy.empty((self.cells, len(self.offsets)), dtype=dtype)
+        (x, y, z) = numpy.indices(self.shape, dtype=dtype)
+        (x, y, z) = (x.ravel(), y.ravel(), z.ravel())
+        for column in range(len(self.offsets)):
+            (dx, dy, dz) = self.offsets[column]
+            (i, j, k) = (x + dx, y + dy, z + dz)
+            if self.boundary == 'toroidal':
+                i %= world_x
+                j %= world_y
+                k %= world_z
+                table[:, column] = (i * world_y + j) * world_z + k
+            else:
+                inside = (i >= 0) & (i < world_x) & (j >= 0) & \
+                    (j < world_y) & (k >= 0) & (k < world_z)
+                table[:, column] = numpy.where(inside, 
+                                               (i * world_y + j) * \
+                                               world_z + k, -1)
+        del x, y, z, i, j, k
+        self.counts = (table >= 0).sum(axis=1).astype(dtype)
+        if self.boundary != 'toroidal' and \
+            int(self.counts.min()) < len(self.offsets):
+            # move the neighbours outside the world to the end of the rows
+            order = numpy.argsort(table < 0, axis=1, kind='stable')
+            table = numpy.take_along_axis(table, order, axis=1)
+        self.table = table
+    
+    def _row(self, index):
+        '''Computes the neighbours of a cell as a tuple of flat indices, 
+        for use without NumPy.'''
+        (world_x, world_y, world_z) = self.shape
+        (xy, z) = divmod(index, world_z)
+        (x, y) = divmod(xy, world_y)
+        row = []
+        for (dx, dy, dz) in self.offsets:
+            (i, j, k) = (x + dx, y + dy, z + dz)
+            if self.boundary == 'toroidal':
+                (i, j, k) = (i % world_x, j % world_y, k % world_z)
+            elif not (0 <= i < world_x and 0 <= j < world_y and 
+                      0 <= k < world_z):
+                continue
+            row.append((i * world_y + j) * world_z + k)
+        return tuple(row)
+    
+    def neighbours(self, index):
+        '''
+        Returns the neighbouring ecological cells of an ecological cell.
+        
+        @param index: flat index of the ecological cell
+        @return: flat indices of the neighbours (a view of a row of 
+        Neighbourhood.table, or a tuple if NumPy is not installed), 
+        which should not be changed
+        '''
+        if self.table is not None:
+            return self.table[index, :self.counts[index]]
+        row = self._rows[index]
+        if row == None:
+            row = self._row(index)
+            self._rows[index] = row
+        return row
+    
+    def locations(self, location):
+        '''
+        Returns the locations of the neighbouring ecological cells of an 
+        ecological cell. The locations of each cell are kept after the 
+        first call.
+        
+        @param location: location of the ecological cell as (x, y, z)
+        @return: tuple of locations (x, y, z) of the neighbours
+        '''
+        (x, y, z) = (location[0], location[1], location[2])
+        index = (x * self.shape[1] + y) * self.shape[2] + z
+        try:
+            return self._locations[index]
+        except KeyError:
+            pass
+        neighbours = self.neighbours(index)
+        if self.table is not None: neighbours = neighbours.tolist()
+        (world_y, world_z) = (self.shape[1], self.shape[2])
+        locations = []
+        for neighbour in neighbours:
+            (xy, k) = divmod(neighbour, world_z)
+            (i, j) = divmod(xy, world_y)
+            locations.append((i, j, k))
+        locations = tuple(locations)
+        self._locations[index] = locations
+        return locations
+
+def neighbourhood(shape, type='moore', dimensions=2, boundary='open'):
+    '''
+    Returns the index of neighbouring ecological cells (Neighbourhood 
+    object) of a world shape, which is computed at the first call and 
+    shared by later calls with the same arguments.
+    
+    @param shape: (world_x, world_y, world_z)
+    @param type: 'moore' or 'von neumann'. Default = 'moore'.
+    @param dimensions: 2 (x-y plane) or 3. Default = 2.
+    @param boundary: 'open', 'reflecting' or 'toroidal'. Default = 'open'.
+    @return: Neighbourhood object
+    '''
+    if boundary == 'reflecting': boundary = 'open'
+    key = (tuple([int(size) for size in shape]), type, dimensions, boundary)
+    if key not in _neighbourhood_tables:
+        _neighbourhood_tables[key] = Neighbourhood(key[0], type, 
+                                                   dimensions, boundary)
+    return _neighbourhood_tables[key]
+
 class World(object):
     '''
     Representation of a 3-dimensional ecological world.
@@ -58,6 +329,7 @@ class World(object):
         self.world_x = int(world_x)
         self.world_y = int(world_y)
         self.world_z = int(world_z)
+        self.dense = False
         for x in range(self.world_x):
             eco_x = {}
             for y in range(self.world_y):
@@ -101,6 +373,142 @@ class World(object):
             import pickle
 
         self.ecosystem = pickle.load(open(filename, 'rb'))
+    
+    def cell(self, x, y, z):
+        '''
+        Returns an ecological cell (World.ecosystem[x][y][z]).
+        
+        @param x: location of the ecological cell on the x-axis
+        @type x: integer
+        @param y: location of the ecological cell on the y-axis
+        @type y: integer
+        @param z: location of the ecological cell on the z-axis
+        @type z: integer
+        @return: dictionary of the ecological cell
+        '''
+        return self.ecosystem[x][y][z]
+    
+    def neighbourhood(self, type='moore', dimensions=2, boundary='open'):
+        '''
+        Returns the index of neighbouring ecological cells of the world,
+        which is shared by all worlds of the same shape (see
+        neighbourhood function).
+    
+        @param type: 'moore' or 'von neumann'. Default = 'moore'.
+        @param dimensions: 2 (x-y plane) or 3. Default = 2.
+        @param boundary: 'open', 'reflecting' or 'toroidal'.
+        Default = 'open'.
+        @return: Neighbourhood object
+        '''
+        return neighbourhood((self.world_x, self.world_y, self.world_z),
+                             type, dimensions, boundary)
+    
+    def field(self, key):
+        '''
+        Returns the values of a key over all ecological cells as nested 
+        lists (values[x][y][z]; None for cells without the key). The 
+        lists of the ecological cells are returned as they are, which can 
+        be changed in place.
+        
+        @param key: key of the ecological cells
+        @return: nested lists of values
+        '''
+        return [[[self.ecosystem[x][y][z].get(key)
+                  for z in range(self.world_z)]
+                 for y in range(self.world_y)]
+                for x in range(self.world_x)]
+    
+    def set_field(self, key, values):
+        '''
+        Sets the values of a key over all ecological cells.
+        
+        @param key: key of the ecological cells
+        @param values: nested sequences of values (values[x][y][z]), such 
+        as a NumPy array in the shape of the world
+        '''
+        if hasattr(values, 'tolist'): values = values.tolist()
+        for x in range(self.world_x):
+            for y in range(self.world_y):
+                for z in range(self.world_z):
+                    self.ecosystem[x][y][z][key] = values[x][y][z]
+    
+    def diffuse(self, rates, neighbours=6, boundary='open', decay=None):
+        '''
+        Diffusion and decay of resources between ecological cells, where 
+        each resource is a number kept by a key of the ecological cells 
+        (cells without the key have none of the resource). In each call, 
+        each cell keeps (1 - rate) of each resource and sends an equal 
+        share of the rest to each neighbouring cell (see stencil), then 
+        (1 - decay rate) of each resource is kept. Diffusion is executed 
+        as a convolution over the whole grid by NumPy (see diffuse_array), 
+        or by Python loops if NumPy is not installed.
+        
+        @param rates: dictionary of resource (key) and diffusion rate 
+        (proportion of the resource of a cell moving out to the 
+        neighbours in each call, from 0 to 1)
+        @type rates: dictionary
+        @param neighbours: number of neighbours in the stencil - 6, 18 or 
+        26. Default = 6.
+        @param boundary: what happens to resources sent out of the world 
+        - 'open' (lost), 'reflecting' (kept by the sending cell) or 
+        'toroidal' (sent to the other side of the world). Default = 'open'.
+        @param decay: dictionary of resource (key) and decay rate 
+        (proportion of the resource lost in each call). Default = None 
+        (no decay).
+        '''
+        if decay == None: decay = {}
+        if boundary not in boundaries:
+            raise ValueError('Unknown boundary: ' + str(boundary))
+        shape = (self.world_x, self.world_y, self.world_z)
+        offsets = stencil(neighbours, shape)
+        for key in sorted(set(list(rates.keys()) + list(decay.keys()))):
+            rate = float(rates.get(key, 0.0))
+            kept = 1.0 - float(decay.get(key, 0.0))
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError('Diffusion rate must be between 0 and 1: ' + \
+                                 str(rate))
+            amounts = self.field(key)
+            if numpy != None:
+                if type(amounts) is not numpy.ndarray:
+                    amounts = [[[value or 0.0 for value in row] 
+                                for row in plane] for plane in amounts]
+                amounts = diffuse_array(amounts, rate, offsets, boundary)
+                if kept != 1.0: amounts *= kept
+                self.set_field(key, amounts)
+            else:
+                self.set_field(key, self._diffuse_lists(amounts, rate, 
+                                                        offsets, boundary, 
+                                                        kept))
+    
+    def _diffuse_lists(self, amounts, rate, offsets, boundary, kept):
+        '''Diffusion and decay of a resource (as diffuse) over nested 
+        lists of amounts, for use without NumPy.'''
+        shape = (self.world_x, self.world_y, self.world_z)
+        result = [[[(value or 0.0) * (1.0 - rate) for value in row] 
+                   for row in plane] for plane in amounts]
+        if len(offsets) > 0:
+            for x in range(shape[0]):
+                for y in range(shape[1]):
+                    for z in range(shape[2]):
+                        share = (amounts[x][y][z] or 0.0) * rate / \
+                            len(offsets)
+                        for (dx, dy, dz) in offsets:
+                            (i, j, k) = (x + dx, y + dy, z + dz)
+                            if boundary == 'toroidal':
+                                (i, j, k) = (i % shape[0], j % shape[1], 
+                                             k % shape[2])
+                            elif not (0 <= i < shape[0] and 
+                                      0 <= j < shape[1] and 
+                                      0 <= k < shape[2]):
+                                if boundary == 'reflecting':
+                                    result[x][y][z] += share
+                                continue
+                            result[i][j][k] += share
+        else:
+            result = [[[value or 0.0 for value in row] for row in plane] 
+                      for plane in amounts]
+        return [[[value * kept for value in row] for row in plane] 
+                for plane in result]
         
     def ecoregulate(self):
         '''
@@ -187,4 +595,349 @@ class World(object):
         @return: dictionary of status describing the current generation
         '''
         pass
-        
\ No newline at end of file
+        
+
+class _MissingCell(object):
+    '''Marker of a key which is not in an ecological cell.'''
+    def __repr__(self): return '<missing>'
+    def __reduce__(self): return '_missing_cell'
+
+class _EmptyList(object):
+    '''Marker of an empty list of an ecological cell, which is made 
+    when the list is used.'''
+    def __repr__(self): return '[]'
+    def __reduce__(self): return '_empty_list'
+
+_missing_cell = _MissingCell()
+_empty_list = _EmptyList()
+
+class CellView(MutableMapping):
+    '''
+    Ecological cell of a DenseWorld, which behaves as the dictionary of 
+    the ecological cell - reading and writing a key reads and writes the 
+    arrays of the world. A cell view is pickled and deep-copied as a 
+    dictionary.
+    '''
+    __slots__ = ('world', 'index')
+    
+    def __init__(self, world, index):
+        '''
+        Sets up a cell view.
+        
+        @param world: DenseWorld object
+        @param index: flat index of the ecological cell (see 
+        DenseWorld.index)
+        '''
+        self.world = world
+        self.index = index
+    
+    def __getitem__(self, key):
+        return self.world.get(self.index, key)
+    
+    def __setitem__(self, key, value):
+        self.world.set(self.index, key, value)
+    
+    def __delitem__(self, key):
+        if not self.world.has(self.index, key): raise KeyError(key)
+        self.world.set(self.index, key, _missing_cell)
+    
+    def __iter__(self):
+        return iter([key for key in self.world.fields
+                     if self.world.has(self.index, key)])
+    
+    def __len__(self):
+        return len(list(iter(self)))
+    
+    def __repr__(self):
+        return repr(dict(self))
+    
+    def copy(self):
+        '''Returns the ecological cell as a dictionary.'''
+        return dict(self)
+    
+    def __reduce__(self):
+        return (dict, (list(self.items()),))
+
+class EcosystemView(Mapping):
+    '''
+    Nested view of the ecological cells of a DenseWorld as 
+    World.ecosystem[x][y][z], where each level behaves as a dictionary 
+    keyed by the location on the axis. An ecosystem view is pickled and 
+    deep-copied as nested dictionaries.
+    '''
+    __slots__ = ('world', 'location', 'length', 'views')
+    
+    def __init__(self, world, location=()):
+        '''
+        Sets up an ecosystem view.
+        
+        @param world: DenseWorld object
+        @param location: locations on the axes above the view (such as 
+        (x,) for World.ecosystem[x]). Default = () for World.ecosystem.
+        '''
+        self.world = world
+        self.location = location
+        self.length = (world.world_x, world.world_y, 
+                       world.world_z)[len(location)]
+        # views of the next level (or flat index of the first cell)
+        if len(location) == 2:
+            self.views = world.index(location[0], location[1], 0)
+        else:
+            self.views = [None] * self.length
+    
+    def __getitem__(self, key):
+        if type(key) is not int or key < 0 or key >= self.length:
+            raise KeyError(key)
+        if type(self.views) is int:
+            return CellView(self.world, self.views + key)
+        view = self.views[key]
+        if view is None:
+            view = EcosystemView(self.world, self.location + (key,))
+            self.views[key] = view
+        return view
+    
+    def __setitem__(self, key, cell):
+        '''Replaces an ecological cell by a dictionary (only for views 
+        of World.ecosystem[x][y]).'''
+        if len(self.location) != 2:
+            raise TypeError('Only ecological cells can be replaced')
+        view = self[key]
+        for k in list(view.keys()): del view[k]
+        for k in cell: view[k] = cell[k]
+    
+    def __iter__(self):
+        return iter(range(len(self)))
+    
+    def __len__(self):
+        return self.length
+    
+    def __repr__(self):
+        return repr(self.copy())
+    
+    def copy(self):
+        '''Returns the view as nested dictionaries.'''
+        if len(self.location) == 2:
+            return dict([(key, dict(self[key])) for key in self])
+        return dict([(key, self[key].copy()) for key in self])
+    
+    def __reduce__(self):
+        return (dict, (list(self.copy().items()),))
+
+class DenseWorld(World):
+    '''
+    Representation of a 3-dimensional ecological world (as World) which 
+    keeps the ecosystem in flat, index-addressable structures instead of 
+    nested dictionaries. Each key of the ecological cells is kept as one 
+    flat list over all cells (in the order of DenseWorld.index), except 
+    the number of organisms which is kept as a NumPy integer array (if 
+    NumPy is installed). The empty lists of the cells are only made when 
+    they are used.
+    
+    DenseWorld.ecosystem is a view (see EcosystemView and CellView) which 
+    is used as World.ecosystem[x][y][z][key]; hence, simulation 
+    functions written for World work on DenseWorld. Whole-world 
+    operations can use DenseWorld.field for the values of a key over all 
+    cells.
+    '''
+    
+    def __init__(self, world_x, world_y, world_z):
+        '''
+        Setting up the world and ecosystem
+        
+        @param world_x: number of ecological cells on the x-axis
+        @type world_x: integer
+        @param world_y: number of ecological cells on the y-axis
+        @type world_y: integer
+        @param world_z: number of ecological cells on the z-axis
+        @type world_z: integer
+        '''
+        self.world_x = int(world_x)
+        self.world_y = int(world_y)
+        self.world_z = int(world_z)
+        self.dense = True
+        self.size = self.world_x * self.world_y * self.world_z
+        self.fields = {}
+        for key in ('local_input', 'local_output', 
+                    'temporary_input', 'temporary_output'):
+            self.fields[key] = [_empty_list] * self.size
+        if numpy != None:
+            self.fields['organisms'] = numpy.zeros(self.size, 
+                                                   dtype=numpy.int64)
+        else:
+            self.fields['organisms'] = [0] * self.size
+        self._view = None
+    
+    def __getstate__(self):
+        '''Returns the attributes of the world for pickling and copying, 
+        without the views of the ecosystem.'''
+        state = dict(self.__dict__)
+        state['_view'] = None
+        return state
+    
+    def _get_ecosystem(self):
+        if self._view is None: self._view = EcosystemView(self)
+        return self._view
+    
+    def _set_ecosystem(self, ecosystem):
+        '''Replaces the ecosystem by nested dictionaries of ecological 
+        cells (such as World.ecosystem of World).'''
+        world_x = len(ecosystem)
+        world_y = len(ecosystem[0])
+        world_z = len(ecosystem[0][0])
+        self.__init__(world_x, world_y, world_z)
+        for x in range(world_x):
+            for y in range(world_y):
+                for z in range(world_z):
+                    self.ecosystem[x][y][z] = ecosystem[x][y][z]
+    
+    ecosystem = property(_get_ecosystem, _set_ecosystem)
+    
+    def index(self, x, y, z):
+        '''
+        Returns the flat index of an ecological cell.
+        
+        @param x: location of the ecological cell on the x-axis
+        @param y: location of the ecological cell on the y-axis
+        @param z: location of the ecological cell on the z-axis
+        @return: flat index
+        '''
+        return (x * self.world_y + y) * self.world_z + z
+    
+    def location(self, index):
+        '''
+        Returns the location of an ecological cell from its flat index.
+        
+        @param index: flat index
+        @return: (x, y, z)
+        '''
+        (xy, z) = divmod(index, self.world_z)
+        (x, y) = divmod(xy, self.world_y)
+        return (x, y, z)
+    
+    def cell(self, x, y, z):
+        '''
+        Returns an ecological cell (World.ecosystem[x][y][z]).
+        
+        @return: CellView of the ecological cell
+        '''
+        return CellView(self, (x * self.world_y + y) * self.world_z + z)
+    
+    def has(self, index, key):
+        '''
+        Checks whether an ecological cell has a key.
+        
+        @param index: flat index of the ecological cell
+        @param key: key of the ecological cell
+        @return: True if the key is in the ecological cell
+        '''
+        values = self.fields.get(key)
+        if values is None: return False
+        if type(values) is list: return values[index] is not _missing_cell
+        return True
+    
+    def get(self, index, key):
+        '''
+        Returns the value of a key of an ecological cell.
+        
+        @param index: flat index of the ecological cell
+        @param key: key of the ecological cell
+        @return: value
+        @raise KeyError: if the key is not in the ecological cell
+        '''
+        values = self.fields.get(key)
+        if values is None: raise KeyError(key)
+        if type(values) is not list: return values.item(index)
+        value = values[index]
+        if value is _empty_list:
+            value = []
+            values[index] = value
+        elif value is _missing_cell: 
+            raise KeyError(key)
+        return value
+    
+    def set(self, index, key, value):
+        '''
+        Sets the value of a key of an ecological cell. A key which is kept 
+        as a NumPy array is changed to a list if the value is not an 
+        integer (or a number, for an array of floating point numbers).
+        
+        @param index: flat index of the ecological cell
+        @param key: key of the ecological cell
+        @param value: value
+        '''
+        values = self.fields.get(key)
+        if values is None:
+            values = [_missing_cell] * self.size
+            self.fields[key] = values
+        elif type(values) is not list:
+            if values.dtype.kind == 'f': 
+                numbers = (int, float, numpy.integer, numpy.floating)
+            else: 
+                numbers = (int, numpy.integer)
+            if isinstance(value, numbers) and not isinstance(value, bool):
+                try:
+                    values[index] = value
+                    return
+                except OverflowError: pass
+            values = values.tolist()
+            self.fields[key] = values
+        values[index] = value
+    
+    def field(self, key):
+        '''
+        Returns the values of a key over all ecological cells. A key kept 
+        as a NumPy array is returned as the array in the shape of the 
+        world (world_x, world_y, world_z), which can be changed in place. 
+        A key kept as a list is returned as nested lists (values[x][y][z]; 
+        None for cells without the key), as World.field.
+        
+        @param key: key of the ecological cells
+        @return: NumPy array or nested lists
+        '''
+        values = self.fields.get(key)
+        if values is None: 
+            values = [None] * self.size
+        elif type(values) is not list:
+            return values.reshape((self.world_x, self.world_y, 
+                                   self.world_z))
+        else:
+            values = [self.get(index, key) if self.has(index, key) else None
+                      for index in range(self.size)]
+        return [[values[(x * self.world_y + y) * self.world_z:
+                        (x * self.world_y + y + 1) * self.world_z]
+                 for y in range(self.world_y)]
+                for x in range(self.world_x)]
+    
+    def set_field(self, key, values):
+        '''
+        Sets the values of a key over all ecological cells. The values are 
+        kept as a NumPy array if they are given as a NumPy array of 
+        numbers (integers or floating point numbers), or if the key is 
+        kept as a NumPy array and the values are integers.
+        
+        @param key: key of the ecological cells
+        @param values: nested sequences of values (values[x][y][z]), such 
+        as a NumPy array in the shape of the world
+        '''
+        current = self.fields.get(key)
+        if numpy != None and (type(values) is numpy.ndarray or 
+                              (current is not None and 
+                               type(current) is not list)):
+            array = numpy.asarray(values)
+            if array.shape == (self.world_x, self.world_y, self.world_z) \
+                and array.dtype.kind in 'iuf':
+                if array.dtype.kind == 'f': dtype = numpy.float64
+                else: dtype = numpy.int64
+                if current is not None and type(current) is not list \
+                    and current.dtype == dtype:
+                    current[:] = array.reshape(self.size)
+                else:
+                    self.fields[key] = array.reshape(self.size).astype(dtype)
+                return
+        if numpy != None and type(values) is numpy.ndarray:
+            self.fields[key] = values.reshape(self.size).tolist()
+        else:
+            self.fields[key] = [values[x][y][z] 
+                                for x in range(self.world_x)
+                                for y in range(self.world_y)
+                                for z in range(self.world_z)]
@@ -6,12 +6,489 @@ Date created: 23rd February 2010
 Ling, MHT. 2010. A genetic algorithm framework grounded in biology.
 The Python Papers Source Codes 2: 6. 
 """
-import random, os, string
-from copy import deepcopy
+import random, os, string, heapq, math, gc, weakref
+from time import time
+from array import array
+from collections import OrderedDict
+from copy import copy
+from operator import attrgetter, methodcaller
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Encoding(object):
+    """
+    Encoding table of the bases of compact sequences (see CompactSequence), 
+    which maps each base to a one-byte code. A base which is not in the 
+    table is added when it is first encoded; hence, a table holds at most 
+    256 bases.
+    """
+    __slots__ = ('bases', 'codes')
+    
+    def __init__(self, bases=()):
+        """
+        Sets up an encoding table.
+        
+        @param bases: allowable bases, which are encoded in the given 
+            order (the first base as 0).
+        """
+        self.bases = []
+        self.codes = {}
+        for base in bases: self.encode(base)
+    
+    def encode(self, base):
+        """
+        Returns the code of a base, adding the base to the table if it is 
+        not in the table.
+        
+        @param base: base to encode
+        @return: code of the base
+        """
+        if base not in self.codes:
+            if len(self.bases) == 256:
+                raise ValueError('Encoding table cannot hold more than 256 '
+                                 'bases')
+            self.codes[base] = len(self.bases)
+            self.bases.append(base)
+        return self.codes[base]
+
+encodings = {}
+
+def encoding(bases):
+    """
+    Returns the shared encoding table of a list of bases, so that compact 
+    sequences of the same bases share one table.
+    
+    @param bases: list of allowable bases (such as chromosome_bases)
+    @return: Encoding object
+    """
+    key = tuple(bases)
+    if key not in encodings: encodings[key] = Encoding(key)
+    return encodings[key]
+
+class CompactSequence(object):
+    """
+    Compact representation of a chromosomal sequence, where each base is 
+    kept as a one-byte code (see Encoding) in an array instead of a Python 
+    object in a list. 
+    
+    A compact sequence behaves as a list of bases - indexing, iteration 
+    and list methods (append, extend, insert, pop, remove, index, count 
+    and reverse) take and give bases, slicing and concatenation give 
+    compact sequences, and it is equal to a list of the same bases; hence, 
+    mutation and crossover operators and consumers such as 
+    ''.join(sequence) work on either representation.
+    """
+    __slots__ = ('codes', 'encoding')
+    
+    def __init__(self, sequence=(), encoding=None):
+        """
+        Sets up a compact sequence.
+        
+        @param sequence: an iterable of bases (list, string or compact 
+            sequence).
+        @param encoding: Encoding object of the bases. Default = None, 
+            which creates a new encoding table.
+        """
+        if encoding == None: encoding = Encoding()
+        self.encoding = encoding
+        if isinstance(sequence, CompactSequence) and \
+            sequence.encoding is encoding:
+            self.codes = array('B', sequence.codes)
+        else:
+            self.codes = array('B', [encoding.encode(base) 
+                                     for base in sequence])
+    
+    def _wrap(self, codes):
+        """Returns a compact sequence of the same encoding over an array 
+        of codes (without copying the array)."""
+        sequence = CompactSequence.__new__(CompactSequence)
+        sequence.codes = codes
+        sequence.encoding = self.encoding
+        return sequence
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def __iter__(self):
+        bases = self.encoding.bases
+        return iter([bases[code] for code in self.codes])
+    
+    def __reversed__(self):
+        bases = self.encoding.bases
+        return iter([bases[code] for code in reversed(self.codes)])
+    
+    def __contains__(self, base):
+        return base in self.encoding.codes and \
+            self.encoding.codes[base] in self.codes
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._wrap(self.codes[index])
+        return self.encoding.bases[self.codes[index]]
+    
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.codes[index] = CompactSequence(value, self.encoding).codes
+        else:
+            self.codes[index] = self.encoding.encode(value)
+    
+    def __delitem__(self, index):
+        del self.codes[index]
+    
+    def __add__(self, other):
+        return self._wrap(self.codes + CompactSequence(other, 
+                                                       self.encoding).codes)
+    
+    def __radd__(self, other):
+        return self._wrap(CompactSequence(other, self.encoding).codes + 
+                          self.codes)
+    
+    def __mul__(self, count):
+        return self._wrap(self.codes * count)
+    
+    __rmul__ = __mul__
+    
+    def __eq__(self, other):
+        if isinstance(other, CompactSequence) and \
+            other.encoding is self.encoding:
+            return self.codes == other.codes
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return False
+    
+    def __ne__(self, other):
+        return not self.__eq__(other)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return repr(list(self))
+    
+    def __copy__(self):
+        return self._wrap(array('B', self.codes))
+    
+    def __deepcopy__(self, memo):
+        return self._wrap(array('B', self.codes))
+    
+    def __reduce__(self):
+        return (_compact_sequence, (tuple(self.encoding.bases), self.codes))
+    
+    def append(self, base):
+        self.codes.append(self.encoding.encode(base))
+    
+    def extend(self, sequence):
+        self.codes.extend(CompactSequence(sequence, self.encoding).codes)
+    
+    def insert(self, index, base):
+        self.codes.insert(index, self.encoding.encode(base))
+    
+    def pop(self, index=-1):
+        return self.encoding.bases[self.codes.pop(index)]
+    
+    def remove(self, base):
+        del self.codes[self.index(base)]
+    
+    def index(self, base, *args):
+        if base not in self.encoding.codes:
+            raise ValueError('%s is not in sequence' % str(base))
+        return self.codes.index(self.encoding.codes[base], *args)
+    
+    def count(self, base):
+        if base not in self.encoding.codes: return 0
+        return self.codes.count(self.encoding.codes[base])
+    
+    def reverse(self):
+        self.codes.reverse()
+
+def _compact_sequence(bases, codes):
+    """Reconstructs a pickled compact sequence with the shared encoding 
+    table of its bases."""
+    sequence = CompactSequence((), encoding(bases))
+    sequence.codes = codes
+    return sequence
+
+class PackedSequence(object):
+    """
+    Bit-packed representation of a chromosomal sequence of a small 
+    alphabet, where each base is kept as a code (see Encoding) of 1 bit 
+    (for 2 bases) or 2 bits (for 3 or 4 bases) in one integer - the base 
+    at position i is kept at bit i * width of the integer.
+    
+    A packed sequence behaves as a list of bases in the same way as 
+    CompactSequence. Slicing and concatenation (hence, crossover) are 
+    shifts and masks of the integers, point mutations are applied as one 
+    XOR mask (see mutate method) and the Hamming distance between packed 
+    sequences is counted from the XOR of the integers.
+    """
+    __slots__ = ('value', 'length', 'width', 'encoding')
+    
+    def __init__(self, sequence=(), encoding=None, width=None):
+        """
+        Sets up a packed sequence.
+        
+        @param sequence: an iterable of bases (list, string or packed 
+            sequence).
+        @param encoding: Encoding object of the bases. Default = None, 
+            which creates a new encoding table.
+        @param width: number of bits per base (1 or 2). Default = None, 
+            which uses 1 bit if the encoding table has not more than 2 
+            bases, or 2 bits otherwise.
+        """
+        if encoding == None: encoding = Encoding()
+        if width == None:
+            if len(encoding.bases) > 2: width = 2
+            else: width = 1
+        self.encoding = encoding
+        self.width = width
+        if isinstance(sequence, PackedSequence) and \
+            sequence.encoding is encoding and sequence.width == width:
+            self.value = sequence.value
+            self.length = sequence.length
+        else:
+            self.assign([self.encode(base) for base in sequence])
+    
+    def encode(self, base):
+        """
+        Returns the code of a base (see Encoding.encode), which must fit 
+        in the width of the packed sequence.
+        """
+        code = self.encoding.encode(base)
+        if code >> self.width:
+            raise ValueError('%s cannot be packed in %s bit(s) per base' % 
+                             (str(base), str(self.width)))
+        return code
+    
+    def assign(self, codes):
+        """Packs a list of codes as the sequence."""
+        pattern = '0%sb' % self.width
+        bits = ''.join([format(code, pattern) for code in reversed(codes)])
+        self.value = int(bits or '0', 2)
+        self.length = len(codes)
+    
+    def codes(self):
+        """Returns the list of codes of the sequence."""
+        if self.length == 0: return []
+        width = self.width
+        bits = format(self.value, 'b').zfill(self.length * width)
+        return [int(bits[i - width:i], 2) 
+                for i in range(len(bits), 0, -width)]
+    
+    def _wrap(self, value, length):
+        """Returns a packed sequence of the same encoding and width."""
+        sequence = PackedSequence.__new__(PackedSequence)
+        sequence.value = value
+        sequence.length = length
+        sequence.width = self.width
+        sequence.encoding = self.encoding
+        return sequence
+    
+    def _packed(self, other):
+        """Returns other sequence as a packed sequence of the same encoding 
+        and width."""
+        return PackedSequence(other, self.encoding, self.width)
+    
+    def _position(self, index):
+        """Returns the position of an index, as list indexing."""
+        if index < 0: index = index + self.length
+        if index < 0 or index >= self.length:
+            raise IndexError('sequence index out of range')
+        return index
+    
+    def __len__(self):
+        return self.length
+    
+    def __iter__(self):
+        bases = self.encoding.bases
+        return iter([bases[code] for code in self.codes()])
+    
+    def __reversed__(self):
+        bases = self.encoding.bases
+        return iter([bases[code] for code in reversed(self.codes())])
+    
+    def __contains__(self, base):
+        return base in self.encoding.codes and \
+            self.encoding.codes[base] in self.codes()
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            (start, stop, step) = index.indices(self.length)
+            if step != 1:
+                return self._packed(list(self)[index])
+            length = max(0, stop - start)
+            return self._wrap((self.value >> (start * self.width)) & 
+                              ((1 << (length * self.width)) - 1), length)
+        shift = self._position(index) * self.width
+        return self.encoding.bases[(self.value >> shift) & 
+                                   ((1 << self.width) - 1)]
+    
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            sequence = list(self)
+            sequence[index] = list(value)
+            self.assign([self.encode(base) for base in sequence])
+        else:
+            self.mutate({self._position(index): value})
+    
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            sequence = list(self)
+            del sequence[index]
+            self.assign([self.encode(base) for base in sequence])
+        else:
+            self.pop(index)
+    
+    def __add__(self, other):
+        other = self._packed(other)
+        return self._wrap(self.value | 
+                          (other.value << (self.length * self.width)), 
+                          self.length + other.length)
+    
+    def __radd__(self, other):
+        return self._packed(other) + self
+    
+    def __mul__(self, count):
+        return self._packed(list(self) * count)
+    
+    __rmul__ = __mul__
+    
+    def __eq__(self, other):
+        if isinstance(other, PackedSequence) and \
+            other.encoding is self.encoding and other.width == self.width:
+            return self.length == other.length and self.value == other.value
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return False
+    
+    def __ne__(self, other):
+        return not self.__eq__(other)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return repr(list(self))
+    
+    def __copy__(self):
+        return self._wrap(self.value, self.length)
+    
+    def __deepcopy__(self, memo):
+        return self._wrap(self.value, self.length)
+    
+    def __reduce__(self):
+        return (_packed_sequence, (tuple(self.encoding.bases), self.width, 
+                                   self.value, self.length))
+    
+    def append(self, base):
+        self.insert(self.length, base)
+    
+    def extend(self, sequence):
+        other = self._packed(sequence)
+        self.value = self.value | (other.value << (self.length * self.width))
+        self.length = self.length + other.length
+    
+    def insert(self, index, base):
+        if index < 0: index = max(0, index + self.length)
+        index = min(index, self.length)
+        shift = index * self.width
+        low = self.value & ((1 << shift) - 1)
+        self.value = low | (self.encode(base) << shift) | \
+            ((self.value >> shift) << (shift + self.width))
+        self.length = self.length + 1
+    
+    def pop(self, index=-1):
+        if self.length == 0 or index >= self.length or \
+            index < -self.length:
+            raise IndexError('pop index out of range')
+        base = self[index]
+        shift = self._position(index) * self.width
+        low = self.value & ((1 << shift) - 1)
+        self.value = low | ((self.value >> (shift + self.width)) << shift)
+        self.length = self.length - 1
+        return base
+    
+    def remove(self, base):
+        self.pop(self.index(base))
+    
+    def index(self, base, *args):
+        if base not in self.encoding.codes:
+            raise ValueError('%s is not in sequence' % str(base))
+        return self.codes().index(self.encoding.codes[base], *args)
+    
+    def count(self, base):
+        if base not in self.encoding.codes: return 0
+        return self.codes().count(self.encoding.codes[base])
+    
+    def reverse(self):
+        self.assign(list(reversed(self.codes())))
+    
+    def mutate(self, points):
+        """
+        Point mutations - replaces the bases at the given positions by 
+        XOR of the sequence with one mask.
+        
+        @param points: dictionary of position to new base
+        """
+        mask = 0
+        bits = (1 << self.width) - 1
+        for position in points:
+            shift = self._position(position) * self.width
+            code = self.encode(points[position])
+            mask = mask | ((((self.value >> shift) & bits) ^ code) << shift)
+        self.value = self.value ^ mask
+    
+    def hamming_distance(self, other):
+        """
+        Returns the number of positions with different bases, over the 
+        length of the shorter sequence. 
+        
+        @param other: other sequence (any iterable of bases), which is 
+            compared by XOR if it is a packed sequence of the same encoding 
+            and width.
+        @return: Hamming distance
+        """
+        if not (isinstance(other, PackedSequence) and 
+                other.encoding is self.encoding and 
+                other.width == self.width):
+            return sum([base1 != base2 for (base1, base2) in zip(self, other)])
+        length = min(self.length, other.length)
+        difference = (self.value ^ other.value) & \
+            ((1 << (length * self.width)) - 1)
+        if self.width == 2:
+            difference = (difference | (difference >> 1)) & \
+                int('01' * length or '0', 2)
+        return bin(difference).count('1')
+
+def _packed_sequence(bases, width, value, length):
+    """Reconstructs a pickled packed sequence with the shared encoding 
+    table of its bases."""
+    sequence = PackedSequence((), encoding(bases), width)
+    sequence.value = value
+    sequence.length = length
+    return sequence
 
 class Chromosome(object):
     """
     Representation of a linear chromosome.
+    
+    The sequence may be kept as a list, as a compact sequence (see 
+    CompactSequence), which keeps each base in one byte, or as a packed 
+    sequence (see PackedSequence), which keeps each base of an alphabet 
+    of up to 4 bases in 1 or 2 bits.
+    
+    Replicated chromosomes share one sequence (copy-on-write) until one of 
+    them is mutated - the mutation operators (rmutate, kmutate and 
+    population_mutation function) take a copy of a shared sequence before 
+    changing it. Hence, the sequence of a chromosome should only be 
+    changed in place after calling unshare method.
 
     @see: Lim, JZR, Aw, ZQ, Goh, DJW, How, JA, Low, SXZ, Loo, BZL,
     Ling, MHT. 2010. A genetic algorithm framework grounded in biology.
@@ -19,8 +496,11 @@ class Chromosome(object):
     
     @since: version 0.4
     """
+    __slots__ = ('sequence', 'base', 'background_mutation', 'shared', 
+                 '_key')
+    
     def __init__(self, sequence, base, 
-                 background_mutation=0.0001):
+                 background_mutation=0.0001, compact=False, packed=False):
         """
         Sets up a chromosome.
         
@@ -31,12 +511,41 @@ class Chromosome(object):
         @param background_mutation: background mutation rate represented as the 
             probability of number of mutations per base. Default = 0.0001 
             (0.01%).
+        @param compact: keep the sequence as a compact sequence, encoded by 
+            the shared encoding table of the bases (see encoding function). 
+            Default = False.
+        @param packed: keep the sequence as a packed sequence, encoded by 
+            the shared encoding table of the bases, if there are not more 
+            than 4 bases (otherwise, as a compact sequence). Default = False.
             
         @since: version 0.4
         """
+        if packed and len(base) > 4: compact = True
+        if packed and not isinstance(sequence, PackedSequence):
+            sequence = PackedSequence(sequence, encoding(base))
+        elif compact and not isinstance(sequence, CompactSequence):
+            sequence = CompactSequence(sequence, encoding(base))
         self.sequence = sequence
         self.base = base
         self.background_mutation = background_mutation
+        self.shared = False
+        self._key = None
+    
+    def __getstate__(self):
+        """Returns the attributes of the chromosome for pickling and 
+        copying."""
+        state = dict(getattr(self, '__dict__', {}))
+        for name in Chromosome.__slots__:
+            if name != '_key': state[name] = getattr(self, name)
+        return state
+    
+    def __setstate__(self, state):
+        """Restores the attributes of the chromosome from pickling and 
+        copying, including chromosomes pickled before __slots__."""
+        self.shared = False
+        self._key = None
+        for name in state:
+            setattr(self, name, state[name])
     
     def rmutate(self, type='point', rate=0.01, start=0, end=-1):
         """
@@ -67,6 +576,16 @@ class Chromosome(object):
         if start == end: start = 0
         length = int(end - start)
         mutation = int((self.background_mutation + rate) * length)
+        if mutation > 0: self.unshare()
+        if type == 'point' and isinstance(self.sequence, PackedSequence):
+            # same random positions and bases as the point mutations below, 
+            # applied to the packed sequence as one mask
+            points = {}
+            while mutation > 0:
+                position = int(start) + random.randrange(length - 1)
+                points[position] = self.base[random.randrange(len(self.base))]
+                mutation = mutation - 1
+            self.sequence.mutate(points)
         while mutation > 0:
             position = int(start) + random.randrange(length - 1)
             new_base = self.base[random.randrange(len(self.base))]
@@ -138,6 +657,7 @@ class Chromosome(object):
             
         @since: version 0.4
         """
+        self.unshare()
         if type == 'point':
             self.sequence[start] = sequence
         if type == 'delete': 
@@ -158,15 +678,51 @@ class Chromosome(object):
             for i in range(len(fragment)):
                 self.sequence.insert(tpos + i, fragment[i])
 
+    def unshare(self):
+        """
+        Takes a copy of the sequence if it is shared with a replicated 
+        chromosome, so that the sequence can be changed in place, and 
+        discards the content key of the sequence (see content_key).
+        """
+        if self.shared:
+            self.sequence = copy(self.sequence)
+            self.shared = False
+        self._key = None
+    
+    def content_key(self):
+        """
+        Returns a hashable key of the content of the sequence, such as for 
+        FitnessCache. The key is kept until the sequence is replaced or 
+        changed by the mutation operators (which call unshare method).
+        
+        @return: key of the sequence
+        """
+        sequence = self.sequence
+        if self._key == None or self._key[0] is not sequence:
+            if isinstance(sequence, CompactSequence):
+                key = ('compact', tuple(sequence.encoding.bases), 
+                       sequence.codes.tobytes())
+            elif isinstance(sequence, PackedSequence):
+                key = ('packed', tuple(sequence.encoding.bases), 
+                       sequence.width, sequence.value, sequence.length)
+            else:
+                key = tuple(sequence)
+            self._key = (sequence, key)
+        return self._key[1]
+    
     def replicate(self):
         """
-        Replicates (deep copy) the chromosome.
+        Replicates the chromosome, which shares the sequence with the 
+        chromosome until either of them is mutated (copy-on-write).
         
         @return: a copy of current chromosome.
         
         @since: version 0.4
         """
-        return deepcopy(self)
+        chromosome = copy(self)
+        chromosome.shared = True
+        self.shared = True
+        return chromosome
  
         
 class Organism(object):
@@ -194,11 +750,14 @@ class Organism(object):
         8. gender - gender of organism. 
         9. blood - result of genomic interpretation or expression by 
         Rajaraga interpreter.
-        10. identity - 32-character randomly generated name.
+        10. identity - 32-character randomly generated name, or serial 
+        number (see generate_names function).
         11. deme - defined as a sub-population or local population.
         12. location - location of the organism within the ecosystem.
         13. generation - current generation count.
-
+    
+    The status table is a dictionary, or a view of a row of a 
+    PopulationFrame (see StatusView) which behaves as a dictionary.
     
     List of defined death codes
         1. death01 - zero vitality
@@ -258,20 +817,16 @@ class Organism(object):
         self.additional_mutation_rate = additional_mutation_rate
         self.status['gender'] = gender
         
-    def generate_name(self):
-        name = ''.join([random.choice(('1', '2', '3', '4', '5', '6', '7',
-                                       '8', '9', 'A', 'B', 'C', 'D', 'E',
-                                       'F', 'G', 'H', 'I', 'J', 'K', 'L',
-                                       'M', 'N', 'O', 'P', 'Q', 'R', 'S',
-                                       'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
-                                       'a', 'b', 'c', 'd', 'e', 'f', 'g',
-                                       'h', 'i', 'j', 'k', 'l', 'm', 'n',
-                                       'o', 'p', 'q', 'r', 's', 't', 'u',
-                                       'v', 'w', 'x', 'y', 'z', '=', '#',
-                                       '$', '%', '&', '@', '<', '>', '?'
-                                       )) for x in range(32)])
-
-        self.status['identity'] = name
+    def generate_name(self, type=None):
+        """
+        Generates the identity of the organism (see generate_names 
+        function) as Organism.status['identity'].
+        
+        @param type: type of identity. Accepts 'random' (32-character 
+            randomly generated name) or 'serial' (serial number). 
+            Default = None, which uses identity_type.
+        """
+        self.status['identity'] = generate_names(1, type)[0]
         
     def fitness(self):
         """
@@ -378,15 +933,590 @@ class Organism(object):
         
     def clone(self):
         """
-        Cloness (deep copy) the organism.
+        Clones the organism - the chromosomes are replicated (sharing the 
+        sequences until mutated; see Chromosome.replicate) and the status 
+        is copied as a new dictionary, where list and dictionary values 
+        (such as the blood, which is changed in place by interpretation) 
+        are copied so that they are not shared with the organism. As with 
+        a deep copy, a chromosome found at more than one position of the 
+        genome (such as the genome built by population_constructor) is 
+        replicated once, and the replica is found at the same positions.
         
         @return: a copy of current organism.
         
         @since: version 0.4
         """
-        org = deepcopy(self)
+        org = copy(self)
+        replicas = {}
+        org.genome = []
+        for chromosome in self.genome:
+            if id(chromosome) not in replicas:
+                replicas[id(chromosome)] = chromosome.replicate()
+            org.genome.append(replicas[id(chromosome)])
+        org.status = dict(self.status)
+        for (key, value) in org.status.items():
+            if type(value) in (list, dict): org.status[key] = copy(value)
         return org
         
+name_characters = ('1', '2', '3', '4', '5', '6', '7', '8', '9', 
+                   'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 
+                   'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 
+                   'U', 'V', 'W', 'X', 'Y', 'Z', 
+                   'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 
+                   'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 
+                   'u', 'v', 'w', 'x', 'y', 'z', 
+                   '=', '#', '$', '%', '&', '@', '<', '>', '?')
+
+# default type of identity and last serial number given as identity 
+# (see generate_names)
+identity_type = 'random'
+serial_identity = [0]
+
+def generate_names(count, type=None, length=32):
+    """
+    Generates identities for a number of organisms in one go.
+    
+    Random names are drawn from name_characters by the random module 
+    (hence, reproducible by seeding the random module) as one stream 
+    of characters, which is cut into names. Serial numbers are 
+    increasing integers which are unique within the process; the last 
+    given serial number is kept in serial_identity, which can be set to 
+    continue from an earlier simulation. Serial numbers are stored 
+    (such as in the logging database) as their decimal string.
+    
+    @param count: number of identities to generate
+    @type count: integer
+    @param type: type of identity. Accepts 'random' (randomly generated 
+        names) or 'serial' (serial numbers). Default = None, which uses 
+        identity_type ('random' unless changed).
+    @param length: number of characters of random names. Default = 32.
+    @return: list of identities (strings for random names or integers 
+        for serial numbers)
+    """
+    if type == None: type = identity_type
+    if type == 'serial':
+        start = serial_identity[0] + 1
+        serial_identity[0] = serial_identity[0] + count
+        return list(range(start, start + count))
+    elif type == 'random':
+        characters = ''.join(random.choices(name_characters, 
+                                            k=count * length))
+        return [characters[i:i + length] 
+                for i in range(0, count * length, length)]
+    raise ValueError('Unknown identity type: ' + str(type))
+
+def name_organisms(organisms, type=None):
+    """
+    Generates the identities of organisms (see generate_names function) 
+    as Organism.status['identity'].
+    
+    @param organisms: list of Organism objects
+    @param type: type of identity. Accepts 'random' or 'serial'. 
+        Default = None, which uses identity_type.
+    """
+    names = generate_names(len(organisms), type)
+    for i in range(len(organisms)):
+        organisms[i].status['identity'] = names[i]
+
+class StatusView(MutableMapping):
+    """
+    Status of an organism (Organism.status) kept as one row of a 
+    PopulationFrame. A status view behaves as a dictionary of the status 
+    - reading and writing a status reads and writes the columns of the 
+    frame. A status view which is dropped from its frame (see 
+    PopulationFrame.compact) keeps the status as a dictionary instead.
+    
+    A status view is pickled and deep-copied as a dictionary.
+    """
+    __slots__ = ('frame', 'row', 'data')
+    
+    def __init__(self, frame, row):
+        """
+        Sets up a status view.
+        
+        @param frame: PopulationFrame object
+        @param row: row of the status in the frame
+        """
+        self.frame = frame
+        self.row = row
+        self.data = None
+    
+    def __getitem__(self, key):
+        if self.frame == None: return self.data[key]
+        return self.frame.get(self.row, key)
+    
+    def __setitem__(self, key, value):
+        if self.frame == None: self.data[key] = value
+        else: self.frame.set(self.row, key, value)
+    
+    def __delitem__(self, key):
+        if self.frame == None: del self.data[key]
+        else: self.frame.set(self.row, key, _missing_status)
+    
+    def __iter__(self):
+        if self.frame == None: return iter(self.data)
+        return iter([key for key in self.frame.keys
+                     if self.frame.has(self.row, key)])
+    
+    def __len__(self):
+        return len(list(iter(self)))
+    
+    def __repr__(self):
+        return repr(dict(self))
+    
+    def copy(self):
+        """Returns the status as a dictionary."""
+        return dict(self)
+    
+    def detach(self):
+        """Keeps the status as a dictionary, away from the frame."""
+        if self.frame != None:
+            self.data = dict(self)
+            self.frame = None
+            self.row = None
+    
+    def __reduce__(self):
+        return (dict, (list(self.items()),))
+
+class _MissingStatus(object):
+    """Marker of a status which is not in the status of an organism."""
+    def __repr__(self): return '<missing status>'
+
+_missing_status = _MissingStatus()
+
+status_columns = {'alive': 'bool', 'vitality': 'float64', 
+                  'age': 'float64', 'lifespan': 'float64', 
+                  'fitness': 'float64', 'generation': 'int64'}
+
+status_keys = ['alive', 'vitality', 'parents', 'age', 'gender', 'lifespan', 
+               'fitness', 'blood', 'identity', 'deme', 'location', 
+               'generation', 'death']
+
+class PopulationFrame(object):
+    """
+    Columnar (struct-of-arrays) store of the status of the organisms of a 
+    population - the status of each organism (Organism.status) is a row of 
+    the frame, viewed by a StatusView. Age, vitality, lifespan and fitness 
+    are kept as float columns, alive as a boolean column, generation as 
+    an integer column and location as a 3-column integer array (with a 
+    mask of located organisms) in NumPy arrays; the other status are kept 
+    as columns of Python objects. A numeric column takes an integer or a 
+    float for float columns (read back as floats), a boolean for the alive 
+    column, an integer for the generation column, and None or 3 integers 
+    for the location column (read back as a tuple); otherwise, the column 
+    is turned into a column of Python objects for all rows.
+    
+    Filters (select method), aggregates (statistics method) and status 
+    changes with the death rules of Organism.setStatus (set_status method)
+    of a list of organisms run over the columns of their rows.
+    
+    Organisms are added to the frame by attach or update method; rows of 
+    organisms which are no longer in the population are dropped by 
+    compact method.
+    
+    This class requires NumPy (http://www.numpy.org/).
+    """
+    def __init__(self, organisms=(), capacity=1024):
+        """
+        Sets up a population frame.
+        
+        @param organisms: list of Organism objects to attach. Default = ().
+        @param capacity: initial number of rows, which is doubled when the 
+            rows are full. Default = 1024.
+        """
+        if numpy == None:
+            raise ImportError('PopulationFrame requires NumPy')
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        self.keys = list(status_keys)
+        self.columns = dict([(key, numpy.zeros(self.capacity, 
+                                               dtype=status_columns[key]))
+                             for key in status_columns])
+        self.location = numpy.zeros((self.capacity, 3), dtype=numpy.int64)
+        self.located = numpy.zeros(self.capacity, dtype=bool)
+        self.objects = {}
+        for key in self.keys:
+            if key not in status_columns and key != 'location':
+                self.objects[key] = [_missing_status] * self.capacity
+        self.views = []
+        self.organisms = []
+        self.attach(organisms)
+    
+    def _grow(self, size):
+        """Extends the rows to hold at least the given number of rows."""
+        capacity = self.capacity
+        while capacity < size: capacity = capacity * 2
+        if capacity == self.capacity: return
+        extra = capacity - self.capacity
+        for key in self.columns:
+            column = self.columns[key]
+            if column.dtype == object:
+                padding = numpy.empty(extra, dtype=object)
+                padding.fill(_missing_status)
+            else:
+                padding = numpy.zeros(extra, dtype=column.dtype)
+            self.columns[key] = numpy.concatenate([column, padding])
+        if self.location.dtype == object:
+            padding = numpy.empty(extra, dtype=object)
+            padding.fill(None)
+            self.location = numpy.concatenate([self.location, padding])
+        else:
+            self.location = numpy.concatenate([self.location, 
+                numpy.zeros((extra, 3), dtype=numpy.int64)])
+        self.located = numpy.concatenate([self.located, 
+                                          numpy.zeros(extra, dtype=bool)])
+        for key in self.objects:
+            self.objects[key].extend([_missing_status] * extra)
+        self.capacity = capacity
+    
+    def _demote(self, key):
+        """Turns a numeric column into a column of Python objects."""
+        if key == 'location':
+            column = numpy.empty(self.capacity, dtype=object)
+            column.fill(None)
+            for row in numpy.nonzero(self.located)[0].tolist():
+                column[row] = tuple(self.location[row].tolist())
+            self.location = column
+            self.located[:] = True
+        else:
+            self.columns[key] = self.columns[key].astype(object)
+    
+    def has(self, row, key):
+        """Checks whether the status of a row has a status variable."""
+        if key in self.objects: 
+            return self.objects[key][row] is not _missing_status
+        if key == 'location': 
+            return self.location[row] is not _missing_status
+        return self.columns[key][row] is not _missing_status
+    
+    def get(self, row, key):
+        """
+        Returns a status variable of a row.
+        
+        @param row: row of the status
+        @param key: name of the status variable
+        @return: status or a KeyError if status is not found
+        """
+        if key in self.objects:
+            value = self.objects[key][row]
+        elif key == 'location':
+            if self.location.dtype == object: 
+                value = self.location[row]
+            elif self.located[row]: 
+                return tuple(self.location[row].tolist())
+            else: 
+                return None
+        elif key in self.columns:
+            value = self.columns[key][row]
+            if isinstance(value, numpy.generic): value = value.item()
+        else:
+            raise KeyError(key)
+        if value is _missing_status: raise KeyError(key)
+        return value
+    
+    def set(self, row, key, value):
+        """
+        Sets a status variable of a row.
+        
+        @param row: row of the status
+        @param key: name of the status variable
+        @param value: new value of the status
+        """
+        if key == 'location':
+            if self.location.dtype != object:
+                if value == None:
+                    self.located[row] = False
+                    return
+                if type(value) in (tuple, list) and len(value) == 3 and \
+                    len([x for x in value if type(x) is int]) == 3:
+                    self.location[row] = value
+                    self.located[row] = True
+                    return
+                self._demote(key)
+            self.location[row] = value
+        elif key in self.columns:
+            column = self.columns[key]
+            if column.dtype != object:
+                dtype = status_columns[key]
+                if type(value) is bool: fits = dtype == 'bool'
+                elif type(value) is int: 
+                    fits = dtype != 'bool' and -2**63 <= value < 2**63
+                elif type(value) is float: fits = dtype == 'float64'
+                else: fits = False
+                if not fits: 
+                    self._demote(key)
+                    column = self.columns[key]
+            column[row] = value
+        else:
+            if key not in self.objects:
+                self.objects[key] = [_missing_status] * self.capacity
+                self.keys.append(key)
+            self.objects[key][row] = value
+    
+    def _fill(self, start, key, values):
+        """Sets a status variable of consecutive rows from a list of 
+        values, over the columns where the values fit."""
+        end = start + len(values)
+        types = set(map(type, values))
+        if key in self.objects:
+            self.objects[key][start:end] = values
+            return
+        if key == 'location' and self.location.dtype != object and \
+            types <= set([tuple, list, type(None)]):
+            located = [value != None for value in values]
+            points = [value for value in values if value != None]
+            if len([point for point in points if len(point) == 3 and 
+                    type(point[0]) is int and type(point[1]) is int and 
+                    type(point[2]) is int]) == len(points):
+                self.located[start:end] = located
+                if len(points) > 0:
+                    self.location[numpy.nonzero(located)[0] + start] = points
+                return
+        elif key in self.columns and self.columns[key].dtype != object:
+            allowed = {'bool': set([bool]), 'float64': set([int, float]),
+                       'int64': set([int])}[status_columns[key]]
+            if types <= allowed:
+                try:
+                    self.columns[key][start:end] = values
+                    return
+                except OverflowError: pass
+        elif key not in self.columns and key != 'location':
+            self.objects[key] = [_missing_status] * self.capacity
+            self.keys.append(key)
+            self.objects[key][start:end] = values
+            return
+        for i in range(len(values)):
+            self.set(start + i, key, values[i])
+    
+    def attach(self, organisms):
+        """
+        Keeps the status of organisms in the frame - the status of each 
+        organism is added as a row and replaced by a StatusView of the row.
+        
+        @param organisms: list of Organism objects
+        """
+        statuses = [dict(organism.status) for organism in organisms]
+        start = self.size
+        self._grow(start + len(statuses))
+        self.size = start + len(statuses)
+        keys = list(self.keys)
+        extra = set().union(*statuses).difference(keys)
+        for status in statuses:
+            for key in status:
+                if key in extra and key not in keys: keys.append(key)
+        for key in keys:
+            self._fill(start, key, 
+                       list(map(methodcaller('get', key, _missing_status), 
+                                statuses)))
+        for i in range(len(organisms)):
+            view = StatusView(self, start + i)
+            self.views.append(view)
+            self.organisms.append(organisms[i])
+            organisms[i].status = view
+    
+    def rows(self, organisms):
+        """
+        Returns the rows of a list of organisms.
+        
+        @param organisms: list of Organism objects, or None for all rows
+        @return: array of rows, or None if the status of any organism is 
+            not kept in the frame
+        """
+        if organisms is None: return numpy.arange(self.size)
+        statuses = list(map(attrgetter('status'), organisms))
+        if len(set(map(type, statuses))) > 1 or \
+            (len(statuses) > 0 and type(statuses[0]) is not StatusView):
+            return None
+        frames = set(map(attrgetter('frame'), statuses))
+        if len(frames) > 1 or (len(frames) == 1 and self not in frames):
+            return None
+        return numpy.fromiter(map(attrgetter('row'), statuses), 
+                              dtype=numpy.int64, count=len(statuses))
+    
+    def column(self, key, rows=None):
+        """
+        Returns a column of status.
+        
+        @param key: name of the status variable
+        @param rows: array of rows. Default = None, all rows.
+        @return: array of the status
+        """
+        if rows is None: rows = numpy.arange(self.size)
+        if key == 'location': return self.location[rows]
+        if key in self.columns: return self.columns[key][rows]
+        if key in self.objects: 
+            column = numpy.empty(len(rows), dtype=object)
+            objects = self.objects[key]
+            for i in range(len(rows)): column[i] = objects[rows[i]]
+            return column
+        raise KeyError(key)
+    
+    def select(self, organisms, key, condition):
+        """
+        Filters a list of organisms by a status variable in the same way 
+        as dose.filter_status function (or dose.filter_location function 
+        for location).
+        
+        @param organisms: list of Organism objects kept in the frame, or 
+            None for all organisms in the frame
+        @param key: name of the status variable
+        @param condition: a unique condition, or a range as (minimum, 
+            maximum) of the condition. For location, the (x, y, z) 
+            location.
+        @return: List of Organism objects, or None if the status cannot be 
+            filtered over the columns
+        """
+        rows = self.rows(organisms)
+        if rows is None: return None
+        if organisms is None: organisms = self.organisms[:self.size]
+        if key == 'location':
+            if self.location.dtype == object or \
+                type(condition) is not tuple or len(condition) != 3 or \
+                len([x for x in condition if type(x) is int]) != 3:
+                return None
+            selected = self.located[rows] & \
+                (self.location[rows] == condition).all(axis=1)
+            return [organisms[i] 
+                    for i in numpy.nonzero(selected)[0].tolist()]
+        if key not in self.columns: return None
+        column = self.columns[key][rows]
+        if column.dtype == object: return None
+        if type(condition) in (str, int, float, bool):
+            if type(condition) is str: return None
+            selected = column == condition
+        else:
+            selected = (column > float(condition[0]) - 0.01) & \
+                       (column < float(condition[1]) + 0.01)
+        return [organisms[i] for i in numpy.nonzero(selected)[0].tolist()]
+    
+    def statistics(self, key, organisms=None):
+        """
+        Returns the summary statistics of a numeric status variable.
+        
+        @param key: name of the status variable
+        @param organisms: list of Organism objects kept in the frame. 
+            Default = None, all organisms in the frame.
+        @return: dictionary of count, mean, minimum, maximum and total, or 
+            None if the status cannot be aggregated over the columns
+        """
+        rows = self.rows(organisms)
+        if rows is None or key not in self.columns: return None
+        column = self.columns[key][rows]
+        if column.dtype == object: return None
+        column = column.astype(numpy.float64)
+        if len(column) == 0:
+            return {'count': 0, 'mean': None, 'minimum': None, 
+                    'maximum': None, 'total': 0.0}
+        return {'count': len(column), 'mean': float(column.mean()),
+                'minimum': float(column.min()), 
+                'maximum': float(column.max()), 
+                'total': float(column.sum())}
+    
+    def set_status(self, organisms, variable, values):
+        """
+        Sets a status variable of a list of organisms with the death rules 
+        of Organism.setStatus method over the columns.
+        
+        @param organisms: list of Organism objects, or None for all 
+            organisms in the frame
+        @param variable: name of status to change
+        @param values: new value of the status for all organisms, or a 
+            list of values of each organism
+        """
+        rows = self.rows(organisms)
+        if organisms is None: organisms = self.organisms[:self.size]
+        if rows is None or variable not in ('vitality', 'age') or \
+            self.columns['alive'].dtype == object or \
+            self.columns[variable].dtype == object or \
+            (variable == 'age' and 
+             self.columns['lifespan'].dtype == object):
+            if type(values) not in (list, tuple) and \
+                not isinstance(values, numpy.ndarray):
+                values = [values] * len(organisms)
+            for (organism, value) in zip(organisms, values):
+                organism.setStatus(variable, value)
+            return
+        values = numpy.zeros(len(rows), dtype=numpy.float64) + \
+                 numpy.asarray(values, dtype=numpy.float64)
+        column = self.columns[variable]
+        if variable == 'vitality':
+            column[rows[values > 100.1]] = 100.0
+            selected = (values > 0.0) & (values < 100.1)
+            column[rows[selected]] = values[selected]
+            dead = rows[values <= 0]
+            column[dead] = 0
+            cause = 'death01'
+        else:
+            lifespan = self.columns['lifespan'][rows]
+            selected = values < lifespan
+            column[rows[selected]] = values[selected]
+            dead = rows[~selected]
+            column[dead] = lifespan[~selected]
+            cause = 'death02'
+        self.columns['alive'][dead] = False
+        death = self.objects['death']
+        for row in dead.tolist(): death[row] = cause
+    
+    def update(self, organisms):
+        """
+        Attaches the organisms which are not kept in the frame (such as 
+        new offsprings), and compacts the frame if more than half of the 
+        rows are no longer in the list of organisms.
+        
+        @param organisms: list of Organism objects (such as the agents of 
+            a population)
+        """
+        self.attach([organism for organism in organisms
+                     if type(organism.status) is not StatusView or
+                     organism.status.frame is not self])
+        if self.size > 2 * len(organisms): self.compact(organisms)
+    
+    def compact(self, organisms):
+        """
+        Drops the rows of organisms which are not in a list of organisms, 
+        by moving the rows of the organisms to the front of the frame. The 
+        status views of dropped rows keep their status as dictionaries.
+        
+        @param organisms: list of Organism objects kept in the frame (such 
+            as the agents of a population)
+        """
+        rows = self.rows(organisms)
+        if rows is None: 
+            raise ValueError('Status of organisms are not in the frame')
+        kept = numpy.zeros(self.size, dtype=bool)
+        kept[rows] = True
+        for row in numpy.nonzero(~kept[:self.size])[0].tolist():
+            self.views[row].detach()
+        order = numpy.nonzero(kept)[0]
+        size = len(order)
+        for key in self.columns:
+            self.columns[key][:size] = self.columns[key][order]
+        self.location[:size] = self.location[order]
+        self.located[:size] = self.located[order]
+        order = order.tolist()
+        for key in self.objects:
+            objects = self.objects[key]
+            objects[:size] = [objects[row] for row in order]
+            objects[size:self.size] = [_missing_status] * (self.size - size)
+        self.views = [self.views[row] for row in order]
+        self.organisms = [self.organisms[row] for row in order]
+        for row in range(size): self.views[row].row = row
+        self.size = size
+
+def status_frame(organisms):
+    """
+    Returns the PopulationFrame which keeps the status of the first of a 
+    list of organisms.
+    
+    @param organisms: list of Organism objects
+    @return: PopulationFrame object, or None if the status of the first 
+        organism is not kept in a frame
+    """
+    if len(organisms) == 0: return None
+    status = organisms[0].status
+    if type(status) is not StatusView: return None
+    return status.frame
+
 class Population(object):
     """
     Representation of a population as a list of organisms. The entire 
@@ -406,7 +1536,8 @@ class Population(object):
     @since: version 0.4
     """
     
-    def __init__(self, goal, maxgenerations='infinite', agents=[]):
+    def __init__(self, goal, maxgenerations='infinite', agents=None, 
+                 fitness_cache=None, pool=None, locations=None):
         """
         Establishes a population of organisms.
         
@@ -414,15 +1545,51 @@ class Population(object):
         @type goal: the return type of Organism.fitness()
         @param maxgenerations: maximum number of generations to evolve.
             Default = 'infinite'.
-        @param agents: organisms making up the initial population.
+        @param agents: organisms making up the initial population. 
+            Default = None (no organism).
         @type agents: list of Organism objects
+        @param fitness_cache: FitnessCache object to keep the fitness of 
+            the organisms. Default = None (no cache).
+        @param pool: OrganismPool object to recycle dead organisms. 
+            Default = None (no pool).
+        @param locations: LocationIndex object of the organisms by 
+            location (see index_locations). Default = None (no index).
         
         @since: version 0.4
         """
+        if agents == None: agents = []
         self.agents = agents
         self.goal = goal
         self.maxgenerations = maxgenerations
         self.generation = 0
+        self.fitness_cache = fitness_cache
+        self.pool = pool
+        self.offsprings = []
+        self.locations = locations
+    
+    def __getstate__(self):
+        """Returns the attributes of the population for pickling and 
+        copying, without the fitness cache."""
+        state = dict(self.__dict__)
+        if 'fitness_cache' in state: state['fitness_cache'] = None
+        return state
+    
+    def fitness(self, organism, function=None):
+        """
+        Returns the fitness of an organism, from the fitness cache of the 
+        population if used (the fitness cache is not kept in copies of 
+        the population).
+        
+        @param organism: Organism object
+        @param function: function taking an organism and returning its 
+            fitness. Default = None, which uses Organism.fitness method of 
+            the organism.
+        @return: fitness score or fitness list
+        """
+        cache = getattr(self, 'fitness_cache', None)
+        if cache != None: return cache.fitness(organism, function)
+        if function == None: return organism.fitness()
+        return function(organism)
     
     def prepopulation_control(self):
         """
@@ -443,7 +1610,7 @@ class Population(object):
         @since: version 0.4
         """
         size = len(self.agents)
-        sfitness = [self.agents[x].fitness() for x in range(size)]
+        sfitness = [self.fitness(self.agents[x]) for x in range(size)]
         threshold = sum(sfitness) / len(sfitness)
         temp = [self.agents[x]
                 for x in range(size) 
@@ -479,7 +1646,7 @@ class Population(object):
             crossover_pt = random.randint(0, len(organism1.genome[0].sequence))
             (g1, g2) = crossover(organism1.genome[0], organism2.genome[0],
                                  crossover_pt)
-            temp = temp + [Organism([g1])]
+            temp.append(self.new_organism([g1]))
         self.add_organism(temp)
             
     def postpopulation_control(self):
@@ -521,7 +1688,7 @@ class Population(object):
         
         @since: version 0.4
         """
-        sfitness = [self.agents[x].fitness() 
+        sfitness = [self.fitness(self.agents[x]) 
                     for x in range(len(self.agents))]
         afitness = sum(sfitness) / float(len(self.agents))
         return {'generation': self.generation,
@@ -549,16 +1716,144 @@ class Population(object):
         for organism in self.agents:
             organism.mutation_scheme() 
         self.generation_events()
+        self.swap_generation()
         self.generation = self.generation + 1
         return self.report()
     
     def add_organism(self, organism):
         """Add a new organism(s) to the population.
         
-        @param organism: list of new Organism object(s)
+        @param organism: list of new Organism object(s), which are 
+            appended to the list of organisms in place
         
         @since: version 0.4"""
-        self.agents = self.agents + organism
+        self.agents.extend(organism)
+        if getattr(self, 'locations', None) != None:
+            self.locations.add(organism)
+    
+    def new_organism(self, genome='dummy', mutation_type='point',
+                     additional_mutation_rate=0.01, gender=None):
+        """
+        Returns a new organism (as Organism class), which is recycled from 
+        the organism pool of the population if used.
+        
+        @return: Organism object
+        """
+        if getattr(self, 'pool', None) == None:
+            return Organism(genome, mutation_type, additional_mutation_rate,
+                            gender)
+        return self.pool.organism(genome, mutation_type, 
+                                  additional_mutation_rate, gender)
+    
+    def add_offspring(self, organisms):
+        """
+        Adds new organism(s) into the next generation buffer of the 
+        population, which is added to the population at the end of the 
+        generation (see swap_generation) - hence, the new organisms are 
+        not seen by the population controls and events of the current 
+        generation.
+        
+        @param organisms: list of new Organism object(s)
+        """
+        if getattr(self, 'offsprings', None) == None: self.offsprings = []
+        self.offsprings.extend(organisms)
+    
+    def swap_generation(self):
+        """
+        Ends a generation by swapping in the next generation - the 
+        surviving organisms and the organisms in the next generation 
+        buffer (see add_offspring), in one replacement of the list of 
+        organisms. The list of organisms of the ended generation is 
+        emptied and reused as the next generation buffer.
+        
+        If the population has an organism pool, dead organisms 
+        (Organism.status['alive'] is False) are removed and released 
+        into the pool (and the surviving objects are frozen if the pool 
+        is set up to do so; see OrganismPool.freeze_generation); 
+        otherwise, all organisms survive. The location index of the 
+        population, if kept, is updated with the dead organisms and the 
+        next generation.
+        """
+        offsprings = getattr(self, 'offsprings', None) or []
+        pool = getattr(self, 'pool', None)
+        if len(offsprings) == 0 and pool == None: return
+        agents = self.agents
+        locations = getattr(self, 'locations', None)
+        if locations != None: locations.add(offsprings)
+        if pool != None:
+            survivors = [organism for organism in agents 
+                         if organism.status['alive'] is not False]
+            if len(survivors) < len(agents):
+                dead = [organism for organism in agents 
+                        if organism.status['alive'] is False]
+                if locations != None: locations.remove(dead)
+                pool.release(dead, survivors + offsprings)
+            offsprings[0:0] = survivors
+        else:
+            offsprings[0:0] = agents
+        self.agents = offsprings
+        del agents[:]
+        self.offsprings = agents
+        if pool != None: pool.freeze_generation()
+    
+    def index_locations(self, world=None, counted=True):
+        """
+        Sets up an index of the organisms of the population by location 
+        (see LocationIndex), which is kept up to date by add_organism, 
+        swap_generation, move_organism and update_locations, and used by 
+        dose.filter_location function to find the organisms in an 
+        ecological cell.
+        
+        @param world: dose_world.World object to keep the number of 
+            organisms of the ecological cells consistent with the index. 
+            Default = None (no world).
+        @param counted: the organisms are already counted in the 
+            ecological cells of the world. Default = True.
+        @return: LocationIndex object
+        """
+        self.locations = LocationIndex(self.agents, world, counted)
+        return self.locations
+    
+    def move_organism(self, organism, location):
+        """
+        Moves an organism to a new location (Organism.status['location']), 
+        updating the location index of the population and the number of 
+        organisms of the ecological cells of the world, if kept (see 
+        index_locations).
+        
+        @param organism: Organism object
+        @param location: new location as (x, y, z)
+        """
+        if getattr(self, 'locations', None) == None:
+            organism.status['location'] = location
+        else:
+            self.locations.move(organism, location)
+    
+    def update_locations(self):
+        """
+        Brings the location index of the population, if kept, up to date 
+        with the organisms of the population - for organisms added into, 
+        or removed from, the list of organisms (Population.agents) 
+        directly, and for locations changed without move_organism.
+        """
+        if getattr(self, 'locations', None) != None:
+            self.locations.update(self.agents)
+    
+    def reproduce(self, pairs, points=None, type='single', number=2, 
+                  rate=0.5, both=True):
+        """
+        Produces the offsprings of pairs of organisms of the population by 
+        crossover (see reproduce function), and adds them to the 
+        population.
+        
+        @param pairs: list of pairs of indices of parents in the list of 
+            organisms (Population.agents)
+        @return: list of new Organism objects
+        """
+        offsprings = reproduce(self.agents, pairs, points, type, number, 
+                               rate, both, getattr(self, 'pool', None))
+        self.add_organism(offsprings)
+        return offsprings
         
     def freeze(self, prefix='pop', proportion=0.01):
         """
@@ -618,6 +1913,685 @@ class Population(object):
         if type == 'add':
             self.agents = self.agents + pickle.load(open(filename, 'rb'))
 
+class FitnessCache(object):
+    """
+    Least recently used (LRU) cache of fitness scores, keyed by the 
+    content of the genomes (see Chromosome.content_key), to skip computing 
+    the fitness of a genome which had been scored before - such as an 
+    organism which is not mutated since the last fitness measurement, or 
+    the clones of an organism. A cache can be shared by all the organisms 
+    of a population.
+    
+    The content keys are kept by the chromosomes and discarded when a 
+    chromosome is changed by the mutation operators (rmutate, kmutate and 
+    population_mutation function); crossover gives new chromosomes. 
+    Hence, the cache is only correct for one fitness function, which only 
+    depends on the genome of the organism.
+    """
+    def __init__(self, size=10000):
+        """
+        Sets up a fitness cache.
+        
+        @param size: maximum number of fitness scores to keep. 
+            Default = 10000.
+        """
+        self.size = size
+        self.scores = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def fitness(self, organism, function=None):
+        """
+        Returns the fitness of an organism, computing it if the genome of 
+        the organism had not been scored.
+        
+        @param organism: Organism object
+        @param function: function taking an organism and returning its 
+            fitness. Default = None, which uses Organism.fitness method of 
+            the organism.
+        @return: fitness score or fitness list
+        """
+        if function == None: function = type(organism).fitness
+        try:
+            key = tuple([chromosome.content_key() 
+                         for chromosome in organism.genome])
+            hash(key)
+        except TypeError:
+            return function(organism)
+        if key in self.scores:
+            self.hits = self.hits + 1
+            score = self.scores.pop(key)
+            self.scores[key] = score
+            return score
+        self.misses = self.misses + 1
+        score = function(organism)
+        self.scores[key] = score
+        if len(self.scores) > self.size:
+            self.scores.popitem(last=False)
+        return score
+    
+    def clear(self):
+        """Removes all fitness scores from the cache."""
+        self.scores.clear()
+    
+    def counters(self):
+        """
+        Returns the number of cache hits and misses since the cache is 
+        initialized or since the counters are reset.
+        
+        @return: (hits, misses)
+        """
+        return (self.hits, self.misses)
+    
+    def hit_rate(self):
+        """
+        Returns the proportion of cache hits in the fitness measurements 
+        since the cache is initialized or since the counters are reset.
+        
+        @return: hit rate (0.0 if there is no measurement)
+        """
+        if self.hits + self.misses == 0: return 0.0
+        return float(self.hits) / (self.hits + self.misses)
+    
+    def reset_counters(self):
+        """Reset the number of cache hits and misses to zero."""
+        self.hits = 0
+        self.misses = 0
+
+class OrganismPool(object):
+    """
+    Pool of recycled organisms and chromosomes, to cut the allocation of 
+    new objects (and the garbage collections triggered by allocations) 
+    when a population turns over in every generation. Dead organisms are 
+    released into the pool (see Population.swap_generation) and new 
+    organisms are taken from the pool (see Population.new_organism and 
+    reproduce function), re-initialized as new organisms of the given 
+    genome - the status is reset to the default status of a new 
+    organism, and the list of chromosomes and the chromosomes are reused.
+    
+    A released organism must not be used anymore, as the object will be 
+    given out as a new organism. Only organisms of Organism class (not 
+    inherited classes) are recycled.
+    
+    The pool also counts the organisms allocated and recycled, and the 
+    garbage collections of the Python interpreter (by gc.callbacks) 
+    with their duration, which can be reported in every generation. The 
+    callback holds the pool by a weak reference and is removed when the 
+    pool is closed or freed; copies of a pool (by pickling or copying) 
+    do not count the garbage collections.
+    
+    Organisms do not make reference cycles, so the collections mostly 
+    scan the long-lived organisms; the pool can move all objects 
+    surviving a generation out of the scans of the garbage collector 
+    (by gc.freeze). Frozen objects are still freed when they are no 
+    longer referenced, but frozen objects in reference cycles are never 
+    collected - hence, freezing should only be used if the objects of 
+    the simulation do not make reference cycles.
+    """
+    def __init__(self, size=10000, freeze=False):
+        """
+        Sets up a pool of organisms.
+        
+        @param size: maximum number of organisms (and of chromosomes) to 
+            keep in the pool. Default = 10000.
+        @param freeze: move all objects out of the scans of the garbage 
+            collector at the end of every generation (see 
+            freeze_generation). Default = False.
+        """
+        self._setup(size, freeze)
+        self._collector = _collection_counter(weakref.ref(self))
+        gc.callbacks.append(self._collector)
+        weakref.finalize(self, _remove_collection_counter, self._collector)
+    
+    def _setup(self, size, freeze):
+        """Sets up an empty pool with zero counters."""
+        self.size = size
+        self.freeze = freeze
+        self.organisms = []
+        self.chromosomes = []
+        self.allocated = 0
+        self.recycled = 0
+        self.released = 0
+        self.collections = 0
+        self.collected = 0
+        self.collection_time = 0.0
+        self._collection_start = None
+        self._collector = None
+        # default status of a new organism
+        self._status = Organism([]).status
+    
+    def _count_collection(self, phase, info):
+        """Counts the garbage collections and their duration (called by 
+        the callback of the garbage collector)."""
+        if phase == 'start':
+            self._collection_start = time()
+        elif self._collection_start != None:
+            self.collections = self.collections + 1
+            self.collected = self.collected + info['collected']
+            self.collection_time = self.collection_time + \
+                time() - self._collection_start
+            self._collection_start = None
+    
+    def freeze_generation(self):
+        """
+        Moves all objects (of the Python interpreter) out of the scans 
+        of the garbage collector, if the pool is set up to do so and 
+        gc.freeze is available (Python 3.7 or later).
+        """
+        if self.freeze and hasattr(gc, 'freeze'): gc.freeze()
+    
+    def close(self):
+        """Stops counting the garbage collections."""
+        _remove_collection_counter(self._collector)
+        self._collector = None
+    
+    def __getstate__(self):
+        """Returns the settings of the pool for pickling and copying, 
+        without the pooled objects and counters."""
+        return {'size': self.size, 'freeze': self.freeze}
+    
+    def __setstate__(self, state):
+        """Sets up an empty pool from pickling and copying, which does 
+        not count the garbage collections."""
+        self._setup(state['size'], state['freeze'])
+    
+    def chromosome(self, sequence, base, background_mutation=0.0001):
+        """
+        Returns a chromosome from the pool (or a new chromosome if the 
+        pool is empty), set up as Chromosome(sequence, base, 
+        background_mutation).
+        
+        @return: Chromosome object
+        """
+        if len(self.chromosomes) == 0:
+            return Chromosome(sequence, base, background_mutation)
+        chromosome = self.chromosomes.pop()
+        chromosome.sequence = sequence
+        chromosome.base = base
+        chromosome.background_mutation = background_mutation
+        chromosome.shared = False
+        chromosome._key = None
+        return chromosome
+    
+    def organism(self, genome='dummy', mutation_type='point',
+                 additional_mutation_rate=0.01, gender=None):
+        """
+        Returns an organism from the pool (or a new organism if the pool 
+        is empty), set up as a new organism by Organism.__init__.
+        
+        @return: Organism object
+        """
+        if len(self.organisms) == 0:
+            self.allocated = self.allocated + 1
+            return Organism(genome, mutation_type, additional_mutation_rate, 
+                            gender)
+        self.recycled = self.recycled + 1
+        organism = self.organisms.pop()
+        # reuse the status dictionary and the list of chromosomes
+        if type(organism.status) is dict:
+            organism.status.clear()
+            organism.status.update(self._status)
+        else:
+            organism.status = dict(self._status)
+        organism.status['gender'] = gender
+        if genome == 'dummy':
+            genome = [self.chromosome([0], [0])]
+        if type(genome) is list and type(organism.genome) is list:
+            organism.genome[:] = genome
+        else:
+            organism.genome = genome
+        organism.mutation_type = mutation_type
+        organism.additional_mutation_rate = additional_mutation_rate
+        return organism
+    
+    def release(self, organisms, survivors=()):
+        """
+        Releases dead organisms into the pool. Their chromosomes are 
+        released with them (without their sequences, which may be shared 
+        by replicated chromosomes), except the chromosomes, lists of 
+        chromosomes and status dictionaries which are still held by the 
+        surviving organisms - such as the chromosomes of a parent passed 
+        on unchanged to an offspring by crossover at the end of the 
+        chromosome (see crossover function).
+        
+        @param organisms: list of Organism objects, which must not be used 
+            anymore
+        @param survivors: list of Organism objects which are still used 
+            (such as the next generation). Default = () (none).
+        """
+        pooled = set([id(chromosome) for chromosome in self.chromosomes])
+        # objects which are held by the surviving organisms, or which are 
+        # already recycled with another dead organism
+        used = set()
+        for organism in survivors:
+            used.add(id(organism.genome))
+            used.add(id(organism.status))
+            for chromosome in organism.genome: used.add(id(chromosome))
+        for organism in organisms:
+            if type(organism) is not Organism: continue
+            self.released = self.released + 1
+            if len(self.organisms) >= self.size: continue
+            if isinstance(organism.status, StatusView):
+                organism.status.detach()
+            if id(organism.status) in used: organism.status = None
+            else: used.add(id(organism.status))
+            for chromosome in organism.genome:
+                if type(chromosome) is Chromosome and \
+                    id(chromosome) not in pooled and \
+                    id(chromosome) not in used and \
+                    len(self.chromosomes) < self.size:
+                    chromosome.sequence = None
+                    pooled.add(id(chromosome))
+                    self.chromosomes.append(chromosome)
+            if type(organism.genome) is not list or \
+                id(organism.genome) in used:
+                organism.genome = []
+            else:
+                used.add(id(organism.genome))
+                del organism.genome[:]
+            self.organisms.append(organism)
+    
+    def counters(self):
+        """
+        Returns the number of organisms allocated, recycled and released, 
+        and the number of garbage collections, the number of objects 
+        collected and the duration of the collections (in seconds), since 
+        the pool is set up or since the counters are reset.
+        
+        @return: (allocated, recycled, released, collections, collected, 
+            collection time)
+        """
+        return (self.allocated, self.recycled, self.released, 
+                self.collections, self.collected, self.collection_time)
+    
+    def reset_counters(self):
+        """Reset the counters to zero."""
+        self.allocated = 0
+        self.recycled = 0
+        self.released = 0
+        self.collections = 0
+        self.collected = 0
+        self.collection_time = 0.0
+
+class LocationIndex(object):
+    """
+    Index of the organisms of a population by ecological cell 
+    (Organism.status['location']), to find the organisms in an 
+    ecological cell without scanning the population. The index is 
+    updated by moving organisms through the index (see move and 
+    Population.move_organism), and by adding and removing organisms 
+    (see Population.add_organism and Population.swap_generation); 
+    changes to the list of organisms or to the locations made outside 
+    these functions are picked up by update.
+    
+    If a world is given, the number of organisms of the ecological cells 
+    (World.ecosystem[x][y][z]['organisms']) is changed with every 
+    organism added, removed or moved by the index. The world is not 
+    kept when the index is pickled or copied.
+    """
+    def __init__(self, organisms=(), world=None, counted=True):
+        """
+        Sets up an index of organisms by location.
+        
+        @param organisms: list of organisms to index. Default = () (no 
+            organism).
+        @param world: dose_world.World object to keep the number of 
+            organisms of the ecological cells. Default = None (no world).
+        @param counted: the organisms are already counted in the 
+            ecological cells of the world (such as after deployment), 
+            hence, the number of organisms of the ecological cells is not 
+            changed. Default = True.
+        """
+        self.world = None
+        self.cells = {}
+        self.members = {}
+        self.add(organisms)
+        self.world = world
+        if not counted:
+            for (organism, location) in self.members.values():
+                self._shift(location, 1)
+    
+    def __getstate__(self):
+        """Returns the organisms and their locations for pickling and 
+        copying, without the world."""
+        return {'members': list(self.members.values())}
+    
+    def __setstate__(self, state):
+        """Sets up the index from pickling and copying."""
+        self.world = None
+        self.cells = {}
+        self.members = {}
+        for (organism, location) in state['members']:
+            self._insert(organism, location)
+    
+    def _insert(self, organism, location):
+        """Adds an organism into the index at a location."""
+        key = id(organism)
+        self.members[key] = (organism, location)
+        if location not in self.cells: self.cells[location] = {}
+        self.cells[location][key] = organism
+    
+    def _delete(self, key):
+        """Removes an organism (by its id) from the index, and returns 
+        its location in the index."""
+        (organism, location) = self.members.pop(key)
+        cell = self.cells[location]
+        del cell[key]
+        if len(cell) == 0: del self.cells[location]
+        return location
+    
+    def add(self, organisms):
+        """
+        Adds organisms into the index at their locations.
+        
+        @param organisms: list of Organism objects
+        """
+        for organism in organisms:
+            key = id(organism)
+            if key in self.members:
+                if self.members[key][0] is organism: continue
+                self._shift(self._delete(key), -1)
+            location = _location_key(organism.status['location'])
+            self._insert(organism, location)
+            self._shift(location, 1)
+    
+    def remove(self, organisms):
+        """
+        Removes organisms from the index.
+        
+        @param organisms: list of Organism objects
+        """
+        for organism in organisms:
+            key = id(organism)
+            if key in self.members and self.members[key][0] is organism:
+                self._shift(self._delete(key), -1)
+    
+    def _shift(self, location, change):
+        """Changes the number of organisms of an ecological cell of the 
+        world."""
+        if self.world == None or location == None: return
+        cell = self.world.cell(location[0], location[1], location[2])
+        cell['organisms'] = cell['organisms'] + change
+    
+    def move(self, organism, location):
+        """
+        Moves an organism to a location (Organism.status['location']), 
+        adding it into the index if it is not indexed.
+        
+        @param organism: Organism object
+        @param location: new location as (x, y, z)
+        """
+        self.remove([organism])
+        organism.status['location'] = location
+        self.add([organism])
+    
+    def organisms(self, location):
+        """
+        Returns the organisms at a location.
+        
+        @param location: location as (x, y, z)
+        @return: list of Organism objects
+        """
+        location = _location_key(location)
+        if location not in self.cells: return []
+        return list(self.cells[location].values())
+    
+    def count(self, location):
+        """
+        Returns the number of organisms at a location.
+        
+        @param location: location as (x, y, z)
+        @return: number of organisms
+        """
+        location = _location_key(location)
+        if location not in self.cells: return 0
+        return len(self.cells[location])
+    
+    def locations(self):
+        """
+        Returns the locations with organisms.
+        
+        @return: list of locations
+        """
+        return list(self.cells.keys())
+    
+    def update(self, organisms):
+        """
+        Brings the index up to date with a list of organisms - organisms 
+        not in the list are removed, organisms not in the index are 
+        added and organisms with changed locations are moved.
+        
+        @param organisms: list of Organism objects, such as 
+            Population.agents
+        """
+        current = dict([(id(organism), organism) for organism in organisms])
+        for key in list(self.members.keys()):
+            (organism, location) = self.members[key]
+            if current.get(key) is not organism or \
+                _location_key(organism.status['location']) != location:
+                self._shift(self._delete(key), -1)
+        self.add([organism for (key, organism) in current.items() 
+                  if key not in self.members])
+
+def _location_key(location):
+    """Returns a location as a tuple (to be used as dictionary key)."""
+    if location == None: return None
+    return tuple(location)
+
+def _collection_counter(reference):
+    """Returns the callback of the garbage collector for an organism 
+    pool, which holds the pool by a weak reference."""
+    def counter(phase, info):
+        pool = reference()
+        if pool != None: pool._count_collection(phase, info)
+    return counter
+
+def _remove_collection_counter(counter):
+    """Removes the callback of the garbage collector for an organism 
+    pool, if registered."""
+    if counter != None and counter in gc.callbacks:
+        gc.callbacks.remove(counter)
+
+class AliasTable(object):
+    """
+    Alias table (Walker's alias method, as constructed by Vose's method) 
+    of a discrete distribution, to draw an index with probability 
+    proportional to its weight in constant time. The table is constructed 
+    in linear time.
+    """
+    __slots__ = ('probability', 'alias')
+    
+    def __init__(self, weights):
+        """
+        Constructs the alias table of a list of weights.
+        
+        @param weights: list of non-negative weights (such as fitness 
+            scores). If all weights are zero, every index is equally 
+            likely.
+        """
+        count = len(weights)
+        if count == 0:
+            raise ValueError('Alias table needs at least one weight')
+        if min(weights) < 0:
+            raise ValueError('Weights cannot be negative')
+        total = float(sum(weights))
+        if total > 0: scaled = [weight * count / total for weight in weights]
+        else: scaled = [1.0] * count
+        self.probability = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i in range(count) if scaled[i] < 1.0]
+        large = [i for i in range(count) if scaled[i] >= 1.0]
+        while len(small) > 0 and len(large) > 0:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0: small.append(more)
+            else: large.append(more)
+    
+    def draw(self, count=1):
+        """
+        Draws indices from the distribution (with replacement).
+        
+        @param count: number of indices to draw. Default = 1.
+        @return: list of indices
+        """
+        probability = self.probability
+        alias = self.alias
+        size = len(probability)
+        indices = []
+        for x in range(count):
+            index = random.randrange(size)
+            if random.random() < probability[index]: indices.append(index)
+            else: indices.append(alias[index])
+        return indices
+
+def _weighted_sample(weights, count):
+    """
+    Draws indices without replacement with probability proportional to 
+    their weights (Efraimidis and Spirakis, 2006) - each index is given a 
+    random key of log(u) / weight, and the indices of the largest keys are 
+    drawn. Indices of zero weight are drawn after all the others.
+    """
+    if count > len(weights):
+        raise ValueError('Sample larger than population')
+    if len(weights) > 0 and min(weights) < 0:
+        raise ValueError('Weights cannot be negative')
+    keys = []
+    for weight in weights:
+        if weight > 0: 
+            keys.append(math.log(1.0 - random.random()) / weight)
+        else: 
+            keys.append(float('-inf'))
+    indices = heapq.nlargest(count, range(len(weights)), 
+                             key=keys.__getitem__)
+    drawn = len([i for i in indices if keys[i] != float('-inf')])
+    if drawn < count:
+        # indices of zero weight are drawn at random
+        rest = [i for i in range(len(weights)) if keys[i] == float('-inf')]
+        indices = indices[:drawn] + random.sample(rest, count - drawn)
+    return indices
+
+def proportionate_selection(fitness, count=1, replacement=True):
+    """
+    Fitness-proportionate (roulette wheel) selection - draws indices with 
+    probability proportional to their fitness scores, by an alias table 
+    (see AliasTable) with replacement, or by weighted random sampling 
+    without replacement.
+    
+    @param fitness: list of non-negative fitness scores
+    @param count: number of indices to draw. Default = 1.
+    @param replacement: draw with replacement (an index may be drawn more 
+        than once). Default = True.
+    @return: list of indices
+    """
+    if count == 0: return []
+    if replacement: return AliasTable(fitness).draw(count)
+    return _weighted_sample(fitness, count)
+
+def rank_selection(fitness, count=1, replacement=True):
+    """
+    Linear rank selection - draws indices with probability proportional to 
+    their rank of fitness (1 for the lowest fitness to n for the highest 
+    fitness of n scores, where ties are ranked in order), with or without 
+    replacement (see proportionate_selection).
+    
+    @param fitness: list of fitness scores
+    @param count: number of indices to draw. Default = 1.
+    @param replacement: draw with replacement. Default = True.
+    @return: list of indices
+    """
+    ranks = [0] * len(fitness)
+    order = sorted(range(len(fitness)), key=fitness.__getitem__)
+    for rank in range(len(order)): ranks[order[rank]] = rank + 1
+    return proportionate_selection(ranks, count, replacement)
+
+def tournament_selection(fitness, count=1, size=2, replacement=True):
+    """
+    Tournament selection - draws each index as the fittest of a number of 
+    indices drawn at random (the first drawn among ties). Without 
+    replacement, drawn indices are swapped out of the candidates in 
+    constant time.
+    
+    @param fitness: list of fitness scores
+    @param count: number of indices to draw. Default = 1.
+    @param size: number of indices in each tournament. Default = 2.
+    @param replacement: draw with replacement. Default = True.
+    @return: list of indices
+    """
+    if not replacement and count > len(fitness):
+        raise ValueError('Sample larger than population')
+    candidates = list(range(len(fitness)))
+    remaining = len(candidates)
+    indices = []
+    for x in range(count):
+        best = random.randrange(remaining)
+        for y in range(min(size, remaining) - 1):
+            position = random.randrange(remaining)
+            if fitness[candidates[position]] > fitness[candidates[best]]:
+                best = position
+        indices.append(candidates[best])
+        if not replacement:
+            remaining = remaining - 1
+            candidates[best] = candidates[remaining]
+            candidates[remaining] = indices[-1]
+    return indices
+
+def truncation_selection(fitness, count=1):
+    """
+    Truncation selection - selects the indices of the fittest scores, 
+    fittest first (partitioned by numpy.argpartition if NumPy is 
+    available).
+    
+    @param fitness: list of fitness scores
+    @param count: number of indices to select. Default = 1.
+    @return: list of indices
+    """
+    if count > len(fitness):
+        raise ValueError('Sample larger than population')
+    if count == 0: return []
+    if numpy == None:
+        return heapq.nlargest(count, range(len(fitness)), 
+                              key=fitness.__getitem__)
+    scores = numpy.asarray(fitness, dtype=numpy.float64)
+    indices = numpy.argpartition(-scores, count - 1)[:count]
+    indices = indices[numpy.argsort(-scores[indices], kind='mergesort')]
+    return indices.tolist()
+
+def stochastic_universal_sampling(fitness, count=1):
+    """
+    Stochastic universal sampling - draws indices with probability 
+    proportional to their fitness scores by equally spaced pointers from 
+    one random start, which gives each index between floor and ceiling 
+    of its expected number of draws. Indices are drawn with replacement 
+    and in the order of the scores.
+    
+    @param fitness: list of non-negative fitness scores. If all scores are 
+        zero, every index is equally likely.
+    @param count: number of indices to draw. Default = 1.
+    @return: list of indices
+    """
+    if count == 0: return []
+    if len(fitness) == 0:
+        raise ValueError('Cannot select from an empty population')
+    if min(fitness) < 0:
+        raise ValueError('Fitness scores cannot be negative')
+    weights = fitness
+    if sum(weights) <= 0: weights = [1.0] * len(fitness)
+    step = float(sum(weights)) / count
+    pointer = random.uniform(0, step)
+    indices = []
+    cumulative = 0.0
+    index = -1
+    for x in range(count):
+        while cumulative <= pointer and index < len(weights) - 1:
+            index = index + 1
+            cumulative = cumulative + weights[index]
+        indices.append(index)
+        pointer = pointer + step
+    return indices
+
 def crossover(chromosome1, chromosome2, position):
     """
     Cross-over operator - swaps the data on the 2 given chromosomes after 
@@ -658,6 +2632,272 @@ def crossover(chromosome1, chromosome2, position):
     else:
         return (chromosome1, chromosome2)        
             
+def population_mutation(organisms, type='point', rate=0.01, 
+                        counts='fixed'):
+    """
+    Population-level Random Mutation operator - mutates every chromosome 
+    in the genome of every organism as Chromosome.rmutate(type, rate) 
+    does, but the point mutations of chromosomes of the same length and 
+    bases are drawn at once (the number of mutations, positions and new 
+    bases of all the chromosomes in one NumPy call each) and applied 
+    together - compact sequences (see CompactSequence) as a stacked 
+    matrix of codes, packed sequences (see PackedSequence) as one mask 
+    per sequence and lists by assignment of the mutated positions.
+    
+    The positions are drawn from the same range as Chromosome.rmutate but 
+    the random numbers are drawn from a NumPy generator (seeded from the 
+    random module), hence, in a different order. Other types of mutation, 
+    chromosomes shorter than 3 bases, or all chromosomes if NumPy is not 
+    available, are mutated by Chromosome.rmutate.
+    
+    @param organisms: list of Organism objects (such as the agents of a 
+        population)
+    @param type: type of mutation (see Chromosome.rmutate). Default = 
+        point.
+    @param rate: probability of mutation per base above background
+        mutation rate. Default = 0.01 (1%).
+    @param counts: number of point mutations in each chromosome. Accepts 
+        'fixed' (int((background_mutation + rate) * (length - 1)) 
+        mutations, as Chromosome.rmutate), 'binomial' (drawn from the 
+        binomial distribution of (length - 1) bases at probability of 
+        (background_mutation + rate)) or 'poisson' (drawn from the Poisson 
+        distribution of the same mean). Default = fixed.
+    """
+    if counts not in ('fixed', 'binomial', 'poisson'):
+        raise ValueError('Unknown mutation counts: ' + str(counts))
+    groups = {}
+    for organism in organisms:
+        for chromosome in organism.genome:
+            length = len(chromosome.sequence)
+            if numpy == None or type != 'point' or length < 3:
+                chromosome.rmutate(type, rate)
+                continue
+            sequence = chromosome.sequence
+            if isinstance(sequence, CompactSequence): 
+                kind = sequence.encoding
+            else: 
+                kind = isinstance(sequence, PackedSequence)
+            key = (length, tuple(chromosome.base), kind)
+            if key not in groups: groups[key] = []
+            groups[key].append(chromosome)
+    if len(groups) == 0: return
+    generator = numpy.random.RandomState(random.getrandbits(32))
+    for key in groups:
+        (length, bases, kind) = key
+        chromosomes = groups[key]
+        probability = numpy.array([chromosome.background_mutation + rate 
+                                   for chromosome in chromosomes])
+        if counts == 'fixed':
+            count = (probability * (length - 1)).astype(numpy.int64)
+            count[count < 0] = 0
+        elif counts == 'binomial':
+            count = generator.binomial(length - 1, 
+                                       numpy.clip(probability, 0, 1))
+        else:
+            count = generator.poisson(numpy.clip(probability, 0, None) * 
+                                      (length - 1))
+        rows = numpy.repeat(numpy.arange(len(chromosomes)), count)
+        positions = generator.randint(0, length - 2, len(rows))
+        choices = generator.randint(0, len(bases), len(rows))
+        if len(rows) == 0: continue
+        if isinstance(kind, Encoding):
+            codes = numpy.array([kind.encode(base) for base in bases], 
+                                dtype=numpy.uint8)
+            matrix = b''.join([chromosome.sequence.codes.tobytes()
+                               for chromosome in chromosomes])
+            matrix = numpy.frombuffer(matrix, dtype=numpy.uint8)
+            matrix = matrix.reshape(len(chromosomes), length).copy()
+            matrix[rows, positions] = codes[choices]
+            for i in numpy.unique(rows).tolist():
+                sequence = chromosomes[i].sequence
+                chromosomes[i].sequence = sequence._wrap(
+                    array('B', matrix[i].tobytes()))
+                chromosomes[i].shared = False
+                chromosomes[i]._key = None
+            continue
+        start = numpy.concatenate([[0], numpy.cumsum(count)]).tolist()
+        positions = positions.tolist()
+        choices = choices.tolist()
+        for i in range(len(chromosomes)):
+            if start[i] == start[i + 1]: continue
+            chromosomes[i].unshare()
+            sequence = chromosomes[i].sequence
+            if kind:
+                sequence.mutate(dict([(positions[j], bases[choices[j]])
+                                      for j in range(start[i], 
+                                                     start[i + 1])]))
+            else:
+                for j in range(start[i], start[i + 1]):
+                    sequence[positions[j]] = bases[choices[j]]
+
+def _crossover_points(length, points, type, number):
+    """Returns the sorted crossover points of a pair of chromosomes - the 
+    given points, or random points for single and multiple crossover."""
+    if points == None:
+        if type == 'single': return [random.randint(0, length)]
+        return sorted([random.randint(0, length) for x in range(number)])
+    if isinstance(points, int): return [max(points, 0)]
+    return sorted([max(int(point), 0) for point in points])
+
+def _segments(sequence1, sequence2, points):
+    """Crosses 2 sequences over sorted crossover points by slicing - the 
+    first offspring takes the segments of the first sequence before the 
+    first point, the second sequence up to the next point, and so on."""
+    new1 = sequence1[:points[0]]
+    new2 = sequence2[:points[0]]
+    points = points + [max(len(sequence1), len(sequence2))]
+    for i in range(len(points) - 1):
+        if i % 2 == 0:
+            new1 = new1 + sequence2[points[i]:points[i + 1]]
+            new2 = new2 + sequence1[points[i]:points[i + 1]]
+        else:
+            new1 = new1 + sequence1[points[i]:points[i + 1]]
+            new2 = new2 + sequence2[points[i]:points[i + 1]]
+    return (new1, new2)
+
+def _uniform(sequence1, sequence2, rate):
+    """Crosses 2 sequences by swapping each base (up to the length of the 
+    shorter sequence) with a probability."""
+    length = min(len(sequence1), len(sequence2))
+    bases1 = list(sequence1)
+    bases2 = list(sequence2)
+    for i in range(length):
+        if random.random() < rate:
+            (bases1[i], bases2[i]) = (bases2[i], bases1[i])
+    return (sequence1[:0] + bases1, sequence2[:0] + bases2)
+
+def _compact_crossover(sequences1, sequences2, crossings, type, rate):
+    """Crosses pairs of compact sequences of the same length and encoding 
+    as one matrix of codes per parent, with a mask of the bases taken 
+    from the other parent."""
+    length = len(sequences1[0])
+    first = numpy.frombuffer(b''.join([sequence.codes.tobytes() 
+                                       for sequence in sequences1]),
+                             dtype=numpy.uint8).reshape(-1, length)
+    second = numpy.frombuffer(b''.join([sequence.codes.tobytes() 
+                                        for sequence in sequences2]),
+                              dtype=numpy.uint8).reshape(-1, length)
+    if type == 'uniform':
+        generator = numpy.random.RandomState(random.getrandbits(32))
+        mask = generator.random_sample(first.shape) < rate
+    else:
+        switches = numpy.zeros((len(sequences1), length + 1), 
+                               dtype=numpy.int8)
+        for (row, points) in enumerate(crossings):
+            for point in points: 
+                switches[row, min(max(point, 0), length)] += 1
+        mask = (numpy.cumsum(switches, axis=1)[:, :length] % 2) == 1
+    new1 = numpy.where(mask, second, first)
+    new2 = numpy.where(mask, first, second)
+    return ([sequences1[i]._wrap(array('B', new1[i].tobytes()))
+             for i in range(len(sequences1))],
+            [sequences2[i]._wrap(array('B', new2[i].tobytes()))
+             for i in range(len(sequences2))])
+
+def reproduce(agents, pairs, points=None, type='single', number=2, 
+              rate=0.5, both=True, pool=None):
+    """
+    Bulk reproduction operator - produces the offsprings of many pairs of 
+    organisms by crossover of their chromosomes. The crossover of each 
+    pair is the same as crossover function for single-point crossover; 
+    multiple-point crossover swaps every other segment between the 
+    crossover points, and uniform crossover swaps each base with a 
+    probability. Chromosomes of the pairs which are all compact sequences 
+    (see CompactSequence) of the same length and encoding are crossed 
+    together as matrices if NumPy is available.
+    
+    The first offspring of a pair inherits the mutation type, additional 
+    mutation rate, and the bases and background mutation rate of the 
+    chromosomes of the first parent; the second offspring inherits those 
+    of the second parent (as crossover function).
+    
+    @param agents: list of Organism objects (parents)
+    @param pairs: list of pairs of indices of parents in agents
+    @param points: crossover points of each pair (an integer or a list of 
+        integers), which are used for all chromosomes of the pair. 
+        Default = None, where random points are drawn for each chromosome 
+        (as Population.mating for single-point crossover).
+    @param type: type of crossover. Accepts 'single' (single-point 
+        crossover), 'multiple' (multiple-point crossover) or 'uniform' 
+        (uniform crossover). Default = single.
+    @param number: number of random crossover points for multiple-point 
+        crossover. Default = 2.
+    @param rate: probability of swapping each base for uniform 
+        crossover. Default = 0.5.
+    @param both: produce both offsprings of each pair (the second 
+        offspring has the complementary segments of the first offspring). 
+        Default = True.
+    @param pool: OrganismPool object to take the offsprings (and their 
+        chromosomes) from. Default = None (new objects).
+    @return: list of new Organism objects (the offsprings of each pair in 
+        the order of the pairs)
+    """
+    if type not in ('single', 'multiple', 'uniform'):
+        raise ValueError('Unknown crossover type: ' + str(type))
+    parents = [(agents[i], agents[j]) for (i, j) in pairs]
+    genomes = [([], []) for pair in parents]
+    sizes = [min(len(parent1.genome), len(parent2.genome)) 
+             for (parent1, parent2) in parents]
+    for k in range(max(sizes + [0])):
+        # pairs with the k-th chromosome in both parents
+        rows = [i for i in range(len(parents)) if sizes[i] > k]
+        chromosomes = [(parents[i][0].genome[k], parents[i][1].genome[k]) 
+                       for i in rows]
+        crossings = None
+        if type != 'uniform':
+            crossings = [_crossover_points(len(chromosomes[r][0].sequence),
+                                           points and points[rows[r]], 
+                                           type, number)
+                         for r in range(len(rows))]
+        sequences1 = [chromosome1.sequence 
+                      for (chromosome1, chromosome2) in chromosomes]
+        sequences2 = [chromosome2.sequence 
+                      for (chromosome1, chromosome2) in chromosomes]
+        kinds = set([(sequence.__class__, len(sequence), 
+                      getattr(sequence, 'encoding', None))
+                     for sequence in sequences1 + sequences2])
+        if numpy != None and len(kinds) == 1 and \
+            isinstance(sequences1[0], CompactSequence):
+            (new1, new2) = _compact_crossover(sequences1, sequences2, 
+                                              crossings, type, rate)
+        else:
+            new1 = []
+            new2 = []
+            for i in range(len(chromosomes)):
+                if type == 'uniform':
+                    (sequence1, sequence2) = _uniform(sequences1[i], 
+                                                      sequences2[i], rate)
+                else:
+                    (sequence1, sequence2) = _segments(sequences1[i], 
+                                                       sequences2[i], 
+                                                       crossings[i])
+                new1.append(sequence1)
+                new2.append(sequence2)
+        if pool == None: new_chromosome = Chromosome
+        else: new_chromosome = pool.chromosome
+        for r in range(len(rows)):
+            (chromosome1, chromosome2) = chromosomes[r]
+            genomes[rows[r]][0].append(new_chromosome(new1[r], 
+                                        chromosome1.base, 
+                                        chromosome1.background_mutation))
+            if both:
+                genomes[rows[r]][1].append(new_chromosome(new2[r], 
+                                        chromosome2.base, 
+                                        chromosome2.background_mutation))
+    if pool == None: new_organism = Organism
+    else: new_organism = pool.organism
+    offsprings = []
+    for i in range(len(parents)):
+        parent = parents[i][0]
+        offsprings.append(new_organism(genomes[i][0], parent.mutation_type, 
+                                       parent.additional_mutation_rate))
+        if both:
+            parent = parents[i][1]
+            offsprings.append(new_organism(genomes[i][1], 
+                                           parent.mutation_type,
+                                           parent.additional_mutation_rate))
+    return offsprings
+
 population_data = \
 {
     'chromosome_bases' : [1, 2, 3, 4],
@@ -720,6 +2960,15 @@ def population_constructor(data=population_data):
             Population. Default = 'default'.
         - 'population_report' = Function to generate the status report of 
             the generation. Please refer to Population. Default = 'default'.
+        - 'compact_chromosome' = Optional. Keep the chromosomes as compact 
+            sequences (see CompactSequence), which take one byte per base. 
+            Default = False.
+        - 'packed_chromosome' = Optional. Keep the chromosomes as packed 
+            sequences (see PackedSequence), which take 1 or 2 bits per base, 
+            if there are not more than 4 chromosome bases. Default = False.
+        - 'fitness_cache' = Optional. Maximum number of fitness scores to 
+            keep in the fitness cache of the population (see FitnessCache). 
+            Default = 0 (no cache).
         
     @param data: population data
     @type data: dictionary
@@ -734,14 +2983,21 @@ def population_constructor(data=population_data):
     """
     chr = Chromosome(data['initial_chromosome'], 
                      data['chromosome_bases'],
-                     data['background_mutation'])
+                     data['background_mutation'],
+                     'compact_chromosome' in data and 
+                     data['compact_chromosome'],
+                     'packed_chromosome' in data and 
+                     data['packed_chromosome'])
     org = Organism([chr]*data['genome_size'],
                    data['mutation_type'],
                    data['additional_mutation'])
     org_set = [org.clone() for x in range(data['population_size'])]
+    cache = None
+    if 'fitness_cache' in data and data['fitness_cache']:
+        cache = FitnessCache(int(data['fitness_cache']))
     pop = Population(data['goal'], 
                      int(data['maximum_generations']), 
-                     org_set)
+                     org_set, cache)
     return pop
     
 def population_simulate(population, 
@@ -0,0 +1,220 @@
+'''
+Lockstep Batch Interpreter for NucleotideBF Instructions in Ragaraja
+Date created: 18th October 2026
+
+NucleotideBF (nBF) instructions in Ragaraja (see
+ragaraja.nBF_instructions; activated as Ragaraja version 0.1 or 0.2)
+have no loops and no source jumps - the n-th instruction of every
+source is executed at the n-th step. Hence, a batch of sources (such as
+the chromosomes of a population) can be executed in lockstep: the
+sources are decoded into a 2-dimensional matrix of operations (one row
+per source) and the tapes into a 2-dimensional array (one row per
+tape), and each column of operations is executed on all the tapes by
+array operations. Random operations are resolved for each row by random
+numbers drawn for the entire column.
+
+The execution of each source gives the same results as
+register_machine.interpret_program function, except that random numbers
+are drawn in a different order. Tapes are 64-bit integer arrays, as nBF
+instructions only increment or decrement the cells by 1; hence, sources
+with tapes holding other values (such as floating point numbers), with 
+tapes holding integers which may overflow 64-bit integers within the 
+maximum number of instructions (unlike Python integers), with tapes 
+shorter than the tape size, or with unknown instructions are executed by
+register_machine.interpret_program function instead.
+
+This module requires NumPy (http://www.numpy.org/).
+'''
+import random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import ragaraja
+from . import register_machine
+
+NO_OPERATION = 0
+FORWARD = 1
+BACKWARD = 2
+INCREMENT = 3
+DECREMENT = 4
+CALL_OUT = 5
+RANDOM = 6
+
+operation_codes = {'forward': FORWARD, 'backward': BACKWARD,
+                   'increment': INCREMENT, 'decrement': DECREMENT}
+
+nBF_operations = {'000': FORWARD, '004': BACKWARD, '008': INCREMENT,
+                  '011': DECREMENT, '020': CALL_OUT}
+
+def is_available():
+    '''
+    Checks whether NumPy is available for lockstep execution.
+
+    @return: True if NumPy is available
+    '''
+    return numpy != None
+
+def is_supported(functions=None):
+    '''
+    Checks whether a Ragaraja instruction set can be executed in lockstep
+    - only the NucleotideBF instructions (see ragaraja.nBF_instructions)
+    are active, and they are handled by the stock handlers.
+
+    @param functions: Dictionary of Ragaraja instructions and handlers.
+    Default = None, which uses the current (activated) Ragaraja
+    instruction set.
+    @return: True if the instruction set can be executed in lockstep
+    '''
+    if functions is None: functions = ragaraja.ragaraja
+    for instruction in ragaraja.instructions:
+        function = functions[instruction]
+        if instruction in ragaraja.nBF_instructions:
+            if function is not ragaraja.stock_ragaraja[instruction]:
+                return False
+        elif function is not ragaraja.not_used:
+            return False
+    return True
+
+def operation_tables():
+    '''
+    Generate the tables to decode Ragaraja opcodes into operations.
+
+    @return: (operations, groups, choices, cutoffs) where operations is
+    the operation of each opcode (with an extra opcode for padding),
+    groups is the random operation group of each opcode, choices is the
+    operations of each random operation group and cutoffs is the cutoffs
+    of each random operation group.
+    '''
+    operations = numpy.zeros(len(ragaraja.instructions) + 1,
+                             dtype=numpy.int8)
+    groups = numpy.zeros(len(ragaraja.instructions) + 1, dtype=numpy.int16)
+    choices = [[NO_OPERATION] * 4]
+    cutoffs = [[2.0] * 3]
+    for instruction in nBF_operations:
+        operations[ragaraja.instruction_index[instruction]] = \
+            nBF_operations[instruction]
+    for instruction in sorted(ragaraja.nBF_random_operations.keys()):
+        random_operations = ragaraja.nBF_random_operations[instruction]
+        code = ragaraja.instruction_index[instruction]
+        operations[code] = RANDOM
+        groups[code] = len(choices)
+        choice = [operation_codes[x] for x in random_operations]
+        choices.append(choice + [NO_OPERATION] * (4 - len(choice)))
+        cutoff = ragaraja.nBF_random_cutoffs[len(random_operations)]
+        cutoffs.append(cutoff + [2.0] * (3 - len(cutoff)))
+    return (operations, groups, numpy.array(choices, dtype=numpy.int8),
+            numpy.array(cutoffs))
+
+def interpret_batch(sources, inputdata, arrays,
+                    size=30, max_instructions=1000, context=None):
+    '''
+    Execute a batch of Ragaraja sources of NucleotideBF instructions in
+    lockstep.
+
+    @param sources: Ragaraja sources to execute.
+    @type sources: list
+    @param inputdata: Input data for each source, which is not used by
+    NucleotideBF instructions and returned as given.
+    @type inputdata: list
+    @param arrays: Starting tape for each source (None for a new tape).
+    As with register_machine.interpret_program function, a given tape
+    which is not longer than the tape size is changed in place.
+    @type arrays: list
+    @param size: Length of the tapes. Default = 30
+    @type size: integer
+    @param max_instructions: The maximum number of instructions to execute
+    for each source. Default = 1000
+    @type max_instructions: integer
+    @param context: ragaraja.InterpreterContext to execute the sources 
+    which cannot be executed in lockstep. Default = None, which uses the 
+    current (activated) Ragaraja instruction set.
+    @return: list of (array, apointer, inputdata, output, source, spointer)
+    for each source
+    '''
+    results = [None] * len(sources)
+    programs = [ragaraja.compile_source(source) for source in sources]
+    # each instruction changes a cell by 1 at most, so cells within the
+    # limit cannot overflow 64-bit integers
+    limit = 2 ** 63 - 1 - (max_instructions + 1)
+    rows = []
+    tapes = []
+    others = []
+    for i in range(len(sources)):
+        array = arrays[i]
+        if array == None: array = [0] * size
+        if len(array) > size: array = array[0:size]
+        if len(array) == size and size > 0 and \
+            min(programs[i].codes + [0]) >= 0 and \
+            len([x for x in array 
+                 if type(x) is not int or not -limit <= x <= limit]) == 0:
+            rows.append(i)
+            tapes.append(array)
+        else:
+            others.append(i)
+    if len(others) > 0:
+        if context == None:
+            table = ragaraja.dispatch_table()
+            journal = ragaraja.journal_table()
+        else:
+            table = context.table
+            journal = context.journal_table
+        for i in others:
+            results[i] = register_machine.interpret_program(programs[i],
+                            table, inputdata[i], arrays[i], size,
+                            max_instructions, journal)
+    if len(rows) == 0: return results
+    tape = numpy.array(tapes, dtype=numpy.int64)
+    (operations, groups, choices, cutoffs) = operation_tables()
+    padding = len(ragaraja.instructions)
+    steps = [min(len(programs[i].codes), max_instructions + 1)
+             for i in rows]
+    codes = numpy.empty((len(rows), max(steps + [0])), dtype=numpy.int16)
+    codes.fill(padding)
+    for r in range(len(rows)):
+        codes[r, :steps[r]] = programs[rows[r]].codes[:steps[r]]
+    apointer = numpy.zeros(len(rows), dtype=numpy.int64)
+    generator = None
+    output_rows = []
+    output_values = []
+    for column in range(codes.shape[1]):
+        operation = operations[codes[:, column]]
+        group = groups[codes[:, column]]
+        selected = numpy.nonzero(operation == RANDOM)[0]
+        if len(selected) > 0:
+            if generator == None:
+                generator = numpy.random.RandomState(random.getrandbits(32))
+            number = generator.random_sample(len(selected))
+            choice = (number[:, None] >=
+                      cutoffs[group[selected]]).sum(axis=1)
+            operation[selected] = choices[group[selected], choice]
+        selected = numpy.nonzero(operation == INCREMENT)[0]
+        tape[selected, apointer[selected]] += 1
+        selected = numpy.nonzero(operation == DECREMENT)[0]
+        tape[selected, apointer[selected]] -= 1
+        selected = numpy.nonzero(operation == CALL_OUT)[0]
+        if len(selected) > 0:
+            output_rows.append(selected)
+            output_values.append(tape[selected, apointer[selected]])
+        apointer = apointer + (operation == FORWARD) - \
+                   (operation == BACKWARD)
+        apointer[apointer > size - 1] -= size
+        apointer[apointer < 0] += size
+    outputs = [[] for r in rows]
+    if len(output_rows) > 0:
+        output_rows = numpy.concatenate(output_rows)
+        output_values = numpy.concatenate(output_values).tolist()
+        for (r, value) in zip(output_rows.tolist(), output_values):
+            outputs[r].append(value)
+    apointer = apointer.tolist()
+    tape = tape.tolist()
+    for r in range(len(rows)):
+        i = rows[r]
+        array = tapes[r]
+        array[:] = tape[r]
+        results[i] = (array, apointer[r], inputdata[i], outputs[r],
+                      programs[i].source,
+                      steps[r] * programs[i].function_size)
+    return results
@@ -44,6 +44,7 @@ import math
 
 from . import copads
 from . import lc_bf
+from . import register_machine
 from .copads.samplestatistics import SingleSample
 from .lc_bf import increment, decrement
 from .lc_bf import forward, backward
@@ -68,14 +69,14 @@ def loop_start(array, apointer, inputdata, output, source, spointer):
         return (array, apointer, inputdata, output, source, spointer)
     else:
         count = 1
-        try:
-            while count > 0:
-                spointer = spointer + 3
-                if source[spointer:spointer+3] == '015': count = count - 1
-                if source[spointer:spointer+3] == '014': count = count + 1
-            return (array, apointer, inputdata, output, source, spointer - 3)
-        except IndexError:
-            return (array, apointer, inputdata, output, source, len(source) - 1)
+        while count > 0:
+            spointer = spointer + 3
+            if spointer >= len(source):
+                return (array, apointer, inputdata, output, source, 
+                        len(source) - 1)
+            if source[spointer:spointer+3] == '015': count = count - 1
+            if source[spointer:spointer+3] == '014': count = count + 1
+        return (array, apointer, inputdata, output, source, spointer - 3)
 
 def loop_end(array, apointer, inputdata, output, source, spointer):
     '''
@@ -89,13 +90,12 @@ def loop_end(array, apointer, inputdata, output, source, spointer):
         return (array, apointer, inputdata, output, source, spointer)
     else:
         count = 1
-        try:
-            while count > 0:
-                spointer = spointer - 3
-                if source[spointer:spointer+3] == '015': count = count + 1
-                if source[spointer:spointer+3] == '014': count = count - 1
-        except IndexError:
-            spointer = temp
+        while count > 0:
+            spointer = spointer - 3
+            if spointer < 0:
+                return (array, apointer, inputdata, output, source, temp)
+            if source[spointer:spointer+3] == '015': count = count + 1
+            if source[spointer:spointer+3] == '014': count = count - 1
     return (array, apointer, inputdata, output, source, spointer)
 
 def tape_move(array, apointer, inputdata, output, source, spointer):
@@ -2413,25 +2413,1009 @@ def activate_version(version=1, instructions=None):
     
     @since: version 0.4
     '''
-    if version == 0 or version == 66: 
-        for key in list(ragaraja.keys()):
-            if key not in instructions:
-                ragaraja[key] = not_used
-    elif version == 0.1 or version == 0.2: 
-        for key in list(ragaraja.keys()):
-            if key not in nBF_instructions:
-                ragaraja[key] = not_used
-    elif version == 1: 
-        for key in list(ragaraja.keys()):
-            if key not in ragaraja_v1:
-                ragaraja[key] = not_used
-    elif version == 2: 
-        for key in list(ragaraja.keys()):
-            if key not in ragaraja_v2:
-                ragaraja[key] = not_used
-    elif version == 98:
-        pass
-    elif version == 99:
-        for key in list(ragaraja.keys()):
-            if key not in tested_ragaraja_instructions:
-                ragaraja[key] = not_used
+    functions = instruction_set(version, instructions)
+    for key in list(ragaraja.keys()):
+        if functions[key] is not_used:
+            ragaraja[key] = not_used
+
+def instruction_set(version=1, instructions=None):
+    '''
+    Generates the Ragaraja instruction set of a version (see 
+    activate_version function for the versions) as a new dictionary of 
+    instructions and handlers, from the stock handlers. Unlike 
+    activate_version function, the current (activated) instruction set 
+    is not changed.
+    
+    @param version: Define the version to generate. Default = 1. 
+    @param instructions: User-defined set of instructions (as list of 
+    instructions in string) to be activated. This will only be activated 
+    when version = 0 or 66.
+    @return: dictionary of Ragaraja instructions and handlers
+    '''
+    if version == 0 or version == 66: active = instructions
+    elif version == 0.1 or version == 0.2: active = nBF_instructions
+    elif version == 1: active = ragaraja_v1
+    elif version == 2: active = ragaraja_v2
+    elif version == 99: active = tested_ragaraja_instructions
+    else: active = None
+    functions = dict(stock_ragaraja)
+    if active != None:
+        for key in functions:
+            if key not in active:
+                functions[key] = not_used
+    return functions
+
+'''
+Compiled execution of Ragaraja.
+
+The instruction handlers above take the source and source pointer in 
+order to slice out the current instruction, and each handler decides on 
+the operation to perform by comparing the instruction against each of 
+the instructions it handles. For compiled execution (see 
+register_machine.compile_source and register_machine.interpret_program), 
+the source is decoded only once into integer opcodes, where the opcode 
+of an instruction is its integer value (for example, "045" is 45). Each 
+opcode indexes a dispatch table (see dispatch_table function) holding 
+one specialized handler per instruction, which performs the operation 
+of the instruction without looking at the source.
+'''
+instructions = [instruction_padding(code) for code in range(1000)]
+instruction_index = dict([(instructions[code], code) 
+                          for code in range(1000)])
+
+def pointer_function(function):
+    '''
+    Generate a specialized handler that sets the tape pointer.
+    
+    @param function: function taking (array, apointer, output) and 
+    returning the new tape pointer.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        apointer = function(array, apointer, output)
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def cell_function(function):
+    '''
+    Generate a specialized handler that replaces the current tape cell 
+    with a function of its value.
+    
+    @param function: function taking the value of the current cell and 
+    returning the new value of the current cell.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        array[apointer] = function(array[apointer])
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def cell_assign(function):
+    '''
+    Generate a specialized handler that replaces the current tape cell 
+    with a value derived from the tape.
+    
+    @param function: function taking (array, apointer) and returning the 
+    new value of the current cell.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        array[apointer] = function(array, apointer)
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def input_function(function):
+    '''
+    Generate a specialized handler that replaces the current tape cell 
+    with a value derived from the input list, if the input list is not 
+    empty.
+    
+    @param function: function taking (array, apointer, inputdata) and 
+    returning the new value of the current cell.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        if len(inputdata) > 0:
+            array[apointer] = function(array, apointer, inputdata)
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def tape_function(function):
+    '''
+    Generate a specialized handler that replaces the tape.
+    
+    @param function: function taking (array, apointer) and returning the 
+    new tape.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        array = function(array, apointer)
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def logic_function(function):
+    '''
+    Generate a specialized handler for logic operations (see logic 
+    function), which sets the current cell to 1 if the condition is 
+    true, or 0 if the condition is false.
+    
+    @param function: function taking (xValue, yValue, x, y) and returning 
+    the condition.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        xValue = array[apointer]
+        x = xValue > 0
+        if (apointer + 1) < len(array): yValue = array[apointer+1]
+        else: yValue = array[0]
+        y = yValue > 0
+        if function(xValue, yValue, x, y) == True: array[apointer] = 1
+        else: array[apointer] = 0
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def size_function(function):
+    '''
+    Generate a specialized handler that changes the length of the tape 
+    (see tape_size function).
+    
+    @param function: function taking (array, apointer, output) and 
+    returning the new tape.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        array = function(array, apointer, output)
+        if apointer >= len(array): apointer = len(array) - 1
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def source_function(function):
+    '''
+    Generate a specialized handler that moves the source pointer (see 
+    source_move function).
+    
+    @param function: function taking (array, apointer, source, spointer) 
+    and returning the new source pointer.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        spointer = function(array, apointer, source, spointer)
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+nBF_random_operations = {'050': ('increment', 'forward'),
+                         '051': ('decrement', 'backward'),
+                         '052': ('forward', 'backward'),
+                         '053': ('increment', 'decrement'),
+                         '054': ('decrement', 'forward'),
+                         '055': ('increment', 'backward'),
+                         '056': ('forward', 'decrement', 'backward'),
+                         '057': ('increment', 'decrement', 'forward'),
+                         '058': ('increment', 'decrement', 'backward'),
+                         '059': ('increment', 'forward', 'backward'),
+                         '060': ('increment', 'decrement', 
+                                 'forward', 'backward')}
+
+nBF_random_cutoffs = {2: [0.5], 3: [0.33, 0.67], 4: [0.25, 0.5, 0.75]}
+
+def random_function(*operations):
+    '''
+    Generate a specialized handler for NucleotideBF random operations 
+    (see nBF_random_op function), which randomly executes one of the 
+    given operations (see nBF_random_operations) - the first operation 
+    if the random number is less than the first cutoff (see 
+    nBF_random_cutoffs), the second operation if it is less than the 
+    second cutoff, and so on.
+    
+    @param operations: 2 to 4 of 'increment', 'decrement', 'forward' or 
+    'backward'.
+    '''
+    cutoffs = nBF_random_cutoffs[len(operations)]
+    def handler(array, apointer, inputdata, output, source, spointer):
+        r = random.random()
+        operation = operations[-1]
+        for i in range(len(cutoffs)):
+            if r < cutoffs[i]:
+                operation = operations[i]
+                break
+        if operation == 'increment':
+            array[apointer] = array[apointer] + 1
+        elif operation == 'decrement':
+            array[apointer] = array[apointer] - 1
+        elif operation == 'forward':
+            if (apointer + 1) == len(array): apointer = 0
+            else: apointer = apointer + 1
+        elif operation == 'backward':
+            if apointer == 0: apointer = len(array) - 1
+            else: apointer = apointer - 1
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def register_store(number, registers=None):
+    '''
+    Generate a specialized handler that writes the current cell into a 
+    register (instructions 201 to 299) of the given registers, or the 
+    module registers (register) if not given.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        if registers is None: register[number] = array[apointer]
+        else: registers[number] = array[apointer]
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def register_load(number, registers=None):
+    '''
+    Generate a specialized handler that writes a register (of the given 
+    registers, or the module registers if not given) into the current 
+    cell (instructions 301 to 399).
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        if registers is None: array[apointer] = register[number]
+        else: array[apointer] = registers[number]
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def register_clear(number, registers=None):
+    '''
+    Generate a specialized handler that clears a register (instructions 
+    501 to 599) of the given registers, or the module registers if not 
+    given.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        if registers is None: register[number] = 0
+        else: registers[number] = 0
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def output_append_apointer(array, apointer, inputdata, output, 
+                           source, spointer):
+    '''Specialized handler for instruction 021 (see output_IO).'''
+    output.append(apointer)
+    return (array, apointer, inputdata, output, source, spointer)
+
+def output_append_spointer(array, apointer, inputdata, output, 
+                           source, spointer):
+    '''Specialized handler for instruction 022 (see output_IO).'''
+    output.append(spointer)
+    return (array, apointer, inputdata, output, source, spointer)
+
+def output_function(function):
+    '''
+    Generate a specialized handler that writes a value from the output 
+    list into the current cell, if the output list is not empty 
+    (instructions 037 to 040).
+    
+    @param function: function taking the output list and returning the 
+    value for the current cell.
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        if len(output) > 0: array[apointer] = function(output)
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def output_remove(position):
+    '''
+    Generate a specialized handler that removes a value from the output 
+    list, if the output list is not empty (instructions 041 and 042).
+    '''
+    def handler(array, apointer, inputdata, output, source, spointer):
+        if len(output) > 0: output.pop(position)
+        return (array, apointer, inputdata, output, source, spointer)
+    return handler
+
+def output_tape(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 172 (see output_IO).'''
+    if apointer != (len(array) - 1):
+        output = output + array[apointer+1:]
+    return (array, apointer, inputdata, output, source, spointer)
+
+def output_tape_clear(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 173 (see output_IO).'''
+    if apointer != (len(array) - 1):
+        data = array[apointer+1:]
+        output = output + data
+        array = array[0:apointer+1] + [0] * len(data)
+    return (array, apointer, inputdata, output, source, spointer)
+
+def output_all(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 174 (see output_IO).'''
+    output = output + array
+    return (array, apointer, inputdata, output, source, spointer)
+
+def output_all_clear(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 175 (see output_IO).'''
+    output = output + array
+    array = [0] * len(array)
+    return (array, apointer, inputdata, output, source, spointer)
+
+def replace_instruction(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 029 (see source_manipulate).'''
+    value = instruction_padding((array[apointer]) % 1000)
+    value = list(value)
+    source[spointer] = str(value[0])
+    source[spointer+1] = str(value[1])
+    source[spointer+2] = str(value[2])
+    return (array, apointer, inputdata, output, source, spointer)
+
+def invert_instruction(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 030 (see source_manipulate).'''
+    if (spointer + 6) < len(source):
+        source[spointer+3] = str(10 - source[spointer+3])
+        source[spointer+4] = str(10 - source[spointer+4])
+        source[spointer+5] = str(10 - source[spointer+5])
+    return (array, apointer, inputdata, output, source, spointer)
+
+def random_instruction(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 049 (see source_manipulate).'''
+    instruction = instruction_padding(random.randint(0, 1001))
+    instruction = list(instruction)
+    source[spointer] = instruction[0]
+    source[spointer+1] = instruction[1]
+    source[spointer+2] = instruction[2]
+    return (array, apointer, inputdata, output, source, spointer)
+
+def reverse_tape(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 046 (see flipping).'''
+    array.reverse()
+    return (array, apointer, inputdata, output, source, spointer)
+
+def reverse_output(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 047 (see flipping).'''
+    output.reverse()
+    return (array, apointer, inputdata, output, source, spointer)
+
+def reverse_source(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 048 (see flipping).'''
+    source = source[::-1]
+    return (array, apointer, inputdata, output, source, spointer)
+
+def swap_cell(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 081 (see tape_manipulate).'''
+    if (apointer + 1) < len(array):
+        temp = array[apointer]
+        array[apointer] = array[apointer+1]
+        array[apointer+1] = temp
+    else:
+        temp = array[apointer]
+        array[apointer] = array[0]
+        array[0] = temp
+    return (array, apointer, inputdata, output, source, spointer)
+
+def reverse_after_cell(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 131 (see tape_manipulate).'''
+    if (apointer + 1) < len(array):
+        temp = array[apointer+1:]
+        array = array[0:apointer+1]
+        temp.reverse()
+        array = array + temp
+    return (array, apointer, inputdata, output, source, spointer)
+
+def rotate_to_start(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 161 (see tape_manipulate).'''
+    array = array[apointer:] + array[0:apointer]
+    return (array, 0, inputdata, output, source, spointer)
+
+def rotate_to_end(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 162 (see tape_manipulate).'''
+    array = array[apointer+1:] + array[0:apointer+1]
+    return (array, len(array) - 1, inputdata, output, source, spointer)
+
+def move_cell_to_start(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 163 (see tape_manipulate).'''
+    cell = array.pop(apointer)
+    array = [cell] + array
+    return (array, 0, inputdata, output, source, spointer)
+
+def move_cell_to_end(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 164 (see tape_manipulate).'''
+    cell = array.pop(apointer)
+    array = array + [cell]
+    return (array, len(array) - 1, inputdata, output, source, spointer)
+
+def insert_cell(array, apointer, output):
+    '''Tape change for instruction 034 (see tape_size).'''
+    array.insert(apointer + 1, 0)
+    return array
+
+def delete_cell(array, apointer, output):
+    '''Tape change for instruction 035 (see tape_size).'''
+    array.pop(apointer)
+    return array
+
+def output_cell(array, apointer, output):
+    '''Tape change for instruction 036 (see tape_size).'''
+    output.append(array.pop(apointer))
+    return array
+
+def read_input(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 064 (see input_IO).'''
+    if len(inputdata) == 0: array[apointer] = 0
+    else: array[apointer] = inputdata[0]
+    return (array, apointer, inputdata, output, source, spointer)
+
+def factorial_positive(array, apointer, inputdata, output, source, spointer):
+    '''Specialized handler for instruction 114 (see mathematics).'''
+    if array[apointer] >= 0:
+        array[apointer] = math.factorial(int(array[apointer]))
+    return (array, apointer, inputdata, output, source, spointer)
+
+def jump_loop_start(array, apointer, inputdata, output, source, spointer):
+    '''
+    Specialized handler for instruction 014 (see loop_start), which 
+    returns None as source pointer to take the jump in the jump table of 
+    the program (see register_machine.Program) instead of scanning the 
+    source for the end of the loop.
+    '''
+    if array[apointer] > 0:
+        return (array, apointer, inputdata, output, source, spointer)
+    return (array, apointer, inputdata, output, source, None)
+
+def jump_loop_end(array, apointer, inputdata, output, source, spointer):
+    '''
+    Specialized handler for instruction 015 (see loop_end), which returns 
+    None as source pointer to take the jump in the jump table of the 
+    program (see register_machine.Program) instead of scanning the source 
+    for the start of the loop.
+    '''
+    if array[apointer] < 1:
+        return (array, apointer, inputdata, output, source, spointer)
+    return (array, apointer, inputdata, output, source, None)
+
+def next_cell(array, apointer):
+    '''
+    Returns the value of the next cell on the tape, or the first cell if 
+    the current cell is the last cell.
+    '''
+    if (apointer + 1) < len(array): return array[apointer+1]
+    else: return array[0]
+
+def average(temp):
+    return sum(temp) / float(len(temp))
+
+def standard_deviation(array, apointer):
+    variance = SingleSample(array).variance()
+    return math.sqrt(variance)
+
+specialized_ragaraja = {
+    '001': pointer_function(lambda a, p, o: p + 5),
+    '002': pointer_function(lambda a, p, o: p + 10),
+    '003': pointer_function(lambda a, p, o: 
+                            p + int(float(a[p]) * float(a[p]))),
+    '005': pointer_function(lambda a, p, o: p - 5),
+    '006': pointer_function(lambda a, p, o: p - 10),
+    '007': pointer_function(lambda a, p, o: 
+                            (p - int(float(a[p]) * float(a[p]))) % \
+                            (len(a) - 1)),
+    '014': jump_loop_start,
+    '015': jump_loop_end,
+    '043': pointer_function(lambda a, p, o: 0),
+    '044': pointer_function(lambda a, p, o: len(a) - 1),
+    '045': pointer_function(lambda a, p, o: int(o[-1]) % (len(a) - 1)),
+    '061': pointer_function(lambda a, p, o: p + int(a[p])),
+    '062': pointer_function(lambda a, p, o: p - int(a[p])),
+    '140': pointer_function(lambda a, p, o: int((len(a) - 1) * 0.5)),
+    '141': pointer_function(lambda a, p, o: int((len(a) - 1) * 0.25)),
+    '142': pointer_function(lambda a, p, o: int((len(a) - 1) * 0.75)),
+    '143': pointer_function(lambda a, p, o: int(a[p]) % (len(a) - 1)),
+    '009': cell_function(lambda x: x + 5),
+    '010': cell_function(lambda x: x + 10),
+    '012': cell_function(lambda x: x - 5),
+    '013': cell_function(lambda x: x - 10),
+    '032': cell_function(lambda x: 2 * x),
+    '033': cell_function(lambda x: 0.5 * x),
+    '016': size_function(lambda a, p, o: a + [0]),
+    '017': size_function(lambda a, p, o: a + [0]*10),
+    '018': size_function(lambda a, p, o: a[:-1]),
+    '019': size_function(lambda a, p, o: a[:-10]),
+    '034': size_function(insert_cell),
+    '035': size_function(delete_cell),
+    '036': size_function(output_cell),
+    '023': source_function(lambda a, p, s, sp: 
+                           sp + 3 if (sp + 3) < len(s) else sp),
+    '024': source_function(lambda a, p, s, sp: 
+                           sp + 15 if (sp + 15) < len(s) else sp),
+    '025': source_function(lambda a, p, s, sp: 
+                           sp + 30 if (sp + 30) < len(s) else sp),
+    '026': source_function(lambda a, p, s, sp: 
+                           sp - 3 if (sp - 3) >= 0 else sp),
+    '027': source_function(lambda a, p, s, sp: 
+                           sp - 15 if (sp - 15) >= 0 else sp),
+    '028': source_function(lambda a, p, s, sp: 
+                           sp - 30 if (sp - 30) >= 0 else sp),
+    '082': source_function(lambda a, p, s, sp: 
+                           sp + 3 if a[p] == 0 and (sp + 3) <= len(s) 
+                           else sp),
+    '083': source_function(lambda a, p, s, sp: 
+                           sp + (3 * abs(int(a[p]))) 
+                           if (sp + (3 * abs(int(a[p])))) < len(s) 
+                           else sp),
+    '029': replace_instruction,
+    '030': invert_instruction,
+    '049': random_instruction,
+    '031': cell_function(lambda x: float(x) % 1000),
+    '084': cell_function(lambda x: 0),
+    '085': cell_function(lambda x: -1),
+    '086': cell_function(lambda x: 1),
+    '097': cell_function(lambda x: math.pi),
+    '098': cell_function(lambda x: math.e),
+    '187': tape_function(lambda a, p: 
+                         a[0:p+1] + [0 for x in a[p+1:]]),
+    '188': tape_function(lambda a, p: [0 for x in a[:p]] + a[p:]),
+    '189': tape_function(lambda a, p: [0] * len(a)),
+    '190': tape_function(lambda a, p: [a[p]] * len(a)),
+    '191': tape_function(lambda a, p: [p] * len(a)),
+    '192': tape_function(lambda a, p: 
+                         a[0:p+1] + [a[p] for x in a[p+1:]]),
+    '193': tape_function(lambda a, p: [a[p] for x in a[:p]] + a[p:]),
+    '194': tape_function(lambda a, p: a[0:p+1] + [p for x in a[p+1:]]),
+    '195': tape_function(lambda a, p: [p for x in a[:p]] + a[p:]),
+    '065': cell_assign(lambda a, p: 
+                       a[p] + a[p+1] if (p + 1) < len(a) else a[p] + a[0]),
+    '066': input_function(lambda a, p, i: a[p] + i[0]),
+    '067': input_function(lambda a, p, i: a[p] + i[-1]),
+    '068': cell_assign(lambda a, p: 
+                       a[p+1] - a[p] if (p + 1) < len(a) else a[0] - a[p]),
+    '069': input_function(lambda a, p, i: i[0] - a[p]),
+    '070': input_function(lambda a, p, i: i[-1] - a[p]),
+    '071': cell_assign(lambda a, p: 
+                       a[p+1] * a[p] if (p + 1) < len(a) else a[0] * a[p]),
+    '072': input_function(lambda a, p, i: i[0] * a[p]),
+    '073': input_function(lambda a, p, i: i[-1] * a[p]),
+    '074': cell_assign(lambda a, p: 
+                       float(a[p+1]) / a[p] if (p + 1) < len(a) 
+                       else a[0] / a[p]),
+    '075': input_function(lambda a, p, i: float(i[0]) / a[p]),
+    '076': input_function(lambda a, p, i: float(i[-1]) / a[p]),
+    '077': cell_assign(lambda a, p: 
+                       a[p+1] % a[p] if (p + 1) < len(a) else a[0] % a[p]),
+    '078': input_function(lambda a, p, i: i[0] % a[p]),
+    '079': input_function(lambda a, p, i: i[-1] % a[p]),
+    '080': cell_function(int),
+    '087': cell_function(lambda x: -1 * x),
+    '088': cell_function(math.sin),
+    '089': cell_function(math.cos),
+    '090': cell_function(math.tan),
+    '091': cell_function(math.asin),
+    '092': cell_function(math.acos),
+    '093': cell_function(math.atan),
+    '094': cell_function(lambda x: 1 / x),
+    '095': cell_function(math.sqrt),
+    '096': cell_function(lambda x: math.log(x, math.e)),
+    '099': cell_function(math.sinh),
+    '100': cell_function(math.cosh),
+    '101': cell_function(math.tanh),
+    '102': cell_function(math.asinh),
+    '103': cell_function(math.acosh),
+    '104': cell_function(math.atanh),
+    '105': cell_function(math.degrees),
+    '106': cell_function(math.radians),
+    '107': cell_function(lambda x: x ** math.e),
+    '108': cell_function(lambda x: math.e ** x),
+    '109': cell_function(lambda x: 10 ** x),
+    '110': cell_assign(lambda a, p: 
+                       a[p] ** a[p+1] if (p + 1) < len(a) else a[p] ** a[0]),
+    '111': cell_assign(lambda a, p: 
+                       a[p] ** (1 / a[p+1]) if (p + 1) < len(a) 
+                       else a[p] ** (1 / a[0])),
+    '112': cell_function(math.erf),
+    '113': cell_function(math.erfc),
+    '114': factorial_positive,
+    '115': cell_function(lambda x: math.factorial(abs(int(x)))),
+    '116': cell_assign(lambda a, p: math.hypot(a[p], next_cell(a, p))),
+    '117': cell_assign(lambda a, p: math.log(a[p], next_cell(a, p))),
+    '144': cell_function(lambda x: 0.1 * (x)),
+    '145': cell_function(lambda x: 10 * (x)),
+    '146': cell_assign(lambda a, p: sum(a[p+1:])),
+    '147': cell_assign(lambda a, p: sum(a[p:])),
+    '148': cell_assign(lambda a, p: sum(a[0:p])),
+    '149': cell_assign(lambda a, p: sum(a[0:p+1])),
+    '150': cell_assign(lambda a, p: sum(a)),
+    '151': cell_assign(lambda a, p: average(a[p+1:])),
+    '152': cell_assign(lambda a, p: average(a[p:])),
+    '153': cell_assign(lambda a, p: average(a[0:p])),
+    '154': cell_assign(lambda a, p: average(a[0:p+1])),
+    '155': tape_function(lambda a, p: [0.5 * x for x in a]),
+    '156': tape_function(lambda a, p: [2 * x for x in a]),
+    '157': tape_function(lambda a, p: [0.1 * x for x in a]),
+    '158': tape_function(lambda a, p: [10 * x for x in a]),
+    '159': tape_function(lambda a, p: [0.01 * x for x in a]),
+    '160': tape_function(lambda a, p: [100 * x for x in a]),
+    '165': tape_function(lambda a, p: [-1 * x for x in a]),
+    '166': tape_function(lambda a, p: 
+                         a[0:p+1] + [x * x for x in a[p+1:]]),
+    '167': tape_function(lambda a, p: [x * x for x in a[:p]] + a[p:]),
+    '168': tape_function(lambda a, p: [x * x for x in a]),
+    '169': tape_function(lambda a, p: [math.sqrt(x) for x in a]),
+    '170': tape_function(lambda a, p: 
+                         a[0:p+1] + [math.sqrt(x) for x in a[p+1:]]),
+    '171': tape_function(lambda a, p: 
+                         [math.sqrt(x) for x in a[:p]] + a[p:]),
+    '196': cell_assign(standard_deviation),
+    '197': cell_assign(lambda a, p: SingleSample(a).geometricMean()),
+    '198': cell_assign(lambda a, p: SingleSample(a).harmonicMean()),
+    '021': output_append_apointer,
+    '022': output_append_spointer,
+    '037': output_function(lambda o: o.pop(-1)),
+    '038': output_function(lambda o: o[-1]),
+    '039': output_function(lambda o: o.pop(0)),
+    '040': output_function(lambda o: o[0]),
+    '041': output_remove(0),
+    '042': output_remove(-1),
+    '172': output_tape,
+    '173': output_tape_clear,
+    '174': output_all,
+    '175': output_all_clear,
+    '120': logic_function(lambda xv, yv, x, y: x and y),
+    '121': logic_function(lambda xv, yv, x, y: x or y),
+    '122': logic_function(lambda xv, yv, x, y: not x),
+    '123': logic_function(lambda xv, yv, x, y: xv < yv),
+    '124': logic_function(lambda xv, yv, x, y: xv > yv),
+    '125': logic_function(lambda xv, yv, x, y: xv == yv),
+    '126': logic_function(lambda xv, yv, x, y: xv != yv),
+    '127': logic_function(lambda xv, yv, x, y: xv <= yv),
+    '128': logic_function(lambda xv, yv, x, y: xv >= yv),
+    '129': logic_function(lambda xv, yv, x, y: not (x and y)),
+    '130': logic_function(lambda xv, yv, x, y: not (x or y)),
+    '046': reverse_tape,
+    '047': reverse_output,
+    '048': reverse_source,
+    '064': read_input,
+    '081': swap_cell,
+    '131': reverse_after_cell,
+    '161': rotate_to_start,
+    '162': rotate_to_end,
+    '163': move_cell_to_start,
+    '164': move_cell_to_end,
+    }
+for instruction in nBF_random_operations:
+    specialized_ragaraja[instruction] = \
+        random_function(*nBF_random_operations[instruction])
+for number in range(99):
+    specialized_ragaraja[instruction_padding(201 + number)] = \
+        register_store(number)
+    specialized_ragaraja[instruction_padding(301 + number)] = \
+        register_load(number)
+    specialized_ragaraja[instruction_padding(501 + number)] = \
+        register_clear(number)
+for instruction in ['200', '300', '400', '500', 
+                    '600', '700', '800', '900']:
+    specialized_ragaraja[instruction] = not_used
+
+stock_ragaraja = dict(ragaraja)
+
+def dispatch_table(functions=None):
+    '''
+    Generate the dispatch table for compiled execution. The dispatch 
+    table is a list of 1000 handlers where the position is the opcode. 
+    Instructions which are still handled by the stock handler (in other 
+    words, not deactivated by activate_version function or replaced) 
+    will be given its specialized handler.
+    
+    @param functions: Dictionary of Ragaraja instructions and handlers. 
+    Default = None, which uses the current (activated) Ragaraja 
+    instruction set.
+    @return: list of handlers
+    '''
+    if functions is None: functions = ragaraja
+    table = []
+    for instruction in instructions:
+        function = functions[instruction]
+        if function is stock_ragaraja[instruction] and \
+            instruction in specialized_ragaraja:
+            function = specialized_ragaraja[instruction]
+        table.append(function)
+    return table
+
+def compile_source(source, folds=None):
+    '''
+    Decode a Ragaraja source into a program of integer opcodes for 
+    execution by register_machine.interpret_program function, using the 
+    dispatch table from dispatch_table function. Loops (instructions 014 
+    and 015) are resolved into the jump table of the program.
+    
+    @param source: Ragaraja source.
+    @type source: string
+    @param folds: Peephole folds of the opcodes from peephole_table 
+    function. Default = None (no peephole folding).
+    @type folds: list
+    @return: register_machine.Program object
+    '''
+    return register_machine.compile_source(source, instructions, 3, 
+                                           instruction_index, 
+                                           ('014', '015'), folds)
+
+'''
+Peephole folds of Ragaraja instructions (see register_machine.Program) 
+as (move, addition) - instructions which only move the tape pointer, or 
+only add to the current cell, by a constant.
+'''
+peephole_instructions = {'000': (1, 0), '001': (5, 0), '002': (10, 0),
+                         '004': (-1, 0), '005': (-5, 0), '006': (-10, 0),
+                         '008': (0, 1), '009': (0, 5), '010': (0, 10),
+                         '011': (0, -1), '012': (0, -5), '013': (0, -10)}
+
+def peephole_table(functions=None):
+    '''
+    Generate the peephole folds of Ragaraja instructions for 
+    compile_source function, as a list of 1000 folds where the position 
+    is the opcode. Instructions in peephole_instructions which are still 
+    handled by the stock handler are folded by their move or addition, 
+    and deactivated instructions (not_used) are folded as (0, 0). Other 
+    instructions are not folded (None).
+    
+    @param functions: Dictionary of Ragaraja instructions and handlers. 
+    Default = None, which uses the current (activated) Ragaraja 
+    instruction set.
+    @return: list of folds
+    '''
+    if functions is None: functions = ragaraja
+    table = []
+    for instruction in instructions:
+        function = functions[instruction]
+        if function is not_used:
+            table.append((0, 0))
+        elif function is stock_ragaraja[instruction] and \
+            instruction in peephole_instructions:
+            table.append(peephole_instructions[instruction])
+        else:
+            table.append(None)
+    return table
+
+codegen_instructions = {'014': ('start',), '015': ('end',), 
+                        '020': ('output',)}
+
+def codegen_table(functions=None):
+    '''
+    Generate the operations of Ragaraja instructions for 
+    register_machine.generate_function function, as a list of 1000 
+    operations where the position is the opcode. Instructions in 
+    peephole_instructions and codegen_instructions which are still 
+    handled by the stock handler are generated inline as moves, 
+    additions, output or loops, and deactivated instructions (not_used) 
+    as no operation. Other instructions are called from the dispatch 
+    table (None).
+    
+    @param functions: Dictionary of Ragaraja instructions and handlers. 
+    Default = None, which uses the current (activated) Ragaraja 
+    instruction set.
+    @return: list of operations
+    '''
+    if functions is None: functions = ragaraja
+    table = []
+    for instruction in instructions:
+        function = functions[instruction]
+        if function is not_used:
+            table.append(('nop',))
+        elif function is not stock_ragaraja[instruction]:
+            table.append(None)
+        elif instruction in codegen_instructions:
+            table.append(codegen_instructions[instruction])
+        elif instruction in peephole_instructions:
+            (move, addition) = peephole_instructions[instruction]
+            if move != 0: table.append(('move', move))
+            else: table.append(('add', addition))
+        else:
+            table.append(None)
+    return table
+
+'''
+Undo types of Ragaraja instructions (see register_machine) for roll back 
+of failed instructions. Most instructions either move a pointer or change 
+only the current cell; hence, only the changed cell needs to be kept 
+instead of copying the tape, input list and output list before every 
+instruction.
+'''
+handler_undo = {forward: register_machine.UNDO_NONE, 
+                backward: register_machine.UNDO_NONE,
+                tape_move: register_machine.UNDO_NONE,
+                loop_start: register_machine.UNDO_NONE,
+                loop_end: register_machine.UNDO_NONE,
+                source_move: register_machine.UNDO_NONE,
+                jump_identifier: register_machine.UNDO_NONE,
+                not_used: register_machine.UNDO_NONE,
+                increment: register_machine.UNDO_CELL,
+                decrement: register_machine.UNDO_CELL,
+                accumulations: register_machine.UNDO_CELL,
+                nBF_random_op: register_machine.UNDO_CELL,
+                mathematics: register_machine.UNDO_CELL,
+                set_tape_value: register_machine.UNDO_CELL,
+                logic: register_machine.UNDO_CELL,
+                input_IO: register_machine.UNDO_CELL,
+                tape_manipulate: register_machine.UNDO_TAPE,
+                call_out: register_machine.UNDO_OUTPUT}
+
+instruction_undo = {'048': register_machine.UNDO_NONE,
+                    '038': register_machine.UNDO_CELL,
+                    '040': register_machine.UNDO_CELL,
+                    '046': register_machine.UNDO_TAPE,
+                    '021': register_machine.UNDO_OUTPUT,
+                    '022': register_machine.UNDO_OUTPUT,
+                    '172': register_machine.UNDO_OUTPUT,
+                    '174': register_machine.UNDO_OUTPUT}
+for instruction in ['016', '017', '018', '019', '034', '035',
+                    '155', '156', '157', '158', '159', '160', '165', 
+                    '166', '167', '168', '169', '170', '171', '187', 
+                    '188', '189', '190', '191', '192', '193', '194', 
+                    '195']:
+    instruction_undo[instruction] = register_machine.UNDO_TAPE
+for number in range(99):
+    instruction_undo[instruction_padding(201 + number)] = \
+        register_machine.UNDO_NONE
+    instruction_undo[instruction_padding(301 + number)] = \
+        register_machine.UNDO_CELL
+    instruction_undo[instruction_padding(501 + number)] = \
+        register_machine.UNDO_NONE
+
+def undo_journal(functions=None):
+    '''
+    Generate the journal of undo types of Ragaraja instructions for 
+    register_machine.interpret function. Instructions which are not 
+    handled by the stock handler will be undone from a full copy of the 
+    tape, input list and output list (register_machine.UNDO_ALL) as the 
+    changes made by the replacement handler are not known.
+    
+    @param functions: Dictionary of Ragaraja instructions and handlers. 
+    Default = None, which uses the current (activated) Ragaraja 
+    instruction set.
+    @return: dictionary of instruction to undo type
+    '''
+    if functions is None: functions = ragaraja
+    journal = {}
+    for instruction in instructions:
+        function = functions[instruction]
+        if function is not_used:
+            journal[instruction] = register_machine.UNDO_NONE
+        elif function is stock_ragaraja[instruction]:
+            journal[instruction] = instruction_undo.get(instruction, 
+                handler_undo.get(function, register_machine.UNDO_ALL))
+        else:
+            journal[instruction] = register_machine.UNDO_ALL
+    return journal
+
+def journal_table(functions=None):
+    '''
+    Generate the journal of undo types of Ragaraja instructions for 
+    register_machine.interpret_program function, as a list of 1000 undo 
+    types where the position is the opcode (see undo_journal function).
+    
+    @param functions: Dictionary of Ragaraja instructions and handlers. 
+    Default = None, which uses the current (activated) Ragaraja 
+    instruction set.
+    @return: list of undo types
+    '''
+    journal = undo_journal(functions)
+    return [journal[instruction] for instruction in instructions]
+
+random_instructions = ['049', '050', '051', '052', '053', '054', '055', 
+                       '056', '057', '058', '059', '060']
+
+def is_deterministic(functions=None):
+    '''
+    Checks whether the execution of any source is deterministic under a 
+    Ragaraja instruction set - none of the instructions using random 
+    numbers (049, and NucleotideBF random operations 050 to 060) are 
+    active. Results of deterministic execution can be cached (see 
+    register_machine.ExecutionCache).
+    
+    @param functions: Dictionary of Ragaraja instructions and handlers. 
+    Default = None, which uses the current (activated) Ragaraja 
+    instruction set.
+    @return: True if execution is deterministic
+    '''
+    if functions is None: functions = ragaraja
+    for instruction in random_instructions:
+        if functions[instruction] is not not_used:
+            return False
+    return True
+
+class InterpreterContext(object):
+    '''
+    Interpreter state of Ragaraja, which is owned by the context instead 
+    of the module - the instruction set (with its dispatch table, journal 
+    of undo types and peephole folds) and the set of 99 registers. The 
+    module state (ragaraja dictionary, which is changed by 
+    activate_version function, and register list) is shared by every 
+    interpreter in the process; hence, interpreters with different 
+    instruction sets or registers (such as simulations in different 
+    threads) can only run in the same process with separate contexts.
+    
+    The stock register instructions (201 to 599) of the context read from 
+    and write to the registers of the context. A context can be given in 
+    place of the dictionary of functions to register_machine.interpret 
+    function, or in place of the dispatch table to 
+    register_machine.interpret_program function.
+    '''
+    def __init__(self, version=1, instructions=None, functions=None,
+                 registers=None):
+        '''
+        Generates the interpreter state.
+        
+        @param version: Ragaraja version of the instruction set (see 
+        activate_version function). Default = 1. 
+        @param instructions: User-defined set of instructions (as list of 
+        instructions in string) to be activated. This will only be 
+        activated when version = 0 or 66.
+        @param functions: Dictionary of Ragaraja instructions and 
+        handlers, which is used instead of generating the instruction set 
+        from version and instructions (the version of the context will 
+        then be None). Default = None.
+        @param registers: List of registers to use, for example, the 
+        module registers (register). Default = None, which creates a new 
+        set of 99 registers.
+        '''
+        if functions == None:
+            functions = instruction_set(version, instructions)
+        else:
+            version = None
+            instructions = None
+        if registers == None:
+            registers = [0] * 99
+        self.version = version
+        self.instructions = instructions
+        self.registers = registers
+        self.journal = undo_journal(functions)
+        self.journal_table = journal_table(functions)
+        self.folds = peephole_table(functions)
+        self.deterministic = is_deterministic(functions)
+        self.functions = dict(functions)
+        for number in range(99):
+            for (instruction, generator) in \
+                [(instruction_padding(201 + number), register_store),
+                 (instruction_padding(301 + number), register_load),
+                 (instruction_padding(501 + number), register_clear)]:
+                if functions[instruction] is stock_ragaraja[instruction]:
+                    self.functions[instruction] = generator(number, 
+                                                            registers)
+        self.table = dispatch_table(self.functions)
+        self.operations = codegen_table(self.functions)
+        self.function_cache = None
+    
+    def generate_functions(self, size=1000, threshold=3):
+        '''
+        Execute the sources which are interpreted a number of times (hot 
+        sources) by Python functions generated from them (see 
+        register_machine.generate_function function) in the later 
+        executions by interpret method, which are kept in a least 
+        recently used cache (see register_machine.FunctionCache).
+        
+        @param size: Maximum number of generated functions to keep. 
+        Default = 1000
+        @type size: integer
+        @param threshold: Number of executions of a source before it is 
+        generated into a function. Default = 3
+        @type threshold: integer
+        '''
+        self.function_cache = register_machine.FunctionCache(
+                                    self.operations, size, threshold)
+    
+    def interpret(self, source, inputdata=[], array=None, size=30, 
+                  max_instructions=1000, peephole=False, profile=None):
+        '''
+        Compile and execute a Ragaraja source (see compile_source 
+        function) in this context, or execute the generated function of 
+        the source if generated functions are used (see 
+        generate_functions method).
+        
+        @param source: Ragaraja source.
+        @type source: string
+        @param inputdata: Any input data that the function may need.
+        @type inputdata: list
+        @param array: Starting tape. Default = None (new tape)
+        @type array: list
+        @param size: Length of the type (array). Default = 30
+        @type size: integer
+        @param max_instructions: The maximum number of instructions to 
+        execute. Default = 1000
+        @type max_instructions: integer
+        @param peephole: Compile the source with peephole folding (see 
+        peephole_table function). Default = False
+        @type peephole: boolean
+        @param profile: register_machine.Profile to collect the execution 
+        statistics into, where the source is always executed by 
+        register_machine.interpret_program function. Default = None (no 
+        statistics).
+        @return: (array, apointer, inputdata, output, source, spointer)
+        '''
+        folds = None
+        if peephole: folds = self.folds
+        if self.function_cache != None and profile == None:
+            return self.function_cache.execute(source, 
+                        lambda source: compile_source(source, folds), 
+                        self.table, inputdata, array, size, 
+                        max_instructions, self.journal_table)
+        return register_machine.interpret_program(
+                    compile_source(source, folds), self.table, inputdata, 
+                    array, size, max_instructions, self.journal_table, 
+                    profile)
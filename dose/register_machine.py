@@ -11,17 +11,49 @@ The machine consists of the following elements:
 
 When the program terminates, all 4 elements are returned, and the 
 machine terminates itself. 
+
+An instruction which fails (raises an exception other than KeyError) is 
+rolled back - the tape, input list and output list are restored to their 
+state before the instruction. Instead of copying all 3 lists before every 
+instruction, the machine keeps an undo log of what the instruction is 
+about to change, as declared by the journal (a mapping of instruction to 
+one of the following undo types):
+    - UNDO_NONE: the instruction does not change the tape, input list or 
+    output list in place (for example, moving the tape pointer).
+    - UNDO_CELL: the instruction only changes the current cell.
+    - UNDO_TAPE: the instruction only changes the tape.
+    - UNDO_OUTPUT: the instruction only appends to the output list.
+    - UNDO_ALL: the instruction may change any of the lists. This is the 
+    default for instructions not in the journal.
+
+Execution statistics of each instruction (number of executions, time and 
+jumps), roll backs and unknown instructions can be collected by giving a 
+Profile object to the interpreter. The functions are only wrapped for 
+counting when a profile is given; hence, the interpreter runs at full 
+speed without a profile.
 '''
+from collections import OrderedDict
+from timeit import default_timer
+
+UNDO_NONE = 0
+UNDO_CELL = 1
+UNDO_TAPE = 2
+UNDO_OUTPUT = 3
+UNDO_ALL = 4
 
 def interpret(source, functions,
              function_size=1, inputdata=[],
-             array=None, size=30, max_instructions=1000):
+             array=None, size=30, max_instructions=1000, journal=None,
+             profile=None):
     '''
     Interpreter loop.
     
     @param source: Instructions to execute.
     @type source: string
-    @param functions: Dictionary of functions / operations.
+    @param functions: Dictionary of functions / operations, or an 
+    interpreter context (an object with functions and journal 
+    attributes, such as ragaraja.InterpreterContext) where the 
+    functions and journal of the context are used.
     @param function_size: Length of each instruction. Default = 1
     @type function_size: integer
     @param inputdata: Any input data that the function may need.
@@ -34,7 +66,22 @@ def interpret(source, functions,
     @param max_instructions: The maximum number of instructions to execute. 
     Default = 1000
     @type max_instructions: integer
+    @param journal: Dictionary of instruction to undo type, for roll back 
+    of failed instruction. Default = None, where every instruction is 
+    undone from a full copy of the tape, input list and output list.
+    @type journal: dictionary
+    @param profile: Profile to collect the execution statistics into. 
+    Default = None (no statistics).
+    @type profile: Profile object
     '''
+    if not isinstance(functions, dict):
+        if journal == None: journal = functions.journal
+        functions = functions.functions
+    if journal == None:
+        journal = {}
+    if profile != None:
+        profile.programs = profile.programs + 1
+        functions = profile.instrument(functions)
     spointer = 0
     apointer = 0
     output = list()
@@ -50,26 +97,28 @@ def interpret(source, functions,
     instruction_count = 0
     while spointer < len(source):
         instruction_count = instruction_count + 1
-        original_array = [x for x in array]
-        original_inputdata = [x for x in inputdata]
-        original_output = [x for x in output]
-        original_source = [x for x in source]
+        undo = None
         try:
             cmd = source[spointer:spointer+function_size]
             #print instruction_count, cmd
+            undo = _journal(journal.get(cmd, UNDO_ALL), array, apointer, 
+                            inputdata, output)
             (array, apointer, inputdata, output,
                 source, spointer) = functions[cmd](array, apointer,
                                                    inputdata, output,
                                                    source, spointer)
         except KeyError:
+            if profile != None: profile.unknowns = profile.unknowns + 1
             print(' '.join(['Unknown function: ', cmd,
                             'at source position', str(spointer)]))
         except:
             # implement roll back operation
-            array = original_array
-            inputdata = original_inputdata
-            output = original_output
-            source = original_source
+            if profile != None: profile.rollbacks = profile.rollbacks + 1
+            (array, inputdata, output) = _undo(undo, array, 
+                                               inputdata, output)
+            return _rolled_back(array, apointer, inputdata, output, 
+                                source, spointer, size, function_size,
+                                instruction_count, max_instructions)
         if apointer > size - 1:
             apointer = apointer - size
         if apointer < 0:
@@ -78,3 +127,1025 @@ def interpret(source, functions,
         if instruction_count > max_instructions:
             return (array, apointer, inputdata, output, source, spointer)
     return (array, apointer, inputdata, output, source, spointer)
+
+class Program(object):
+    '''
+    A source which had been decoded once into a list of integer opcodes, 
+    so that the interpreter loop (interpret_program) need not slice the 
+    source into string instructions at every step. The source is kept as 
+    the instruction handlers may still use it (for example, to report the 
+    length of the source or to reverse it).
+    
+    If the instruction set has loop instructions (a pair of start loop 
+    and end loop instructions, such as "[" and "]" in Brainfuck), the 
+    matching start and end loops are resolved once into a jump table 
+    instead of scanning the source for the matching instruction on every 
+    loop entry and iteration. For each loop instruction, the jump table 
+    holds the source pointer to return when the jump is taken:
+        - start loop: the position before the matching end loop (which 
+        will then be executed), or the end of the source if the loop is 
+        not closed.
+        - end loop: the position of the matching start loop, or its own 
+        position (the end loop is ignored) if there is no preceding start 
+        loop.
+    
+    If the folds of opcodes are given, runs of consecutive instructions 
+    which move the tape pointer or add to the current cell by a constant, 
+    or do nothing, are folded by a peephole pass into a single move and a 
+    single addition, provided that every addition is made to the cell 
+    where the run starts. The steps of the program are the opcodes where 
+    the start of each run is replaced by the run number (as -2 - run 
+    number), and the runs hold the number of instructions, the total 
+    move, the total addition, the largest move (stride) and the number of 
+    additions of each run. A run is only folded if the tape is not 
+    shorter than its stride and, if the run has any addition (even if 
+    the additions cancel out), the current cell is an integer within the 
+    tape, as checked by executing the run one instruction at a time. 
+    Each instruction in a folded run is still counted as an executed 
+    instruction. Runs which are entered after their start (by a jump) 
+    are executed one instruction at a time.
+    '''
+    def __init__(self, source, index, function_size=1, loops=None, 
+                 folds=None):
+        '''
+        Decoding the source into opcodes.
+        
+        @param source: Instructions to execute.
+        @type source: string
+        @param index: Dictionary of instruction to opcode (an integer 
+        which is the position of the instruction's function in the 
+        dispatch table).
+        @param function_size: Length of each instruction. Default = 1
+        @type function_size: integer
+        @param loops: Opcodes of start loop and end loop instructions. 
+        Default = None (no loop instructions).
+        @type loops: tuple
+        @param folds: List of (move, addition) of each opcode for peephole 
+        folding, where the instruction only moves the tape pointer by 
+        move or only adds addition to the current cell, or (0, 0) for an 
+        instruction which does nothing, or None if the instruction cannot 
+        be folded. Default = None (no peephole folding).
+        @type folds: list
+        '''
+        self.index = index
+        self.function_size = function_size
+        self.loops = loops
+        self.folds = folds
+        self.codes = []
+        self.jumps = []
+        self.runs = []
+        self.update(source)
+        
+    def update(self, source):
+        '''
+        Re-decode the opcodes when the source is changed by an 
+        instruction. The jump table is only resolved again if any loop 
+        instruction is changed.
+        
+        @param source: Changed source.
+        @type source: string
+        '''
+        size = self.function_size
+        codes = [self.index.get(source[i:i+size], -1)
+                 for i in range(0, len(source), size)]
+        if self.loops != None:
+            if len(codes) != len(self.codes):
+                changed = True
+            else:
+                changed = [i for i in range(len(codes))
+                           if codes[i] != self.codes[i] and
+                           (codes[i] in self.loops or 
+                            self.codes[i] in self.loops)]
+            if changed:
+                self.jumps = self.jump_table(codes, len(source))
+        if self.folds != None:
+            (self.steps, self.runs) = self.fold_table(codes)
+        else:
+            self.steps = codes
+        self.source = source
+        self.codes = codes
+        
+    def jump_table(self, codes, length):
+        '''
+        Resolve the matching start and end loop instructions.
+        
+        @param codes: Opcodes of the source.
+        @type codes: list
+        @param length: Length of the source.
+        @type length: integer
+        @return: list of source pointer to jump to (None for instructions 
+        which are not loop instructions).
+        '''
+        (start, end) = self.loops
+        size = self.function_size
+        jumps = [None] * len(codes)
+        opened = []
+        for i in range(len(codes)):
+            if codes[i] == start:
+                opened.append(i)
+            elif codes[i] == end and len(opened) > 0:
+                j = opened.pop(-1)
+                jumps[j] = (i - 1) * size
+                jumps[i] = j * size
+            elif codes[i] == end:
+                jumps[i] = i * size
+        for j in opened:
+            jumps[j] = length - 1
+        return jumps
+    
+    def fold_table(self, codes):
+        '''
+        Resolve the runs of instructions which can be folded.
+        
+        @param codes: Opcodes of the source.
+        @type codes: list
+        @return: (steps, runs) where steps is the opcodes with the start 
+        of each run replaced by its run number (as -2 - run number), and 
+        runs is a list of (count, move, addition, stride, additions) for 
+        each run.
+        '''
+        folds = [self.folds[code] if code >= 0 else None 
+                 for code in codes] + [None]
+        steps = list(codes)
+        runs = []
+        count = 0
+        for i in range(len(folds)):
+            fold = folds[i]
+            if fold != None and (count == 0 or fold[1] == 0 or move == 0):
+                if count == 0:
+                    (start, move, addition, stride, additions) = \
+                        (i, 0, 0, 0, 0)
+                count = count + 1
+                move = move + fold[0]
+                addition = addition + fold[1]
+                if abs(fold[0]) > stride: stride = abs(fold[0])
+                if fold[1] != 0: additions = additions + 1
+                continue
+            if count > 1:
+                steps[start] = -2 - len(runs)
+                runs.append((count, move, addition, stride, additions))
+            count = 0
+            if fold != None:
+                (start, move, addition, stride, additions) = \
+                    (i, fold[0], fold[1], abs(fold[0]), 
+                     int(fold[1] != 0))
+                count = 1
+        return (steps, runs)
+
+def compile_source(source, tokens, function_size=1, index=None, 
+                   loops=None, folds=None):
+    '''
+    Decode a source into a Program object, in preparation for execution 
+    by interpret_program function. The source will be treated in the 
+    same way as interpret function - if the length of the source is not 
+    a multiple of the instruction length, it will be padded and filtered 
+    by the allowable tokens.
+    
+    @param source: Instructions to execute.
+    @type source: string
+    @param tokens: List of allowable instructions, where the position of 
+    the instruction in the list is its opcode.
+    @type tokens: list
+    @param function_size: Length of each instruction. Default = 1
+    @type function_size: integer
+    @param index: Dictionary of instruction to opcode, which is generated 
+    from tokens if not given. Default = None
+    @type index: dictionary
+    @param loops: Start loop and end loop instructions, for resolving 
+    the jump table of the program. Default = None (no loop instructions)
+    @type loops: tuple
+    @param folds: List of (move, addition) of each opcode for peephole 
+    folding (see Program). Default = None (no peephole folding)
+    @type folds: list
+    @return: Program object
+    '''
+    if index == None:
+        index = dict([(tokens[i], i) for i in range(len(tokens))])
+    if len(source) % function_size != 0:
+        source = source + '!'*(function_size - \
+                               len(source) % function_size)
+        source = ''.join([x for x in source if x in index])
+    if loops != None:
+        loops = (index[loops[0]], index[loops[1]])
+    return Program(source, index, function_size, loops, folds)
+
+def interpret_program(program, table, inputdata=[], 
+                      array=None, size=30, max_instructions=1000,
+                      journal=None, profile=None):
+    '''
+    Interpreter loop for compiled program (see compile_source function). 
+    This is equivalent to interpret function, except that each opcode is 
+    used to index the dispatch table directly instead of slicing the 
+    instruction from the source and looking up the dictionary of 
+    functions. A loop instruction takes its jump by returning None as 
+    the source pointer, and the source pointer is then taken from the 
+    jump table of the program. If the program is compiled with peephole 
+    folding, a run of folded instructions is executed in one step, 
+    unless the current cell is not an integer or the tape pointer is 
+    outside the tape (where the run is executed one instruction at a 
+    time, as the result may differ).
+    
+    @param program: Program to execute.
+    @type program: Program object
+    @param table: List of functions / operations, indexed by opcode, or 
+    an interpreter context (an object with table and journal_table 
+    attributes, such as ragaraja.InterpreterContext) where the dispatch 
+    table and journal of the context are used.
+    @type table: list
+    @param inputdata: Any input data that the function may need.
+    @type inputdata: list
+    @param array: The endless tape in a Turing machine which is implemented
+    as a circular list, making it virtually limitless.
+    @type array: list
+    @param size: Length of the type (array). Default = 30
+    @type size: integer
+    @param max_instructions: The maximum number of instructions to execute. 
+    Default = 1000
+    @type max_instructions: integer
+    @param journal: List of undo types, indexed by opcode, for roll back 
+    of failed instruction. Default = None, where every instruction is 
+    undone from a full copy of the tape, input list and output list.
+    @type journal: list
+    @param profile: Profile to collect the execution statistics into, 
+    where the instructions are identified by their opcodes. Folded runs 
+    are not counted. Default = None (no statistics).
+    @type profile: Profile object
+    @return: (array, apointer, inputdata, output, source, spointer)
+    '''
+    if not isinstance(table, list):
+        if journal == None: journal = table.journal_table
+        table = table.table
+    if journal == None:
+        journal = [UNDO_ALL] * len(table)
+    if profile != None:
+        profile.programs = profile.programs + 1
+        table = profile.instrument(table)
+    if array == None:
+        array = [0] * size
+    if len(array) > size:
+        array = array[0:size]
+    return _execute(program, table, journal, inputdata, array, size, 
+                    max_instructions, 0, 0, list(), 0, profile)
+
+class ExecutionCache(object):
+    '''
+    Least recently used (LRU) cache of execution results, to skip the 
+    execution of a source which had been executed from the same state 
+    (same tape, input list and registers). This is only correct if the 
+    execution is deterministic; for example, the instruction set does not 
+    have instructions using random numbers.
+    
+    A cache hit reproduces the results of the execution - the returned 
+    tape, input list and output list are new lists (as with an 
+    execution) while the given tape, input list and registers are updated 
+    in place to their state after the execution.
+    '''
+    def __init__(self, size=1000):
+        '''
+        Initialize the cache.
+        
+        @param size: Maximum number of execution results to keep. 
+        Default = 1000
+        @type size: integer
+        '''
+        self.size = size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def execute(self, function, source, inputdata, array, registers=None):
+        '''
+        Execute a source, or reproduce the results of an earlier execution 
+        of the source from the same state.
+        
+        @param function: Function taking (inputdata, array) to execute the 
+        source, and returning (array, apointer, inputdata, output, source, 
+        spointer) as interpret function.
+        @param source: Instructions to execute.
+        @type source: string
+        @param inputdata: Input data for the execution.
+        @type inputdata: list
+        @param array: Starting tape of the execution (None for a new tape).
+        @type array: list
+        @param registers: Registers which may be used or changed by the 
+        execution. Default = None (no registers).
+        @type registers: list
+        @return: (array, apointer, inputdata, output, source, spointer)
+        '''
+        try:
+            key = (source, _fingerprint(inputdata), _fingerprint(array), 
+                   _fingerprint(registers))
+            hash(key)
+        except TypeError:
+            return function(inputdata, array)
+        if key in self.results:
+            self.hits = self.hits + 1
+            record = self.results.pop(key)
+            self.results[key] = record
+            return self.replay(record, inputdata, array, registers)
+        self.misses = self.misses + 1
+        result = function(inputdata, array)
+        self.results[key] = self.record(result, inputdata, array, registers)
+        if len(self.results) > self.size:
+            self.results.popitem(last=False)
+        return result
+    
+    def record(self, result, inputdata, array, registers):
+        '''
+        Copy the results of an execution, and the state of the given tape, 
+        input list and registers after the execution, for replay function.
+        '''
+        (r_array, apointer, r_inputdata, output, source, spointer) = result
+        array_returned = r_array is array
+        input_returned = r_inputdata is inputdata
+        if array != None: array = [x for x in array]
+        if registers != None: registers = [x for x in registers]
+        return ([x for x in r_array], array_returned, apointer, 
+                [x for x in r_inputdata], input_returned,
+                [x for x in output], _copy(source), spointer,
+                [x for x in inputdata], array, registers)
+                
+    def replay(self, record, inputdata, array, registers):
+        '''
+        Reproduce the results of an execution from its record (from 
+        record function).
+        '''
+        (r_array, array_returned, apointer, r_inputdata, input_returned, 
+         output, source, spointer, final_inputdata, final_array, 
+         final_registers) = record
+        inputdata[:] = final_inputdata
+        if final_array != None: array[:] = final_array
+        if final_registers != None: registers[:] = final_registers
+        if array_returned: r_array = array
+        else: r_array = [x for x in r_array]
+        if input_returned: r_inputdata = inputdata
+        else: r_inputdata = [x for x in r_inputdata]
+        return (r_array, apointer, r_inputdata, [x for x in output], 
+                _copy(source), spointer)
+    
+    def counters(self):
+        '''
+        Returns the number of cache hits and misses since the cache is 
+        initialized or since the counters are reset.
+        
+        @return: (hits, misses)
+        '''
+        return (self.hits, self.misses)
+    
+    def reset_counters(self):
+        '''
+        Reset the number of cache hits and misses to zero.
+        '''
+        self.hits = 0
+        self.misses = 0
+
+def generate_function(program, operations):
+    '''
+    Generate a Python function which executes a compiled program (see 
+    compile_source function) in the same way as interpret_program 
+    function. Each block of instructions without jumps is generated as 
+    straight-line code, a balanced loop (a loop start instruction with its 
+    matching loop end instruction) is generated as a while loop, simple 
+    tape operations are generated inline and other instructions are 
+    generated as calls to the dispatch table. The number of executed 
+    instructions is counted per block.
+    
+    The generated function cannot take every path of the interpreter - a 
+    block which would exceed the maximum number of instructions or which 
+    starts with the tape pointer outside the tape, an instruction which 
+    changes the source or jumps, an unknown instruction and a failed 
+    inline instruction. On such path, the generated function hands the 
+    execution to the interpreter loop from the same state, which 
+    continues (or re-executes the failed inline instruction) from there. 
+    A failed instruction called from the dispatch table is rolled back 
+    as by the interpreter loop, without executing it again (which may 
+    not fail again, such as an instruction using random numbers).
+    
+    @param program: Program to generate the function from.
+    @type program: Program object
+    @param operations: List of operations, indexed by opcode, which can 
+    be generated inline - ('move', n) to move the tape pointer by n cells, 
+    ('add', n) to add n to the current cell, ('output',) to append the 
+    current cell to the output list, ('nop',) for no operation, ('start',) 
+    and ('end',) for loop start and loop end instructions which jump as 
+    ragaraja.jump_loop_start and ragaraja.jump_loop_end functions, or 
+    None for an instruction to be called from the dispatch table.
+    @type operations: list
+    @return: Function taking (table, inputdata, array, size, 
+    max_instructions, journal, compile), where compile is a function 
+    returning the compiled program of the source for the interpreter 
+    loop, and returning (array, apointer, inputdata, output, source, 
+    spointer) as interpret_program function; or None if the function 
+    cannot be generated (such as a program with too deeply nested loops).
+    '''
+    codes = program.codes
+    function_size = program.function_size
+    loops = {}
+    opened = []
+    for position in range(len(codes)):
+        if codes[position] < 0: continue
+        operation = operations[codes[position]]
+        if operation == ('start',):
+            opened.append(position)
+        elif operation == ('end',) and len(opened) > 0:
+            loops[opened.pop(-1)] = position
+    remaining = [0] * len(codes)
+    lines = ['def execute(table, inputdata, array, size, max_instructions, '
+             'journal, compile):',
+             '    output = []',
+             '    if array == None: array = [0] * size',
+             '    if len(array) > size: array = array[0:size]',
+             '    apointer = 0',
+             '    count = 0',
+             '    k = 0',
+             '    undo = False',
+             '    try:']
+    _generate_region(lines, 2, 0, len(codes), codes, operations, loops, 
+                     remaining, function_size)
+    if len(codes) == 0: lines.append('        pass')
+    lines = lines + \
+        ['    except Exception:',
+         '        if undo is not False:',
+         '            (array, inputdata, output) = _undo(undo, array, '
+         'inputdata, output)',
+         '            return _rolled_back(array, apointer, inputdata, '
+         'output, source, k * %s, size, %s, count - remaining[k], '
+         'max_instructions)' % (function_size, function_size),
+         '        return _execute(compile(source), table, journal, '
+         'inputdata, array, size, max_instructions, k * %s, apointer, '
+         'output, count - remaining[k] - 1)' % function_size,
+         '    return (array, apointer, inputdata, output, source, %s)' % 
+         (len(codes) * function_size)]
+    namespace = {'_execute': _execute, '_proceed': _proceed, 
+                 '_journal': _journal, '_undo': _undo, 
+                 '_rolled_back': _rolled_back,
+                 'source': program.source, 'remaining': remaining}
+    try:
+        exec(compile('\n'.join(lines), '<program>', 'exec'), namespace)
+    except (SyntaxError, RecursionError, MemoryError):
+        return None
+    return namespace['execute']
+
+def _generate_region(lines, indent, start, end, codes, operations, loops,
+                     remaining, function_size):
+    '''
+    Generates the code of the instructions from start to end (excluding 
+    end) of a program for generate_function function - a block of 
+    instructions is generated for each run of instructions between 
+    balanced loops, and a while loop for each balanced loop.
+    '''
+    block = []
+    position = start
+    while position < end:
+        if position in loops:
+            _generate_block(lines, indent, block, codes, operations, 
+                            remaining, function_size)
+            _generate_loop(lines, indent, position, loops[position], codes, 
+                           operations, loops, remaining, function_size)
+            block = []
+            position = loops[position] + 1
+        else:
+            block.append(position)
+            position = position + 1
+    _generate_block(lines, indent, block, codes, operations, remaining, 
+                    function_size)
+
+def _resume(position, count, function_size):
+    '''
+    Generates the code to hand the execution to the interpreter loop at 
+    the given instruction position, after the given number of executed 
+    instructions.
+    '''
+    return 'return _execute(compile(source), table, journal, inputdata, ' \
+           'array, size, max_instructions, %s, apointer, output, %s)' % \
+           (position * function_size, count)
+
+def _generate_loop(lines, indent, start, end, codes, operations, loops, 
+                   remaining, function_size):
+    '''
+    Generates the code of a balanced loop for generate_function function. 
+    The loop start instruction jumps to (and executes) the loop end 
+    instruction if the current cell is not more than zero, and the loop 
+    end instruction jumps to the instruction after the loop start 
+    instruction unless the current cell is less than one.
+    '''
+    pad = '    ' * indent
+    lines.extend([
+        pad + 'if count >= max_instructions or apointer < 0 or '
+              'apointer >= size:',
+        pad + '    ' + _resume(start, 'count', function_size),
+        pad + 'count = count + 1',
+        pad + 'k = %s' % start,
+        pad + 'if array[apointer] > 0:',
+        pad + '    entered = True',
+        pad + 'else:',
+        pad + '    if count >= max_instructions:',
+        pad + '        ' + _resume(end, 'count', function_size),
+        pad + '    count = count + 1',
+        pad + '    k = %s' % end,
+        pad + '    entered = not (array[apointer] < 1)',
+        pad + 'while entered:'])
+    _generate_region(lines, indent + 1, start + 1, end, codes, operations, 
+                     loops, remaining, function_size)
+    lines.extend([
+        pad + '    if count >= max_instructions or apointer < 0 or '
+              'apointer >= size:',
+        pad + '        ' + _resume(end, 'count', function_size),
+        pad + '    count = count + 1',
+        pad + '    k = %s' % end,
+        pad + '    entered = not (array[apointer] < 1)'])
+
+def _generate_block(lines, indent, block, codes, operations, remaining, 
+                    function_size):
+    '''
+    Generates the code of a block of instructions (without balanced 
+    loops) for generate_function function. The number of instructions 
+    in the block is counted once at the start of the block, where the 
+    tape pointer is checked to be within the tape; hence, the tape 
+    pointer stays within the tape after each inline move if no move is 
+    longer than the tape.
+    '''
+    if len(block) == 0: return
+    pad = '    ' * indent
+    stride = 0
+    for position in block:
+        if codes[position] >= 0 and operations[codes[position]] != None \
+            and operations[codes[position]][0] == 'move':
+            stride = max(stride, abs(operations[codes[position]][1]))
+    check = 'apointer < 0 or apointer >= size'
+    if stride > 1: check = check + ' or size < %s' % stride
+    lines.extend([
+        pad + 'if count > max_instructions - %s or %s:' % (len(block), check),
+        pad + '    ' + _resume(block[0], 'count', function_size),
+        pad + 'count = count + %s' % len(block)])
+    for index in range(len(block)):
+        position = block[index]
+        left = len(block) - index - 1
+        remaining[position] = left
+        code = codes[position]
+        if code < 0:
+            lines.append(pad + _resume(position, 'count - %s' % (left + 1), 
+                                       function_size))
+            return
+        operation = operations[code]
+        if operation == None or operation[0] in ('start', 'end'):
+            _generate_call(lines, pad, position, code, left, function_size)
+        elif operation[0] == 'move' and operation[1] > 0:
+            lines.extend([
+                pad + 'apointer = apointer + %s' % operation[1],
+                pad + 'if apointer > size - 1: apointer = apointer - size'])
+        elif operation[0] == 'move' and operation[1] < 0:
+            lines.extend([
+                pad + 'apointer = apointer - %s' % -operation[1],
+                pad + 'if apointer < 0: apointer = size + apointer'])
+        elif operation[0] == 'add' and operation[1] != 0:
+            lines.extend([
+                pad + 'k = %s' % position,
+                pad + 'array[apointer] = array[apointer] + %r' % 
+                      operation[1]])
+        elif operation[0] == 'output':
+            lines.extend([
+                pad + 'k = %s' % position,
+                pad + 'output.append(array[apointer])'])
+
+def _generate_call(lines, pad, position, code, left, function_size):
+    '''
+    Generates the code of an instruction which is called from the 
+    dispatch table for generate_function function.
+    '''
+    spointer = position * function_size
+    lines.extend([
+        pad + 'k = %s' % position,
+        pad + 'undo = _journal(journal[%s], array, apointer, inputdata, '
+              'output)' % code,
+        pad + '(array, apointer, inputdata, output, new_source, spointer) '
+              '= table[%s](array, apointer, inputdata, output, source, %s)' 
+              % (code, spointer),
+        pad + 'undo = False',
+        pad + 'if spointer != %s or new_source is not source:' % spointer,
+        pad + '    return _proceed(compile(source), table, journal, '
+              'inputdata, array, size, max_instructions, %s, spointer, '
+              'new_source, apointer, output, count - %s)' % 
+              (spointer, left),
+        pad + 'if apointer > size - 1: apointer = apointer - size',
+        pad + 'if apointer < 0: apointer = size + apointer',
+        pad + 'if apointer < 0 or apointer >= size:',
+        pad + '    ' + _resume(position + 1, 'count - %s' % left, 
+                               function_size)])
+
+class FunctionCache(object):
+    '''
+    Least recently used (LRU) cache of functions generated from sources 
+    (see generate_function function). As generating a function costs 
+    more than interpreting the source a few times, a source is only 
+    generated into a function after it has been executed a number of 
+    times (hot source), and is interpreted by interpret_program function 
+    until then.
+    '''
+    def __init__(self, operations, size=1000, threshold=3):
+        '''
+        Initialize the cache.
+        
+        @param operations: List of operations, indexed by opcode, which 
+        can be generated inline (see generate_function function).
+        @type operations: list
+        @param size: Maximum number of generated functions to keep. 
+        Default = 1000
+        @type size: integer
+        @param threshold: Number of executions of a source before it is 
+        generated into a function. Default = 3
+        @type threshold: integer
+        '''
+        self.operations = operations
+        self.size = size
+        self.threshold = threshold
+        self.functions = OrderedDict()
+        self.executions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def execute(self, source, compile, table, inputdata=[], array=None, 
+                size=30, max_instructions=1000, journal=None):
+        '''
+        Execute a source by its generated function, or by 
+        interpret_program function if the source is not hot.
+        
+        @param source: Instructions to execute.
+        @type source: string
+        @param compile: Function taking a source and returning its 
+        compiled program (see compile_source function).
+        @param table: List of functions / operations, indexed by opcode.
+        @type table: list
+        @param journal: List of undo types, indexed by opcode. Default = 
+        None, where every instruction is undone from a full copy of the 
+        tape, input list and output list.
+        @type journal: list
+        @return: (array, apointer, inputdata, output, source, spointer)
+        '''
+        if journal == None:
+            journal = [UNDO_ALL] * len(table)
+        if source in self.functions:
+            self.hits = self.hits + 1
+            function = self.functions.pop(source)
+            self.functions[source] = function
+        else:
+            self.misses = self.misses + 1
+            executions = self.executions.pop(source, 0) + 1
+            function = None
+            if executions < self.threshold:
+                self.executions[source] = executions
+                if len(self.executions) > self.size:
+                    self.executions.popitem(last=False)
+            else:
+                function = generate_function(compile(source), 
+                                             self.operations)
+                self.functions[source] = function
+                if len(self.functions) > self.size:
+                    self.functions.popitem(last=False)
+        if function == None:
+            return interpret_program(compile(source), table, inputdata, 
+                                     array, size, max_instructions, journal)
+        return function(table, inputdata, array, size, max_instructions, 
+                        journal, compile)
+    
+    def counters(self):
+        '''
+        Returns the number of executions by generated functions (hits) 
+        and executions of sources without generated function (misses) 
+        since the cache is initialized or since the counters are reset.
+        
+        @return: (hits, misses)
+        '''
+        return (self.hits, self.misses)
+    
+    def reset_counters(self):
+        '''
+        Reset the number of cache hits and misses to zero.
+        '''
+        self.hits = 0
+        self.misses = 0
+
+class Profile(object):
+    '''
+    Execution statistics of interpreted programs - the number of 
+    executions, cumulative time and number of jumps (the source pointer 
+    is changed, such as a loop iteration) of each instruction, and the 
+    number of executed programs, roll backs and unknown instructions. 
+    
+    Statistics are collected by giving the profile to interpret or 
+    interpret_program function, which then executes the functions wrapped 
+    by instrument method. The time of an instruction is the time spent 
+    in its function. The total statistics of a group of programs (such as 
+    the chromosomes of an organism) can be kept by record method.
+    '''
+    def __init__(self):
+        '''
+        Initialize an empty profile.
+        '''
+        self.executions = {}
+        self.times = {}
+        self.jumps = {}
+        self.programs = 0
+        self.rollbacks = 0
+        self.unknowns = 0
+        self.records = []
+        self.recorded = (0, 0, 0, 0, 0, 0)
+        self.instrumented = {}
+    
+    def instrument(self, functions):
+        '''
+        Wrap the functions / operations of an interpreter to collect 
+        their execution statistics into this profile. The wrapped 
+        functions are kept for later calls with the same functions.
+        
+        @param functions: Dictionary of functions (as interpret function) 
+        or list of functions indexed by opcode (as interpret_program 
+        function).
+        @return: wrapped functions as dictionary or list
+        '''
+        key = id(functions)
+        if key in self.instrumented and \
+            self.instrumented[key][0] == functions:
+            return self.instrumented[key][1]
+        if isinstance(functions, dict):
+            original = dict(functions)
+            wrapped = dict([(instruction, self.wrap(instruction, function))
+                            for (instruction, function) in original.items()])
+        else:
+            original = list(functions)
+            wrapped = [self.wrap(code, original[code]) 
+                       for code in range(len(original))]
+        self.instrumented[key] = (original, wrapped)
+        return wrapped
+    
+    def wrap(self, instruction, function):
+        '''
+        Wrap a function of an instruction to collect its execution 
+        statistics into this profile.
+        '''
+        executions = self.executions
+        times = self.times
+        jumps = self.jumps
+        for statistics in (executions, times, jumps):
+            if instruction not in statistics: statistics[instruction] = 0
+        def handler(array, apointer, inputdata, output, source, spointer):
+            start = default_timer()
+            try:
+                result = function(array, apointer, inputdata, output, 
+                                  source, spointer)
+            finally:
+                times[instruction] = times[instruction] + \
+                    default_timer() - start
+                executions[instruction] = executions[instruction] + 1
+            if result[5] != spointer:
+                jumps[instruction] = jumps[instruction] + 1
+            return result
+        return handler
+    
+    def statistics(self):
+        '''
+        Returns the statistics of each executed instruction.
+        
+        @return: list of (instruction, executions, time, jumps), sorted by 
+        instruction
+        '''
+        return [(instruction, self.executions[instruction], 
+                 self.times[instruction], self.jumps[instruction])
+                for instruction in sorted(self.executions.keys(), 
+                    key=lambda instruction: (str(type(instruction)), 
+                                             instruction))
+                if self.executions[instruction] > 0]
+    
+    def totals(self):
+        '''
+        Returns the total statistics of all instructions.
+        
+        @return: (programs, executions, time, jumps, rollbacks, unknowns)
+        '''
+        return (self.programs, sum(self.executions.values()), 
+                sum(self.times.values()), sum(self.jumps.values()), 
+                self.rollbacks, self.unknowns)
+    
+    def record(self, name):
+        '''
+        Record the total statistics of the programs executed since the 
+        last record (or since the profile is initialized or reset) under a 
+        name.
+        
+        @param name: Name of the record, such as the name of an organism.
+        @return: (name, programs, executions, time, jumps, rollbacks, 
+        unknowns)
+        '''
+        totals = self.totals()
+        record = tuple([name] + [totals[i] - self.recorded[i] 
+                                 for i in range(len(totals))])
+        self.records.append(record)
+        self.recorded = totals
+        return record
+    
+    def reset(self):
+        '''
+        Reset all statistics to zero and remove all records.
+        '''
+        for statistics in (self.executions, self.times, self.jumps):
+            for instruction in statistics:
+                statistics[instruction] = 0
+        self.programs = 0
+        self.rollbacks = 0
+        self.unknowns = 0
+        self.records = []
+        self.recorded = (0, 0, 0, 0, 0, 0)
+
+def _fingerprint(data):
+    '''
+    Returns a hashable fingerprint of a list for ExecutionCache, which 
+    distinguishes values of different types (such as 1 and 1.0) as they 
+    may give different results.
+    '''
+    if data == None: return None
+    return tuple([(x.__class__, x) for x in data])
+
+def _copy(source):
+    '''
+    Returns a copy of a source, which may be a list after a roll back.
+    '''
+    if isinstance(source, list): return [x for x in source]
+    return source
+
+def _journal(kind, array, apointer, inputdata, output):
+    '''
+    Records the undo log of an instruction before it is executed. The 
+    current cell can only be recorded if the tape pointer is within the 
+    tape (the tape may be shorter than its size) - otherwise, the whole 
+    tape is recorded, as reading the cell would fail before the 
+    instruction is executed.
+    
+    @param kind: Undo type of the instruction.
+    @return: undo log for _undo function.
+    '''
+    if kind == UNDO_NONE:
+        return None
+    if kind == UNDO_CELL:
+        if type(apointer) is int and 0 <= apointer < len(array):
+            return (UNDO_CELL, apointer, array[apointer])
+        return (UNDO_TAPE, [x for x in array])
+    if kind == UNDO_TAPE:
+        return (UNDO_TAPE, [x for x in array])
+    if kind == UNDO_OUTPUT:
+        return (UNDO_OUTPUT, len(output))
+    return (UNDO_ALL, [x for x in array], [x for x in inputdata], 
+            [x for x in output])
+
+def _undo(undo, array, inputdata, output):
+    '''
+    Rolls back a failed instruction by replaying its undo log (from 
+    _journal function). As with a roll back from full copies of the tape, 
+    input list and output list, new lists are returned.
+    
+    @return: (array, inputdata, output)
+    '''
+    array = [x for x in array]
+    inputdata = [x for x in inputdata]
+    output = [x for x in output]
+    if undo == None:
+        return (array, inputdata, output)
+    if undo[0] == UNDO_CELL:
+        array[undo[1]] = undo[2]
+    elif undo[0] == UNDO_TAPE:
+        array = undo[1]
+    elif undo[0] == UNDO_OUTPUT:
+        output = output[:undo[1]]
+    else:
+        (array, inputdata, output) = undo[1:]
+    return (array, inputdata, output)
+
+def _rolled_back(array, apointer, inputdata, output, source, spointer, 
+                 size, function_size, instruction_count, max_instructions):
+    '''
+    Completes the execution of a program after a rolled back instruction. 
+    Roll back restores the source as a list of characters; hence, no 
+    further instruction can be dispatched and the remaining instructions 
+    are only counted (each of them would fail and be rolled back to the 
+    same state). This function reproduces the same end state without 
+    executing them.
+    '''
+    source = [x for x in source]
+    while True:
+        if apointer > size - 1:
+            apointer = apointer - size
+        if apointer < 0:
+            apointer = size + apointer
+        spointer = spointer + function_size
+        if instruction_count > max_instructions or \
+            spointer >= len(source):
+            return (array, apointer, inputdata, output, source, spointer)
+        instruction_count = instruction_count + 1
+
+def _execute(program, table, journal, inputdata, array, size, 
+             max_instructions, spointer, apointer, output, 
+             instruction_count, profile=None):
+    '''
+    Interpreter loop of interpret_program function, which executes a 
+    program from the given state (source pointer, tape pointer, output 
+    list and number of executed instructions) - from the start of the 
+    program by interpret_program function, or from the middle of the 
+    program by a generated function (see generate_function) which cannot 
+    continue.
+    
+    @return: (array, apointer, inputdata, output, source, spointer)
+    '''
+    function_size = program.function_size
+    source = program.source
+    codes = program.steps
+    while spointer < len(source):
+        instruction_count = instruction_count + 1
+        undo = None
+        try:
+            if spointer < 0:
+                # negative source pointer wraps around the source
+                code = program.index.get(source[spointer:spointer + \
+                                                function_size], -1)
+            else:
+                code = codes[spointer // function_size]
+            if code < -1:
+                # folded run - executed in one step if it is within the 
+                # maximum number of instructions
+                (count, move, addition, stride, additions) = \
+                    program.runs[-2 - code]
+                code = program.codes[spointer // function_size]
+                if count <= max_instructions + 2 - instruction_count and \
+                    stride <= size and type(apointer) is int and \
+                    apointer >= 0 and apointer < size and \
+                    (additions == 0 or (apointer < len(array) and 
+                                        type(array[apointer]) is int)):
+                    if addition != 0:
+                        array[apointer] = array[apointer] + addition
+                    apointer = (apointer + move) % size
+                    instruction_count = instruction_count + count - 1
+                    spointer = spointer + count * function_size
+                    if instruction_count > max_instructions:
+                        return (array, apointer, inputdata, output, 
+                                source, spointer)
+                    continue
+            if code < 0: raise KeyError(code)
+            undo = _journal(journal[code], array, apointer, 
+                            inputdata, output)
+            position = spointer
+            (array, apointer, inputdata, output,
+                new_source, spointer) = table[code](array, apointer,
+                                                    inputdata, output,
+                                                    source, spointer)
+            if spointer == None:
+                spointer = program.jumps[position // function_size]
+            if new_source is not source:
+                program.update(new_source)
+                source = program.source
+                codes = program.steps
+        except KeyError:
+            if profile != None: profile.unknowns = profile.unknowns + 1
+            cmd = source[spointer:spointer+function_size]
+            print(' '.join(['Unknown function: ', cmd,
+                            'at source position', str(spointer)]))
+        except:
+            # implement roll back operation
+            if profile != None: profile.rollbacks = profile.rollbacks + 1
+            (array, inputdata, output) = _undo(undo, array, 
+                                               inputdata, output)
+            return _rolled_back(array, apointer, inputdata, output, 
+                                source, spointer, size, function_size,
+                                instruction_count, max_instructions)
+        if apointer > size - 1:
+            apointer = apointer - size
+        if apointer < 0:
+            apointer = size + apointer
+        spointer = spointer + function_size
+        if instruction_count > max_instructions:
+            return (array, apointer, inputdata, output, source, spointer)
+    return (array, apointer, inputdata, output, source, spointer)
+
+def _proceed(program, table, journal, inputdata, array, size, 
+             max_instructions, position, spointer, source, apointer, 
+             output, instruction_count):
+    '''
+    Completes an instruction, which jumps or changes the source, executed 
+    by a generated function (see generate_function) as the interpreter 
+    loop of interpret_program function, and continues the execution in 
+    the interpreter loop.
+    
+    @return: (array, apointer, inputdata, output, source, spointer)
+    '''
+    if spointer == None:
+        spointer = program.jumps[position // program.function_size]
+    if source is not program.source:
+        program.update(source)
+    if apointer > size - 1:
+        apointer = apointer - size
+    if apointer < 0:
+        apointer = size + apointer
+    spointer = spointer + program.function_size
+    if instruction_count > max_instructions:
+        return (array, apointer, inputdata, output, program.source, 
+                spointer)
+    return _execute(program, table, journal, inputdata, array, size, 
+                    max_instructions, spointer, apointer, output, 
+                    instruction_count)
@@ -6,6 +6,9 @@ functions.
 Date created: 10th October 2013
 '''
 import random, inspect, os
+import csv
+import dis
+import multiprocessing
 import os.path
 from datetime import datetime
 from time import time
@@ -23,11 +26,13 @@ except ImportError:
 from . import dose_world
 from . import genetic
 from . import ragaraja, register_machine
+from . import lockstep_machine
 
 from .database_calls import connect_database, db_log_simulation_parameters
-from .database_calls import db_report
+from .database_calls import db_report, db_log_profile
 
-def simulation_core(sim_functions, sim_parameters, Populations, World):
+def simulation_core(sim_functions, sim_parameters, Populations, World, 
+                    context=None):
     '''
     Sequential ecological cell DOSE simulator.
     
@@ -50,6 +55,11 @@ def simulation_core(sim_functions, sim_parameters, Populations, World):
     @param sim_parameters: simulation parameters dictionary (see Examples)
     @param Populations: dictionary of population objects
     @param World: dose_world.World object
+    @param context: ragaraja.InterpreterContext to interpret the 
+    chromosomes. Default = None, where the context is generated from 
+    ragaraja_version (and ragaraja_instructions) in the simulation 
+    parameters. The module state of Ragaraja (ragaraja.ragaraja and 
+    ragaraja.register) is not changed by the simulation.
     '''
     # Step 1: - Generate a simulation start time to identify the 
     # current simulation
@@ -68,17 +78,51 @@ def simulation_core(sim_functions, sim_parameters, Populations, World):
     sim_parameters["starting_time"] = time_start
     sim_functions = sim_functions()
     # Step 3: Define active Ragaraja instructions
-    if sim_parameters["ragaraja_version"] == 0 or \
+    if sim_parameters["ragaraja_version"] == 'user-defined':
+        pass
+    elif context != None:
+        print('Using given ragaraja interpreter context...')
+    elif sim_parameters["ragaraja_version"] == 0 or \
         sim_parameters["ragaraja_version"] == 66:
         print('Activating ragaraja version: 0...')
-        ragaraja.activate_version(sim_parameters["ragaraja_version"],
-                                  sim_parameters["ragaraja_instructions"])
-    elif sim_parameters["ragaraja_version"] == 'user-defined':
-        pass
+        context = ragaraja.InterpreterContext(
+                        sim_parameters["ragaraja_version"],
+                        sim_parameters["ragaraja_instructions"])
     else:
         print('Activating ragaraja version: ' + \
             str(sim_parameters["ragaraja_version"]) + '...')
-        ragaraja.activate_version(sim_parameters["ragaraja_version"])
+        context = ragaraja.InterpreterContext(
+                        sim_parameters["ragaraja_version"])
+    cache = None
+    if "interpreter_cache" in sim_parameters and \
+        sim_parameters["interpreter_cache"] and \
+        sim_parameters["ragaraja_version"] != 'user-defined':
+        if context.deterministic:
+            print('Activating interpreter cache...')
+            cache = register_machine.ExecutionCache(
+                        int(sim_parameters["interpreter_cache"]))
+        else:
+            print('Interpreter cache not activated - random instructions ' + \
+                'are active...')
+    if "interpreter_codegen" in sim_parameters and \
+        sim_parameters["interpreter_codegen"] and \
+        sim_parameters["ragaraja_version"] != 'user-defined':
+        print('Activating code generation of hot chromosomes...')
+        context.generate_functions(int(sim_parameters["interpreter_codegen"]))
+    profiles = dict([(pop_name, None) for pop_name in Populations])
+    if "interpreter_profile" in sim_parameters and \
+        sim_parameters["interpreter_profile"]:
+        print('Activating interpreter profiling...')
+        profiles = dict([(pop_name, register_machine.Profile()) 
+                         for pop_name in Populations])
+    pool = None
+    if "interpreter_workers" in sim_parameters and \
+        sim_parameters["interpreter_workers"] and \
+        int(sim_parameters["interpreter_workers"]) > 1 and \
+        sim_parameters["ragaraja_version"] != 'user-defined':
+        print('Starting ' + str(sim_parameters["interpreter_workers"]) + \
+            ' interpreter worker processes...')
+        pool = multiprocessing.Pool(int(sim_parameters["interpreter_workers"]))
     # Step 4: Connecting to logging database (if needed)
     if "database_file" in sim_parameters and \
         "database_logging_frequency" in sim_parameters: 
@@ -124,23 +168,92 @@ def simulation_core(sim_functions, sim_parameters, Populations, World):
         write_parameters(sim_parameters, pop_name)
         print('Updating generation count...')
         Populations[pop_name].generation = generation_count
+    if "fitness_cache" in sim_parameters and sim_parameters["fitness_cache"]:
+        print('Activating fitness cache...')
+        for pop_name in Populations:
+            Populations[pop_name].fitness_cache = \
+                genetic.FitnessCache(int(sim_parameters["fitness_cache"]))
+    if "organism_pool" in sim_parameters and sim_parameters["organism_pool"]:
+        print('Activating organism pools...')
+        for pop_name in Populations:
+            Populations[pop_name].pool = \
+                genetic.OrganismPool(int(sim_parameters["organism_pool"]),
+                    "organism_pool_freeze" in sim_parameters and 
+                    sim_parameters["organism_pool_freeze"])
+    if "identity_type" in sim_parameters and sim_parameters["identity_type"]:
+        print('Setting organism identity type: ' + \
+            str(sim_parameters["identity_type"]) + '...')
+        genetic.identity_type = sim_parameters["identity_type"]
+        # continue serial numbers after those of revived organisms
+        identities = [organism.status['identity'] 
+                      for pop_name in Populations 
+                      for organism in Populations[pop_name].agents
+                      if isinstance(organism.status['identity'], int)]
+        genetic.serial_identity[0] = sorted(identities + 
+                                            [genetic.serial_identity[0]])[-1]
+    if "location_index" in sim_parameters and sim_parameters["location_index"]:
+        print('Indexing organisms by location...')
+        for pop_name in Populations:
+            Populations[pop_name].index_locations(World)
+    frames = dict([(pop_name, None) for pop_name in Populations])
+    if "population_frame" in sim_parameters and \
+        sim_parameters["population_frame"]:
+        if genetic.numpy == None:
+            print('Population frames not activated - NumPy is not ' + \
+                'installed...')
+        else:
+            print('Activating population frames...')
+            frames = dict([(pop_name, 
+                            genetic.PopulationFrame(
+                                Populations[pop_name].agents))
+                           for pop_name in Populations])
+    print('Resolving ecological cell functions...')
+    hooks = dict([(name, eco_hook(sim_functions, name))
+                  for name in ('update_ecology', 'update_local', 'report')])
+    for name in ('update_ecology', 'update_local', 'report'):
+        print(' - ' + name + ': ' + hooks[name][1] + '...')
+    diffusion = None
+    if ("diffusion_rates" in sim_parameters and 
+        sim_parameters["diffusion_rates"]) or \
+        ("decay_rates" in sim_parameters and sim_parameters["decay_rates"]):
+        diffusion = {"rates": {}, "decay": {}, 
+                     "neighbours": 6, "boundary": 'open'}
+        if "diffusion_rates" in sim_parameters and \
+            sim_parameters["diffusion_rates"]:
+            diffusion["rates"] = sim_parameters["diffusion_rates"]
+        if "decay_rates" in sim_parameters and sim_parameters["decay_rates"]:
+            diffusion["decay"] = sim_parameters["decay_rates"]
+        if "diffusion_neighbours" in sim_parameters:
+            diffusion["neighbours"] = int(sim_parameters["diffusion_neighbours"])
+        if "diffusion_boundary" in sim_parameters:
+            diffusion["boundary"] = sim_parameters["diffusion_boundary"]
+        print('Activating diffusion of resources: ' + \
+            ', '.join(sorted(set(list(diffusion["rates"].keys()) + 
+                                 list(diffusion["decay"].keys())))) + \
+            ' (' + str(diffusion["neighbours"]) + ' neighbours, ' + \
+            str(diffusion["boundary"]) + ' boundary)...')
     print('\nSimulation preparation complete...')
     # Step 6: Run the simulation and recording the results
     while generation_count < max:
         generation_count = generation_count + 1
         sim_functions.ecoregulate(World)
-        eco_cell_iterator(World, sim_parameters,
-                          sim_functions.update_ecology)
-        eco_cell_iterator(World, sim_parameters,
-                          sim_functions.update_local)
-        eco_cell_iterator(World, sim_parameters, sim_functions.report)
+        eco_cell_iterator(World, sim_parameters, *hooks['update_ecology'])
+        if diffusion != None:
+            World.diffuse(diffusion["rates"], diffusion["neighbours"], 
+                          diffusion["boundary"], diffusion["decay"])
+        eco_cell_iterator(World, sim_parameters, *hooks['update_local'])
+        eco_cell_iterator(World, sim_parameters, *hooks['report'])
         bury_world(sim_parameters, World, generation_count)
         for pop_name in Populations:
+            if frames[pop_name] != None:
+                frames[pop_name].update(Populations[pop_name].agents)
             if sim_parameters["interpret_chromosome"]:
                 interpret_chromosome(sim_parameters, Populations, 
-                                     pop_name, World)
+                                     pop_name, World, cache, pool, 
+                                     context, profiles[pop_name])
             report_generation(sim_parameters, Populations, pop_name, 
-                              sim_functions, generation_count)
+                              sim_functions, generation_count, cache,
+                              profiles[pop_name])
             sim_functions.organism_movement(Populations, pop_name, World)
             sim_functions.organism_location(Populations, pop_name, World)
         if "database_file" in sim_parameters and \
@@ -150,10 +263,23 @@ def simulation_core(sim_functions, sim_parameters, Populations, World):
                 (con, cur) = db_report(con, cur, sim_functions,
                                    sim_parameters["starting_time"],
                                    Populations, World, generation_count)
+                for pop_name in Populations:
+                    if profiles[pop_name] != None:
+                        (con, cur) = db_log_profile(con, cur, 
+                                        sim_parameters["starting_time"],
+                                        pop_name, generation_count, 
+                                        profile_rows(sim_parameters, 
+                                                     profiles[pop_name]))
+        for pop_name in Populations:
+            if profiles[pop_name] != None: profiles[pop_name].reset()
         print('Generation ' + str(generation_count) + ' complete...')
     # Step 7: Close logging database (if used)
     print('\nClosing simulation results...')
     for pop_name in Populations: close_results(sim_parameters, pop_name)
+    if pool != None:
+        print('Terminating interpreter worker processes...')
+        pool.close()
+        pool.join()
     if "database_file" in sim_parameters and \
         "database_logging_frequency" in sim_parameters:
         print('Committing logged data into database file...') 
@@ -192,40 +318,36 @@ def coordinates(location):
 def adjacent_cells(sim_parameters, location):
     '''
     Function to get a list of adjacent ecological cells from a given 
-    location.
+    location. The adjacent cells are looked up from the index of 
+    neighbouring cells of the world shape (see dose_world.neighbourhood), 
+    which is computed once and shared by all calls.
     
     @param sim_parameters: simulation parameters dictionary (see Examples)
     @param location: location of ecological cell as (x,y,z)
     @return: list of locations of adjacent cells.
     '''
-    trashbin = []
-    temp_cells = []
-    world_size = [sim_parameters["world_x"],
-                  sim_parameters["world_y"],
-                  sim_parameters["world_z"]]
-    for i in range(3):
-        new_location = [spot for spot in location]
-        new_location[0] += 1
-        temp_cells.append(new_location)
-        new_location = [spot for spot in location]
-        new_location[0] -= 1
-        temp_cells.append(new_location)    
-    for i in range(2):
-        new_location = [spot for spot in location]
-        new_location[1] -= 1
-        temp_cells.append(new_location) 
-    for i in range(0,4,3):
-        temp_cells[i][1] += 1
-        temp_cells[i+1][1] -= 1
-    temp_cells[-1][1] += 2
-    for i in range(8):
-        for x in range(2):
-            if temp_cells[i][x] >= world_size[x] or temp_cells[i][x] < 0:
-                if temp_cells[i] not in trashbin:
-                    trashbin.append(temp_cells[i])
-    for location in trashbin:
-        temp_cells.remove(location)
-    return [tuple(location) for location in temp_cells]
+    return list(neighbourhood(sim_parameters).locations(location))
+
+def neighbourhood(sim_parameters):
+    '''
+    Function to get the index of neighbouring ecological cells of the 
+    world, as given by "neighbourhood", "neighbourhood_dimensions" and 
+    "neighbourhood_boundary" in simulation parameters (default to the 
+    Moore neighbourhood in the x-y plane without wrapping around).
+    
+    @param sim_parameters: simulation parameters dictionary (see Examples)
+    @return: dose_world.Neighbourhood object
+    '''
+    shape = (sim_parameters["world_x"], 
+             sim_parameters["world_y"], 
+             sim_parameters["world_z"])
+    type = "neighbourhood" in sim_parameters and \
+        sim_parameters["neighbourhood"] or 'moore'
+    dimensions = "neighbourhood_dimensions" in sim_parameters and \
+        int(sim_parameters["neighbourhood_dimensions"]) or 2
+    boundary = "neighbourhood_boundary" in sim_parameters and \
+        sim_parameters["neighbourhood_boundary"] or 'open'
+    return dose_world.neighbourhood(shape, type, dimensions, boundary)
 
 def spawn_populations(sim_parameters):
     '''
@@ -237,18 +359,84 @@ def spawn_populations(sim_parameters):
     @return: dictionary of population objects with population name as key
     '''
     temp_Populations = {}
+    if "identity_type" in sim_parameters and sim_parameters["identity_type"]:
+        genetic.identity_type = sim_parameters["identity_type"]
     print(' - Accessing population names...')
     for pop_name in sim_parameters["population_names"]:
         print(' - Constructing population: ' + pop_name + '...')
         temp_Populations[pop_name] = \
             genetic.population_constructor(sim_parameters)
         print(' - Updating organism identity and deme status...')
+        genetic.name_organisms(temp_Populations[pop_name].agents)
         for individual in temp_Populations[pop_name].agents:
-            individual.generate_name()
             individual.status['deme'] = pop_name
     return temp_Populations
 
-def eco_cell_iterator(World, sim_parameters, function):
+def argument_count(function):
+    '''
+    Counts the positional arguments of a function, without the instance 
+    of a bound method.
+    
+    @param function: function or method
+    @return: number of positional arguments
+    '''
+    try:
+        arguments = inspect.getfullargspec(function)[0]
+    except AttributeError:
+        arguments = inspect.getargspec(function)[0]
+    if inspect.ismethod(function) and function.__self__ != None:
+        return len(arguments) - 1
+    return len(arguments)
+
+def no_operation(function):
+    '''
+    Checks whether a function does nothing - its body is only pass, a 
+    docstring, or return None.
+    
+    @param function: function or method
+    @return: True if the function does nothing (False if unknown, such 
+    as for built-in functions)
+    '''
+    code = getattr(getattr(function, '__func__', function), '__code__', 
+                   None)
+    if code == None or not hasattr(dis, 'get_instructions'): return False
+    operations = [(instruction.opname, instruction.argval)
+                  for instruction in dis.get_instructions(code)
+                  if instruction.opname not in ('RESUME', 'NOP', 'CACHE',
+                                                'EXTENDED_ARG')]
+    return operations in ([('LOAD_CONST', None), ('RETURN_VALUE', None)],
+                          [('RETURN_CONST', None)])
+
+def eco_hook(sim_functions, name):
+    '''
+    Resolves how an ecological cell function of the simulation functions 
+    (update_ecology, update_local or report) is to be called - once, 
+    before the simulation, instead of for every ecological cell. 
+    
+    A whole-world function (the name with '_grid' suffix, such as 
+    update_ecology_grid), if over-ridden, is called once per generation. 
+    Otherwise, the ecological cell function is called for each ecological 
+    cell, with (World, x, y, z) if it takes 4 arguments or with (World), 
+    unless it does nothing (see no_operation), where it is skipped.
+    
+    @param sim_functions: implemented simulation functions (see 
+    dose.dose_functions)
+    @param name: name of the ecological cell function
+    @return: (function, mode) where mode is 'grid' (called once with 
+    World), 'cell' (called for each cell with World, x, y, z), 'world' 
+    (called for each cell with World) or 'skip' (not called)
+    '''
+    from .dose import dose_functions
+    grid = getattr(sim_functions, name + '_grid', None)
+    if grid != None and getattr(grid, '__func__', grid) is not \
+        getattr(dose_functions, name + '_grid', None):
+        return (grid, 'grid')
+    function = getattr(sim_functions, name)
+    if no_operation(function): return (function, 'skip')
+    if argument_count(function) == 4: return (function, 'cell')
+    return (function, 'world')
+
+def eco_cell_iterator(World, sim_parameters, function, mode=None):
     '''
     Generic caller to call any function to be executed in each ecological 
     cell in sequence.
@@ -256,12 +444,22 @@ def eco_cell_iterator(World, sim_parameters, function):
     @param World: dose_world.World object
     @param sim_parameters: simulation parameters dictionary (see Examples)
     @param function: function to be executed
+    @param mode: how the function is called (see eco_hook). Default = 
+    None, where the function is called with (World, x, y, z) if it takes 
+    4 arguments, or with (World).
     @return: none
     '''
+    if mode == None:
+        if argument_count(function) == 4: mode = 'cell'
+        else: mode = 'world'
+    if mode == 'skip': return
+    if mode == 'grid': 
+        function(World)
+        return
     for x in range(sim_parameters["world_x"]):
         for y in range(sim_parameters["world_y"]):
             for z in range(sim_parameters["world_z"]):
-                if len(inspect.getargspec(function)[0]) == 5:
+                if mode == 'cell':
                     function(World, x, y, z)
                 else:
                     function(World)
@@ -401,7 +599,29 @@ def deploy_4(sim_parameters, Populations, pop_name, World):
             World.ecosystem[x][y][z]['organisms'] += 1
             individual.status['location'] = location
 
-def interpret_chromosome(sim_parameters, Populations, pop_name, World):
+module_contexts = {}
+
+def module_context():
+    '''
+    Function to get the Ragaraja interpreter context of the module state 
+    of Ragaraja (activated instruction set and module registers). One 
+    context (ragaraja.InterpreterContext) is kept for each instruction 
+    set, so that the dispatch table is not generated again in every 
+    generation.
+    
+    @return: ragaraja.InterpreterContext object
+    '''
+    key = (id(ragaraja.register), 
+           tuple([ragaraja.ragaraja.get(instruction) 
+                  for instruction in ragaraja.instructions]))
+    if key not in module_contexts:
+        module_contexts[key] = ragaraja.InterpreterContext(
+                                    functions=ragaraja.ragaraja,
+                                    registers=ragaraja.register)
+    return module_contexts[key]
+
+def interpret_chromosome(sim_parameters, Populations, pop_name, World, 
+                         cache=None, pool=None, context=None, profile=None):
     '''
     Function to call Ragaraja interpreter to express / execute the genome 
     for each organism in a population. The Turing tape (array) after 
@@ -416,9 +636,49 @@ def interpret_chromosome(sim_parameters, Populations, pop_name, World):
     @param Populations: dictionary of population objects
     @param pop_name: population name
     @param World: dose_world.World object
+    @param cache: register_machine.ExecutionCache object to skip the 
+    interpretation of chromosomes which had been interpreted from the 
+    same cytoplasm and world environment conditions. Default = None (no 
+    cache). This is only used for Ragaraja interpreter.
+    @param pool: multiprocessing.Pool object of worker processes to 
+    interpret the chromosomes of organisms in different ecological cells 
+    in parallel (see interpret_chromosome_parallel). Default = None (no 
+    parallel interpretation). This is only used for Ragaraja interpreter 
+    with a context generated from a version.
+    @param context: ragaraja.InterpreterContext to interpret the 
+    chromosomes. Default = None, which uses the module state of Ragaraja 
+    (activated instruction set and registers; see module_context). This 
+    is only used for Ragaraja interpreter.
+    @param profile: register_machine.Profile to collect the execution 
+    statistics of the chromosomes into, with a record for each organism 
+    (see register_machine.Profile.record). Default = None (no 
+    statistics). Every chromosome is then interpreted by the interpreter 
+    loop, one organism at a time, without cache, lockstep execution, 
+    worker processes, peephole folding or generated functions, so that 
+    every executed instruction is counted.
     @return: none
     '''
+    if context == None and \
+        sim_parameters["ragaraja_version"] != 'user-defined':
+        context = module_context()
+    if profile != None:
+        cache = None
+        pool = None
+    if sim_parameters["ragaraja_version"] in [0.1, 0.2] and \
+        profile == None and \
+        lockstep_machine.is_available() and \
+        lockstep_machine.is_supported(context.functions):
+        return interpret_chromosome_lockstep(sim_parameters, Populations, 
+                                             pop_name, World, context)
+    if pool != None and \
+        sim_parameters["ragaraja_version"] != 'user-defined' and \
+        context.version != None:
+        return interpret_chromosome_parallel(sim_parameters, Populations, 
+                                             pop_name, World, pool, 
+                                             context)
     array = [0] * sim_parameters["max_tape_length"]
+    peephole = "interpreter_peephole" in sim_parameters and \
+        sim_parameters["interpreter_peephole"] and profile == None
     for i in range(len(Populations[pop_name].agents)):
         individual = Populations[pop_name].agents[i]
         location = individual.status['location']
@@ -441,25 +701,34 @@ def interpret_chromosome(sim_parameters, Populations, pop_name, World):
             elif sim_parameters["ragaraja_version"] == 66:
                 source = sim_parameters["base_converter"](source) 
             # print(source)
-            # change interpreter if needed
-            if sim_parameters["ragaraja_version"] == 'user-defined':
-                interpreter = sim_parameters["interpreter"]
-                instruction_size = sim_parameters["instruction_size"]
-            elif sim_parameters["interpreter"] == 'ragaraja':
-                interpreter = ragaraja.ragaraja
-                instruction_size = 3
-            else:
-                interpreter = ragaraja.ragaraja
-                instruction_size = 3
             # get cytoplasm / blood
             array = Populations[pop_name].agents[i].status['blood']
-            # interpret chromosme
-            try: (array, apointer, inputdata, output, source, spointer) = \
-                register_machine.interpret(source, interpreter, 
-                                           instruction_size,
-                                           inputdata, array, 
-                                           sim_parameters["max_tape_length"],
-                                           sim_parameters["max_codon"])
+            # interpret chromosme - user-defined interpreter executes the 
+            # source directly while Ragaraja executes the compiled source
+            try: 
+                if sim_parameters["ragaraja_version"] == 'user-defined':
+                    (array, apointer, inputdata, output, source, 
+                     spointer) = register_machine.interpret(source, 
+                                    sim_parameters["interpreter"], 
+                                    sim_parameters["instruction_size"],
+                                    inputdata, array, 
+                                    sim_parameters["max_tape_length"],
+                                    sim_parameters["max_codon"], 
+                                    None, profile)
+                else:
+                    execute = lambda inputdata, array: \
+                        context.interpret(source, inputdata, array, 
+                                          sim_parameters["max_tape_length"],
+                                          sim_parameters["max_codon"], 
+                                          peephole, profile)
+                    if cache == None:
+                        (array, apointer, inputdata, output, source, 
+                         spointer) = execute(inputdata, array)
+                    else:
+                        (array, apointer, inputdata, output, source, 
+                         spointer) = cache.execute(execute, source, 
+                                                   inputdata, array, 
+                                                   context.registers)
             except Exception as e: 
                 error_msg = '|'.join(['Error at Chromosome_' + \
                     str(chromosome_count), str(e)])
@@ -470,16 +739,239 @@ def interpret_chromosome(sim_parameters, Populations, pop_name, World):
             Populations[pop_name].agents[i].status['blood'] = array
             World.ecosystem[x][y][z]['temporary_input'] = inputdata
             World.ecosystem[x][y][z]['temporary_output'] = output
+        if profile != None:
+            profile.record(individual.status['identity'])
+
+def interpret_chromosome_lockstep(sim_parameters, Populations, pop_name, 
+                                  World, context=None):
+    '''
+    Function to express / execute the genome for each organism in a 
+    population, as interpret_chromosome function, for NucleotideBF 
+    instructions (Ragaraja version 0.1 or 0.2). As NucleotideBF has no 
+    loops, the same chromosome of all organisms are executed together in 
+    lockstep (see lockstep_machine.interpret_batch) instead of one 
+    organism at a time. 
+    
+    @param sim_parameters: simulation parameters dictionary (see Examples)
+    @param Populations: dictionary of population objects
+    @param pop_name: population name
+    @param World: dose_world.World object
+    @param context: ragaraja.InterpreterContext to execute the chromosomes 
+    which cannot be executed in lockstep. Default = None, which uses the 
+    module state of Ragaraja.
+    @return: none
+    '''
+    agents = Populations[pop_name].agents
+    conditions = [[] for individual in agents]
+    genome_size = max([len(individual.genome) for individual in agents] + [0])
+    for chromosome_count in range(genome_size):
+        members = [i for i in range(len(agents)) 
+                   if chromosome_count < len(agents[i].genome)]
+        sources = []
+        inputdata = []
+        arrays = []
+        for i in members:
+            (x,y,z) = coordinates(agents[i].status['location'])
+            # get chromosomal sequence
+            source = ''.join(agents[i].genome[chromosome_count].sequence)
+            if sim_parameters["ragaraja_version"] == 0.2:
+                source = ragaraja.nBF_to_Ragaraja(source)
+            sources.append(source)
+            # get world environment conditions and cytoplasm / blood
+            inputdata.append(World.ecosystem[x][y][z]['local_input'])
+            arrays.append(agents[i].status['blood'])
+        try:
+            results = lockstep_machine.interpret_batch(sources, inputdata, 
+                                        arrays, 
+                                        sim_parameters["max_tape_length"],
+                                        sim_parameters["max_codon"],
+                                        context)
+        except Exception as e:
+            error_msg = '|'.join(['Error at Chromosome_' + \
+                str(chromosome_count), str(e)])
+            results = []
+            for k in range(len(members)):
+                (x,y,z) = coordinates(agents[members[k]].status['location'])
+                agents[members[k]].status['chromosome_error'] = error_msg
+                results.append((arrays[k], None, inputdata[k], 
+                                World.ecosystem[x][y][z]['local_output'],
+                                sources[k], None))
+        # update cytoplasm / blood
+        for k in range(len(members)):
+            (array, apointer, input_list, output, source, 
+             spointer) = results[k]
+            agents[members[k]].status['blood'] = array
+            conditions[members[k]].append((input_list, output))
+    # update world environment conditions in the same order as 
+    # interpret_chromosome function
+    for i in range(len(agents)):
+        (x,y,z) = coordinates(agents[i].status['location'])
+        for (input_list, output) in conditions[i]:
+            World.ecosystem[x][y][z]['temporary_input'] = input_list
+            World.ecosystem[x][y][z]['temporary_output'] = output
+
+worker_contexts = {}
+
+def worker_context(version, instructions=None):
+    '''
+    Function to get the Ragaraja interpreter context of a worker process 
+    for parallel interpretation (see interpret_chromosome_parallel). One 
+    context (ragaraja.InterpreterContext) is kept for each instruction 
+    set in the worker process, so that worker processes can be shared by 
+    simulations with different instruction sets. The registers of the 
+    context are set by each task (see interpret_cell), so nothing is 
+    carried over from one task to another.
+    
+    @param version: Ragaraja version of the context
+    @param instructions: Ragaraja instructions to activate for version 0 
+    or 66
+    @return: ragaraja.InterpreterContext object
+    '''
+    key = (version, tuple(instructions or []))
+    if key not in worker_contexts:
+        worker_contexts[key] = ragaraja.InterpreterContext(version, 
+                                                           instructions)
+    return worker_contexts[key]
+
+def interpret_cell(task):
+    '''
+    Function to interpret the chromosomes of the organisms in an 
+    ecological cell, one organism after another in the given order, in a 
+    worker process (see interpret_chromosome_parallel).
+    
+    @param task: (version, instructions, registers, size, 
+    max_instructions, peephole, inputdata, output, organisms) where 
+    version and instructions are the Ragaraja instruction set (see 
+    worker_context), registers is the list of registers to start the 
+    ecological cell from, size is the tape size, max_instructions is the maximum number of 
+    instructions to execute for each chromosome, 
+    peephole is whether to compile the chromosomes with peephole folding 
+    (see ragaraja.peephole_table), inputdata and output are the local 
+    input and output lists of the ecological cell and organisms is a list 
+    of (blood, sources) for each organism
+    @return: (inputdata, output, organisms) where inputdata and output are 
+    from the execution of the last chromosome and organisms is a list of 
+    (blood, error message or None) for each organism
+    '''
+    (version, instructions, registers, size, max_instructions, peephole, 
+     local_input, local_output, organisms) = task
+    context = worker_context(version, instructions)
+    context.registers[:] = registers
+    folds = None
+    if peephole: folds = context.folds
+    inputdata = local_input
+    output = local_output
+    results = []
+    for (array, sources) in organisms:
+        error_msg = None
+        for chromosome_count in range(len(sources)):
+            inputdata = local_input
+            output = local_output
+            try:
+                (array, apointer, inputdata, output, source, 
+                 spointer) = register_machine.interpret_program(
+                                ragaraja.compile_source(
+                                    sources[chromosome_count], folds), 
+                                context, inputdata, array, size, 
+                                max_instructions)
+            except Exception as e:
+                error_msg = '|'.join(['Error at Chromosome_' + \
+                    str(chromosome_count), str(e)])
+        results.append((array, error_msg))
+    return (inputdata, output, results)
+
+def interpret_chromosome_parallel(sim_parameters, Populations, pop_name, 
+                                  World, pool, context):
+    '''
+    Function to express / execute the genome for each organism in a 
+    population, as interpret_chromosome function, in parallel worker 
+    processes. The organisms are sharded by ecological cells - the 
+    organisms in the same ecological cell are interpreted in the same 
+    worker process in the order of the population, and the results are 
+    merged back in the same order as interpret_chromosome function. 
+    
+    Each worker process interprets with its own context of the same 
+    instruction set as the given context (see worker_context). The 
+    interpretation of each ecological cell starts from a copy of the 
+    registers of the given context, taken before any ecological cell is 
+    interpreted; hence, the results do not depend on the worker process 
+    or the order in which the ecological cells are interpreted, but 
+    changes to the registers are not carried over from one ecological 
+    cell to another or back to the simulation (unlike 
+    interpret_chromosome function, where the organisms change the 
+    registers one after another).
+    
+    @param sim_parameters: simulation parameters dictionary (see Examples)
+    @param Populations: dictionary of population objects
+    @param pop_name: population name
+    @param World: dose_world.World object
+    @param pool: multiprocessing.Pool object of worker processes
+    @param context: ragaraja.InterpreterContext, which is generated from 
+    a version (see ragaraja.InterpreterContext)
+    @return: none
+    '''
+    agents = Populations[pop_name].agents
+    peephole = "interpreter_peephole" in sim_parameters and \
+        sim_parameters["interpreter_peephole"]
+    cells = []
+    members = {}
+    for i in range(len(agents)):
+        individual = agents[i]
+        if len(individual.genome) == 0: continue
+        (x,y,z) = coordinates(individual.status['location'])
+        if (x,y,z) not in members:
+            cells.append((x,y,z))
+            members[(x,y,z)] = []
+        members[(x,y,z)].append(i)
+    registers = list(context.registers)
+    tasks = []
+    for (x,y,z) in cells:
+        organisms = []
+        for i in members[(x,y,z)]:
+            sources = []
+            for chromosome in agents[i].genome:
+                # get chromosomal sequence and process it if needed
+                source = ''.join(chromosome.sequence)
+                if sim_parameters["ragaraja_version"] == 0.2:
+                    source = ragaraja.nBF_to_Ragaraja(source)
+                elif sim_parameters["ragaraja_version"] == 66:
+                    source = sim_parameters["base_converter"](source) 
+                sources.append(source)
+            organisms.append((agents[i].status['blood'], sources))
+        tasks.append((context.version, context.instructions, registers,
+                      sim_parameters["max_tape_length"], 
+                      sim_parameters["max_codon"],
+                      peephole,
+                      World.ecosystem[x][y][z]['local_input'],
+                      World.ecosystem[x][y][z]['local_output'],
+                      organisms))
+    results = pool.map(interpret_cell, tasks)
+    # update world environment conditions and cytoplasm / blood
+    for c in range(len(cells)):
+        (x,y,z) = cells[c]
+        (inputdata, output, organisms) = results[c]
+        for k in range(len(organisms)):
+            (array, error_msg) = organisms[k]
+            i = members[(x,y,z)][k]
+            agents[i].status['blood'] = array
+            if error_msg != None:
+                agents[i].status['chromosome_error'] = error_msg
+        World.ecosystem[x][y][z]['temporary_input'] = inputdata
+        World.ecosystem[x][y][z]['temporary_output'] = output
 
 def step(Populations, pop_name, sim_functions):
     '''
     Performs a generational step for a population
         - Prepopulation control
+        - Update of the location index (see 
+          genetic.Population.update_locations)
         - Mutations
         - Before mating fitness measurement
         - Mating
         - Postpopulation control
         - Generational events
+        - Swap in the next generation (see genetic.Population.swap_generation)
+        - Update of the location index
         - After mating fitness measurement
         - Generate a textual report for the current generation
     
@@ -491,18 +983,21 @@ def step(Populations, pop_name, sim_functions):
     '''
     if Populations[pop_name].generation > 0:
         sim_functions.prepopulation_control(Populations, pop_name)
-    for organism in Populations[pop_name].agents:
-        sim_functions.mutation_scheme(organism)
+    Populations[pop_name].update_locations()
+    sim_functions.population_mutation_scheme(Populations, pop_name)
     sim_functions.fitness(Populations, pop_name)
     sim_functions.mating(Populations, pop_name)
     sim_functions.postpopulation_control(Populations, pop_name)
     sim_functions.generation_events(Populations, pop_name)
+    Populations[pop_name].swap_generation()
+    Populations[pop_name].update_locations()
     Populations[pop_name].generation = Populations[pop_name].generation + 1
     sim_functions.fitness(Populations, pop_name)
     return sim_functions.population_report(Populations, pop_name)
 
 def report_generation(sim_parameters, Populations, pop_name, 
-                      sim_functions, generation_count):
+                      sim_functions, generation_count, cache=None, 
+                      profile=None):
     '''
     Performs a generational step (using step function) for a population 
     and writes out the resulting report into results text file.
@@ -513,12 +1008,52 @@ def report_generation(sim_parameters, Populations, pop_name,
     @param sim_functions: implemented simulation functions (see 
     dose.dose_functions)
     @param generation_count: current generation count for reporting
+    @param cache: register_machine.ExecutionCache object used for 
+    interpreting the chromosomes of the current generation, where the 
+    cache hits and misses will be reported. Default = None (no cache).
+    @param profile: register_machine.Profile of interpreting the 
+    chromosomes of the current generation, which will be reported and 
+    written into profile CSV file (see write_profile). Default = None 
+    (no profiling).
     @return: none
+    
+    The hits and misses of the fitness cache of the population (see 
+    genetic.FitnessCache), and the allocation and garbage collection 
+    counters of the organism pool of the population (see 
+    genetic.OrganismPool), if used, are also reported.
     '''
     for index in range(len(Populations[pop_name].agents)):
         Populations[pop_name].agents[index].status['generation'] = \
         generation_count
     report = step(Populations, pop_name, sim_functions)
+    if cache != None:
+        report = '\n'.join([str(report), 
+                            'INTERPRETER CACHE: %s hits, %s misses' % \
+                            cache.counters()])
+        cache.reset_counters()
+    if profile != None:
+        report = '\n'.join([str(report), 
+                            'INTERPRETER PROFILE: %s chromosomes, %s ' \
+                            'instructions, %.6f seconds, %s jumps, %s ' \
+                            'roll backs, %s unknown instructions' % \
+                            profile.totals()])
+        write_profile(sim_parameters, pop_name, generation_count, profile)
+    fitness_cache = getattr(Populations[pop_name], 'fitness_cache', None)
+    if fitness_cache != None:
+        report = '\n'.join([str(report), 
+                            'FITNESS CACHE: %s hits, %s misses' % \
+                            fitness_cache.counters() + \
+                            ', %.2f%% hit rate' % \
+                            (fitness_cache.hit_rate() * 100)])
+        fitness_cache.reset_counters()
+    pool = getattr(Populations[pop_name], 'pool', None)
+    if pool != None:
+        report = '\n'.join([str(report), 
+                            'ORGANISM POOL: %s allocated, %s recycled, ' \
+                            '%s released, %s garbage collections, %s ' \
+                            'objects collected, %.6f seconds' % \
+                            pool.counters()])
+        pool.reset_counters()
     if generation_count % int(sim_parameters["fossilized_frequency"]) == 0:
         file = '%s%s_%s_' % (sim_parameters["directory"],
                              sim_parameters["simulation_name"], pop_name)
@@ -534,6 +1069,62 @@ def report_generation(sim_parameters, Populations, pop_name,
         f.write('\n')
         f.close
 
+def profile_rows(sim_parameters, profile):
+    '''
+    Function to tabulate the interpreter profile of a population as rows 
+    of (scope, name, instruction, chromosomes, executions, seconds, jumps, 
+    roll backs, unknown instructions), where scope is one of
+        - organism: statistics of the chromosomes of an organism (name is 
+        the identity of the organism)
+        - instruction: statistics of an instruction (chromosomes, roll 
+        backs and unknown instructions are not counted per instruction). 
+        The jumps of a loop end instruction (015 in Ragaraja) are the loop 
+        iterations.
+        - population: total statistics of the population
+    
+    @param sim_parameters: simulation parameters dictionary (see Examples)
+    @param profile: register_machine.Profile object
+    @return: list of rows
+    '''
+    rows = [['organism', name, '', programs, executions, seconds, jumps, 
+             rollbacks, unknowns]
+            for (name, programs, executions, seconds, jumps, rollbacks, 
+                 unknowns) in profile.records]
+    for (instruction, executions, seconds, jumps) in profile.statistics():
+        # Ragaraja instructions are profiled by opcode
+        if sim_parameters["ragaraja_version"] != 'user-defined':
+            instruction = ragaraja.instructions[instruction]
+        rows.append(['instruction', '', instruction, '', executions, 
+                     seconds, jumps, '', ''])
+    rows.append(['population', '', ''] + list(profile.totals()))
+    return rows
+
+def write_profile(sim_parameters, pop_name, generation_count, profile):
+    '''
+    Function to write the interpreter profile of a population (see 
+    profile_rows) into profile CSV file, with the generation count as 
+    the first column.
+    
+    @param sim_parameters: simulation parameters dictionary (see Examples)
+    @param pop_name: population name
+    @param generation_count: current generation count for reporting
+    @param profile: register_machine.Profile object
+    @return: none
+    '''
+    filename = '%s%s_%s.profile.csv' % (sim_parameters["directory"],
+                                        sim_parameters["simulation_name"], 
+                                        pop_name)
+    header = not os.path.exists(filename)
+    f = open(filename, 'a')
+    writer = csv.writer(f, lineterminator='\n')
+    if header:
+        writer.writerow(['generation', 'scope', 'name', 'instruction', 
+                         'chromosomes', 'executions', 'seconds', 'jumps', 
+                         'roll_backs', 'unknown_instructions'])
+    for row in profile_rows(sim_parameters, profile):
+        writer.writerow([generation_count] + row)
+    f.close()
+
 def bury_world(sim_parameters, World, generation_count):
     '''
     Function to bury entire world into a file.
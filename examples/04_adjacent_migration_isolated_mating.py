@@ -15,6 +15,10 @@ In this simulation,
     eco-cells but the probability of such event will be 10% x 10% = 1%; 
     similarly, 3 or more movement by the same organism may happen with 
     reducing probabilities
+    - organisms are indexed by eco-cell (location_index) to find the 
+    organisms of each eco-cell without scanning the population, and are 
+    moved by Population.move_organism to keep the index and the number of 
+    organisms of the eco-cells up to date
     - no Ragaraja interpretation of genome
     - 1000 generations to be simulated
 '''
@@ -32,6 +36,7 @@ parameters = {
               "population_names": ['pop_01'],
               "population_locations": [[(x,y,z) for x in range(5) for y in range(5) for z in range(1)]],
               "deployment_code": 3,
+              "location_index": True,
               "chromosome_bases": ['0','1'],
               "background_mutation": 0.1,
               "additional_mutation": 0,
@@ -64,18 +69,12 @@ class simulation_functions(dose.dose_functions):
 
     def organism_movement(self, Populations, pop_name, World):
         for location in parameters["population_locations"][0]:
-            group = dose.filter_location(location, Populations[pop_name].agents)
+            group = dose.filter_location(location, Populations[pop_name])
             adj_cells = dose.simulation_calls.adjacent_cells(parameters, location)
             for i in range(int(round((len(group) * 0.1)))):
-                (x,y,z) = dose.simulation_calls.coordinates(location)
-                World.ecosystem[x][y][z]['organisms'] -= 1
-                immigrant = random.choice(Populations[pop_name].agents)
-                while immigrant not in group:
-                    immigrant = random.choice(Populations[pop_name].agents)
+                immigrant = random.choice(group)
                 new_location = random.choice(adj_cells)
-                immigrant.status['location'] = new_location
-                (x,y,z) = dose.simulation_calls.coordinates(new_location)
-                World.ecosystem[x][y][z]['organisms'] += 1
+                Populations[pop_name].move_organism(immigrant, new_location)
 
     def organism_location(self, Populations, pop_name, World): pass
 
@@ -97,7 +96,7 @@ class simulation_functions(dose.dose_functions):
 
     def mating(self, Populations, pop_name): 
         for location in parameters["population_locations"][0]:
-            group = dose.filter_location(location, Populations[pop_name].agents)
+            group = dose.filter_location(location, Populations[pop_name])
             for x in range(len(group)//2):
                 parents = []
                 for i in range(2):
@@ -24,7 +24,6 @@ try:
 	import run_examples_without_installation
 except ImportError: pass
 
-import copy
 import random
 
 # Example codes starts from here
@@ -138,7 +137,7 @@ class simulation_functions(dose.dose_functions):
         agents = Populations[pop_name].agents
         while len(agents) < 100:
             chosen_agent = random.choice(agents)
-            new_agent = copy.deepcopy(chosen_agent)
+            new_agent = chosen_agent.clone()
             agents.append(new_agent)
 
     def postpopulation_control(self, Populations, pop_name): pass
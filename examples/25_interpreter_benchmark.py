@@ -0,0 +1,147 @@
+'''
+Example 25: Benchmark of Ragaraja interpretation on chromosomes of 300
+random instructions (on all implemented Ragaraja instructions), 
+interpreted on a tape of 50 cells for a maximum of 2000 instructions.
+The instructions which jump in the source (loops and source pointer 
+moves), which may fail on the tape (and end the execution by roll 
+back), or which may take a long time on large values (exponents and 
+factorials) are left out, so that most of each chromosome is executed.
+
+The execution speed (instructions per second) is compared between roll
+back of failed instructions from full copies of the tape, input list
+and output list (taken before every instruction) and roll back from
+undo log (only the changes that the instruction is about to make), for
+both the interpreter (register_machine.interpret) and the compiled
+interpreter (register_machine.interpret_program). The compiled
+interpreter is also benchmarked with peephole folding of the programs
+(see ragaraja.peephole_table), and against Python functions generated
+from the programs (see register_machine.generate_function). The 
+programs are compiled and the functions are generated before timing.
+'''
+# needed to run this example without prior
+# installation of DOSE into Python site-packages
+try:
+	import run_examples_without_installation
+except ImportError: pass
+
+# Example codes starts from here
+import random
+import time
+
+import dose
+from dose import ragaraja
+from dose import register_machine
+
+parameters = {
+              "chromosome_size": 300,
+              "excluded_instructions": ['014', '015', '023', '024', '025', 
+                                        '026', '027', '028', '029', '030', 
+                                        '045', '049', '074', '075', '076', 
+                                        '077', '078', '079', '082', '083', 
+                                        '091', '092', '094', '095', '096', 
+                                        '103', '104', '107', '108', '109', 
+                                        '110', '111', '114', '115', '117', 
+                                        '169', '170', '171', '197'],
+              "max_tape_length": 50,
+              "max_codon": 2000,
+              "ragaraja_version": 98,
+              "sample_size": 500,
+              "repeats": 3
+             }
+
+def chromosomes(sample_size):
+    '''
+    Generate the chromosomes (as sources) of random instructions from the
+    implemented Ragaraja instructions, without the excluded instructions.
+    '''
+    random.seed(20)
+    bases = [instruction for instruction in ragaraja.instructions
+             if ragaraja.ragaraja[instruction] is not ragaraja.not_used and
+             instruction not in parameters["excluded_instructions"]]
+    return [''.join([random.choice(bases)
+                     for x in range(parameters["chromosome_size"])])
+            for i in range(sample_size)]
+
+def execute(source, journal=None):
+    array = [0] * parameters["max_tape_length"]
+    return register_machine.interpret(source, ragaraja.ragaraja, 3, [],
+                                      array,
+                                      parameters["max_tape_length"],
+                                      parameters["max_codon"], journal)
+
+def execute_program(program, table, journal=None):
+    array = [0] * parameters["max_tape_length"]
+    return register_machine.interpret_program(program, table, [], array,
+                                      parameters["max_tape_length"],
+                                      parameters["max_codon"], journal)
+
+def instruction_count(sources):
+    '''
+    Count the number of executed instructions by counting the calls to
+    the instruction handlers.
+    '''
+    count = [0]
+    def counted(function):
+        def handler(*args):
+            count[0] = count[0] + 1
+            return function(*args)
+        return handler
+    functions = dict([(instruction, counted(function))
+                      for (instruction, function)
+                      in ragaraja.ragaraja.items()])
+    for source in sources:
+        array = [0] * parameters["max_tape_length"]
+        register_machine.interpret(source, functions, 3, [], array,
+                                   parameters["max_tape_length"],
+                                   parameters["max_codon"])
+    return count[0]
+
+def benchmark(name, function, sources, instructions):
+    best = None
+    for repeat in range(parameters["repeats"]):
+        start = time.time()
+        for source in sources: function(source)
+        duration = time.time() - start
+        if best == None or duration < best: best = duration
+    print('%-45s %12.0f instructions/second' %
+          (name, instructions / best))
+
+ragaraja.activate_version(parameters["ragaraja_version"])
+sources = chromosomes(parameters["sample_size"])
+instructions = instruction_count(sources)
+table = ragaraja.dispatch_table()
+journal = ragaraja.undo_journal()
+journal_table = ragaraja.journal_table()
+folds = ragaraja.peephole_table()
+programs = [ragaraja.compile_source(source) for source in sources]
+folded_programs = [ragaraja.compile_source(source, folds) 
+                   for source in sources]
+print('%s chromosomes, %s executed instructions' %
+      (len(sources), instructions))
+benchmark('interpret, full copy roll back',
+          lambda source: execute(source),
+          sources, instructions)
+benchmark('interpret, undo log roll back',
+          lambda source: execute(source, journal),
+          sources, instructions)
+benchmark('interpret_program, full copy roll back',
+          lambda program: execute_program(program, table),
+          programs, instructions)
+benchmark('interpret_program, undo log roll back',
+          lambda program: execute_program(program, table, journal_table),
+          programs, instructions)
+benchmark('interpret_program, undo log, peephole folding',
+          lambda program: execute_program(program, table, journal_table),
+          folded_programs, instructions)
+context = ragaraja.InterpreterContext(functions=ragaraja.ragaraja,
+                                      registers=ragaraja.register)
+context.generate_functions(parameters["sample_size"], 1)
+for source in sources:
+    context.interpret(source, [], [0] * parameters["max_tape_length"],
+                      parameters["max_tape_length"], parameters["max_codon"])
+benchmark('generated functions',
+          lambda source: context.interpret(source, [], 
+                            [0] * parameters["max_tape_length"], 
+                            parameters["max_tape_length"], 
+                            parameters["max_codon"]),
+          sources, instructions)
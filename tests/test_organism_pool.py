@@ -0,0 +1,45 @@
+'''
+Tests of recycling dead organisms by the organism pool
+(genetic.OrganismPool).
+'''
+import unittest
+
+from dose import genetic
+
+
+class TestOrganismPoolRelease(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = genetic.OrganismPool(100)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_crossover_at_end_keeps_offspring_chromosome(self):
+        '''
+        Crossover at the end of the chromosome returns the chromosome of
+        the parent unchanged, which must not be recycled when the parent
+        dies while the offspring survives.
+        '''
+        parent1 = genetic.Organism([genetic.Chromosome([0, 1, 0, 1], [0, 1])])
+        parent2 = genetic.Organism([genetic.Chromosome([1, 1, 1, 1], [0, 1])])
+        population = genetic.Population(0, agents=[parent1, parent2],
+                                        pool=self.pool)
+        (chromosome1, chromosome2) = genetic.crossover(parent1.genome[0],
+                                                       parent2.genome[0], 4)
+        self.assertTrue(chromosome1 is parent1.genome[0])
+        offspring = population.new_organism([chromosome1])
+        population.add_offspring([offspring])
+        parent1.status['alive'] = False
+        population.swap_generation()
+        self.assertEqual(list(offspring.genome[0].sequence), [0, 1, 0, 1])
+        self.assertEqual(offspring.fitness(), 0.5)
+        recycled = population.new_organism(
+            [genetic.Chromosome([0, 0, 0, 0], [0, 1])])
+        self.assertTrue(recycled is parent1)
+        self.assertTrue(recycled.genome is not offspring.genome)
+        self.assertEqual(list(offspring.genome[0].sequence), [0, 1, 0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+'''
+Tests of roll back of failed instructions by the undo log
+(register_machine.interpret and register_machine.interpret_program).
+'''
+import random
+import unittest
+
+from dose import ragaraja, register_machine
+
+
+class TestUndoJournal(unittest.TestCase):
+
+    def setUp(self):
+        ragaraja.activate_version(1)
+
+    def tearDown(self):
+        ragaraja.activate_version(1)
+
+    def execute(self, function):
+        random.seed(7)
+        ragaraja.register[:] = [0] * 99
+        result = function()
+        return (result[0], result[1], result[2], result[3],
+                ''.join(result[4]), result[5], list(ragaraja.register))
+
+    def test_pointer_past_short_tape(self):
+        '''
+        An instruction on a cell past the end of a tape shorter than its
+        size fails within its handler and is not rolled back.
+        '''
+        result = self.execute(lambda: register_machine.interpret(
+            '001078000008', ragaraja.ragaraja, 3, [], [0] * 5, 10, 100,
+            ragaraja.undo_journal()))
+        self.assertEqual(result[1], 6)
+        self.assertEqual(result[4], '001078000008')
+
+    def test_journal_as_full_copy_on_short_tapes(self):
+        '''
+        Execution with the undo log (by the interpreters and generated
+        functions) ends in the same state as execution with full copies
+        of the tape, input list and output list.
+        '''
+        instructions = ['000', '001', '004', '005', '008', '011', '020',
+                        '021', '033', '034', '050', '051', '078', '080',
+                        '121', '256', '357', '400']
+        journal = ragaraja.undo_journal()
+        table = ragaraja.dispatch_table()
+        journal_table = ragaraja.journal_table()
+        folds = ragaraja.peephole_table()
+        operations = ragaraja.codegen_table()
+        for seed in range(200):
+            generator = random.Random(seed)
+            source = ''.join([generator.choice(instructions)
+                              for _ in range(generator.randint(1, 30))])
+            size = generator.choice([5, 10])
+            tape = [generator.randint(-2, 3)
+                    for _ in range(generator.randint(0, size))]
+            inputdata = [1, 2, 3]
+            expected = self.execute(lambda: register_machine.interpret(
+                source, ragaraja.ragaraja, 3, list(inputdata), list(tape),
+                size, 50))
+            self.assertEqual(expected, self.execute(
+                lambda: register_machine.interpret(
+                    source, ragaraja.ragaraja, 3, list(inputdata),
+                    list(tape), size, 50, journal)), source)
+            self.assertEqual(expected, self.execute(
+                lambda: register_machine.interpret_program(
+                    ragaraja.compile_source(source), table,
+                    list(inputdata), list(tape), size, 50,
+                    journal_table)), source)
+            self.assertEqual(expected, self.execute(
+                lambda: register_machine.interpret_program(
+                    ragaraja.compile_source(source, folds), table,
+                    list(inputdata), list(tape), size, 50,
+                    journal_table)), source)
+            function = register_machine.generate_function(
+                ragaraja.compile_source(source), operations)
+            self.assertEqual(expected, self.execute(
+                lambda: function(table, list(inputdata), list(tape), size,
+                                 50, journal_table,
+                                 ragaraja.compile_source)), source)
+
+
+if __name__ == '__main__':
+    unittest.main()